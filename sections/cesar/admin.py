@@ -1,25 +1,62 @@
 from django.contrib import admin
-from .models import Program, Course, Enrollment, Assignment, Grade
+from .models import Program, Course, Enrollment, Assignment, Grade, ProgramProgress
+
+# Changelists join the FK columns they display (list_select_related), edit forms
+# use autocomplete widgets instead of <select>s listing every row, and the extra
+# unfiltered COUNT(*) behind "N total" is skipped (show_full_result_count).
 
 @admin.register(Program)
 class ProgramAdmin(admin.ModelAdmin):
     list_display = ('name', 'university', 'degree_type', 'total_ects_required')
+    search_fields = ('name', 'university')
+    show_full_result_count = False
 
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
     list_display = ('code', 'name', 'program', 'ects', 'semester_type')
     list_filter = ('program', 'semester_type')
+    list_select_related = ('program',)
+    search_fields = ('code', 'name')
+    autocomplete_fields = ('program',)
+    show_full_result_count = False
 
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
     list_display = ('user', 'course', 'status', 'is_passed')
     list_filter = ('status', 'is_passed')
+    list_select_related = ('user', 'course')
+    search_fields = ('user__username', 'course__code', 'course__name')
+    autocomplete_fields = ('user', 'course')
+    date_hierarchy = 'enrolled_date'
+    ordering = ('-id',)
+    show_full_result_count = False
+    
+    def get_queryset(self, request):
+        # Also used by the Grade enrollment autocomplete, which prints str(enrollment)
+        return super().get_queryset(request).select_related('user', 'course')
 
 @admin.register(Assignment)
 class AssignmentAdmin(admin.ModelAdmin):
     list_display = ('title', 'course', 'due_date', 'is_completed')
     list_filter = ('is_completed', 'course')
+    list_select_related = ('course',)
+    search_fields = ('title', 'course__code')
+    autocomplete_fields = ('course',)
+    date_hierarchy = 'due_date'
+    show_full_result_count = False
 
 @admin.register(Grade)
 class GradeAdmin(admin.ModelAdmin):
-    list_display = ('enrollment', 'grade', 'weight', 'date')
\ No newline at end of file
+    list_display = ('enrollment', 'grade', 'weight', 'date')
+    list_select_related = ('enrollment__user', 'enrollment__course')
+    search_fields = ('enrollment__user__username', 'enrollment__course__code')
+    autocomplete_fields = ('enrollment', 'assignment')
+    date_hierarchy = 'date'
+    show_full_result_count = False
+
+@admin.register(ProgramProgress)
+class ProgramProgressAdmin(admin.ModelAdmin):
+    list_display = ('user', 'program', 'earned_ects', 'progress', 'updated_at')
+    list_select_related = ('user', 'program')
+    autocomplete_fields = ('user', 'program')
+    show_full_result_count = False
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CesarConfig(AppConfig):
+    name = 'sections.cesar'
+
+    def ready(self):
+        # Keeps ProgramProgress in sync with enrollments
+        from . import signals  # noqa: F401
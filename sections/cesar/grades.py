@@ -0,0 +1,72 @@
+"""
+Weighted GPA for the Study Planner, computed in the database and cached per user.
+
+A grade counts with its own weight times the weight of its assignment
+(100 when the grade is not tied to an assignment):
+
+    GPA = Σ grade · w / Σ w,   w = Grade.weight · Assignment.weight
+"""
+from django.core.cache import cache
+from django.db.models import F, FloatField, Sum, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from .models import Grade
+
+
+GPA_CACHE_TIMEOUT = 60 * 60
+GPA_CACHE_KEY = 'cesar:gpa:{user_id}'
+
+
+def _effective_weight():
+    return F('weight') * Coalesce(F('assignment__weight'), Value(100))
+
+
+def _weighted_average():
+    weight = _effective_weight()
+    # NullIf keeps all-zero weights at NULL instead of a division by zero
+    total_weight = NullIf(Cast(Sum(weight), FloatField()), Value(0.0))
+    return Cast(Sum(F('grade') * weight, output_field=FloatField()), FloatField()) / total_weight
+
+
+def compute_weighted_gpa(user_id):
+    """
+    Overall, per-course and per-program weighted GPA of a user in three
+    aggregate queries. Values are None when there are no (weighted) grades.
+    """
+    grades = Grade.objects.filter(enrollment__user_id=user_id)
+    overall = grades.aggregate(gpa=_weighted_average())['gpa']
+    by_course = list(
+        grades.values('enrollment__course_id', 'enrollment__course__code')
+        .annotate(gpa=_weighted_average())
+        .order_by('enrollment__course__code')
+    )
+    by_program = list(
+        grades.values('enrollment__course__program_id', 'enrollment__course__program__name')
+        .annotate(gpa=_weighted_average())
+        .order_by('enrollment__course__program__name')
+    )
+    return {
+        'gpa': overall,
+        'by_course': [
+            {'course_id': row['enrollment__course_id'], 'code': row['enrollment__course__code'], 'gpa': row['gpa']}
+            for row in by_course
+        ],
+        'by_program': [
+            {'program_id': row['enrollment__course__program_id'], 'name': row['enrollment__course__program__name'], 'gpa': row['gpa']}
+            for row in by_program
+        ],
+    }
+
+
+def get_weighted_gpa(user_id):
+    """compute_weighted_gpa behind the cache, invalidated by the Grade signals"""
+    key = GPA_CACHE_KEY.format(user_id=user_id)
+    result = cache.get(key)
+    if result is None:
+        result = compute_weighted_gpa(user_id)
+        cache.set(key, result, GPA_CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_gpa(*user_ids):
+    cache.delete_many([GPA_CACHE_KEY.format(user_id=user_id) for user_id in user_ids])
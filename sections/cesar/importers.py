@@ -0,0 +1,439 @@
+"""
+Bulk import pipeline for the Study Planner models.
+
+Rows are streamed from CSV or JSONL files, validated in chunks and written
+with bulk_create/bulk_update, one transaction per chunk. Foreign keys are
+resolved through in-memory lookup maps (natural keys -> ids) that are loaded
+once per model, so no per-row queries are issued.
+
+Natural keys:
+    Program     (name, university)
+    Course      (program, code)
+    Enrollment  (user, course)
+    Assignment  (course, title)
+    Grade       none, every row is inserted
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .grades import invalidate_gpa
+from .models import Assignment, Course, Enrollment, Grade, Program
+from .progress import rebuild_program_progress
+
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Import order when several files are given, parents before children
+MODEL_ORDER = ('programs', 'courses', 'enrollments', 'assignments', 'grades')
+
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y'}
+FALSE_VALUES = {'0', 'false', 'f', 'no', 'n', ''}
+
+
+class RowError(ValueError):
+    """A row that failed validation"""
+
+
+@dataclass
+class ImportStats:
+    """Outcome of importing one file"""
+    model: str
+    path: str
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+    seconds: float = 0.0
+    user_ids: set = field(default_factory=set)
+
+    @property
+    def rows(self):
+        return self.created + self.updated + len(self.errors)
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def model_for_path(path):
+    """Infer the model name from a file name such as 'courses.csv' or 'grades_2026.jsonl'"""
+    stem = Path(path).stem.lower()
+    for name in MODEL_ORDER:
+        if stem.startswith(name) or stem.startswith(name.rstrip('s')):
+            return name
+    raise ValueError(f"Cannot infer the model of '{path}', pass --model")
+
+
+def read_rows(path, fmt=None):
+    """Stream dict rows from a CSV or JSONL file, with 1-based line numbers"""
+    fmt = fmt or ('jsonl' if Path(path).suffix.lower() in ('.jsonl', '.ndjson') else 'csv')
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            # Header is line 1
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+        elif fmt == 'jsonl':
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_no, RowError(f"invalid JSON: {e}")
+                    continue
+                yield line_no, row
+        else:
+            raise ValueError(f"Unknown format '{fmt}', expected csv or jsonl")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _text(row, name, required=True, max_length=None):
+    value = row.get(name)
+    value = '' if value is None else str(value).strip()
+    if required and not value:
+        raise RowError(f"'{name}' is required")
+    if max_length and len(value) > max_length:
+        raise RowError(f"'{name}' is longer than {max_length} characters")
+    return value
+
+
+def _int(row, name, default):
+    value = _text(row, name, required=False)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise RowError(f"'{name}' must be an integer, got {value!r}")
+
+
+def _bool(row, name, default=False):
+    value = _text(row, name, required=False).lower()
+    if not value:
+        return default
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise RowError(f"'{name}' must be a boolean, got {value!r}")
+
+
+def _choice(row, name, choices, default=None):
+    value = _text(row, name, required=default is None) or default
+    valid = {key for key, _ in choices}
+    if value not in valid:
+        raise RowError(f"'{name}' must be one of {', '.join(sorted(valid))}, got {value!r}")
+    return value
+
+
+def _datetime(row, name, required=True):
+    value = _text(row, name, required=required)
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise RowError(f"'{name}' must be an ISO date or datetime, got {value!r}")
+        parsed = timezone.datetime(date.year, date.month, date.day)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _decimal(row, name):
+    value = _text(row, name)
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise RowError(f"'{name}' must be a number, got {value!r}")
+    if not number.is_finite() or abs(number) >= 10:
+        raise RowError(f"'{name}' must be between -9.99 and 9.99, got {value!r}")
+    return number.quantize(Decimal('0.01'))
+
+
+class PlannerImporter:
+    """Imports planner files while keeping natural-key -> id maps in memory"""
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, create_users=False):
+        self.chunk_size = chunk_size
+        self.create_users = create_users
+        self._maps = {}
+        # What refresh_derived has to fix up after the bulk writes
+        self.touched_user_ids = set()
+        self.parents_changed = False
+
+    # Lookup maps, each loaded with a single query on first use
+
+    def _map(self, name):
+        if name not in self._maps:
+            loader = getattr(self, f'_load_{name}')
+            self._maps[name] = loader()
+        return self._maps[name]
+
+    def _load_programs(self):
+        return {(name, university): pk for pk, name, university in Program.objects.values_list('pk', 'name', 'university')}
+
+    def _load_courses(self):
+        return {(program_id, code): pk for pk, program_id, code in Course.objects.values_list('pk', 'program_id', 'code')}
+
+    def _load_users(self):
+        return dict(User.objects.values_list('username', 'pk'))
+
+    def _load_enrollments(self):
+        return {(user_id, course_id): pk for pk, user_id, course_id in Enrollment.objects.values_list('pk', 'user_id', 'course_id')}
+
+    def _load_assignments(self):
+        return {(course_id, title): pk for pk, course_id, title in Assignment.objects.values_list('pk', 'course_id', 'title')}
+
+    def _load_programs_by_name(self):
+        by_name = {}
+        for (name, _), pk in self._map('programs').items():
+            by_name[name] = None if name in by_name else pk
+        return by_name
+
+    def _load_courses_by_code(self):
+        by_code = {}
+        for (_, code), pk in self._map('courses').items():
+            by_code[code] = None if code in by_code else pk
+        return by_code
+
+    def _invalidate_derived_maps(self, *names):
+        for name in names:
+            self._maps.pop(name, None)
+
+    # Foreign key resolution
+
+    def _program_id(self, row):
+        name = _text(row, 'program')
+        university = _text(row, 'university', required=False)
+        if university:
+            pk = self._map('programs').get((name, university))
+        else:
+            pk = self._map('programs_by_name').get(name)
+            if pk is None and name in self._map('programs_by_name'):
+                raise RowError(f"program '{name}' is ambiguous, add a 'university' column")
+        if pk is None:
+            raise RowError(f"unknown program '{name}'")
+        return pk
+
+    def _course_id(self, row):
+        code = _text(row, 'course')
+        if _text(row, 'program', required=False):
+            pk = self._map('courses').get((self._program_id(row), code))
+        else:
+            pk = self._map('courses_by_code').get(code)
+            if pk is None and code in self._map('courses_by_code'):
+                raise RowError(f"course code '{code}' is ambiguous, add a 'program' column")
+        if pk is None:
+            raise RowError(f"unknown course '{code}'")
+        return pk
+
+    def _user_id(self, row, pending_users):
+        username = _text(row, 'username', max_length=150)
+        pk = self._map('users').get(username)
+        if pk is None:
+            if not self.create_users:
+                raise RowError(f"unknown user '{username}' (use --create-users)")
+            pending_users.add(username)
+        return pk
+
+    # Row parsers, returning (natural key or None, field values, user id or None)
+
+    def parse_program(self, row, pending_users):
+        values = {
+            'name': _text(row, 'name', max_length=200),
+            'university': _text(row, 'university', max_length=200),
+            'degree_type': _choice(row, 'degree_type', Program.DEGREE_CHOICES),
+            'total_ects_required': _int(row, 'total_ects_required', 180),
+            'color': _text(row, 'color', required=False, max_length=7) or '#3B82F6',
+        }
+        return (values['name'], values['university']), values, None
+
+    def parse_course(self, row, pending_users):
+        values = {
+            'program_id': self._program_id(row),
+            'code': _text(row, 'code', max_length=50),
+            'name': _text(row, 'name', max_length=200),
+            'ects': _int(row, 'ects', 6),
+            'semester_type': _choice(row, 'semester_type', Course.SEMESTER_CHOICES, default='fall'),
+            'description': _text(row, 'description', required=False),
+        }
+        return (values['program_id'], values['code']), values, None
+
+    def parse_enrollment(self, row, pending_users):
+        values = {
+            'user_id': self._user_id(row, pending_users),
+            'course_id': self._course_id(row),
+            'semester_year': _text(row, 'semester_year', max_length=20),
+            'status': _choice(row, 'status', Enrollment.STATUS_CHOICES, default='in_progress'),
+            'is_passed': _bool(row, 'is_passed'),
+            'completion_date': _datetime(row, 'completion_date', required=False),
+        }
+        # Users created later in the chunk are keyed by username until then
+        user_key = values['user_id'] or _text(row, 'username')
+        return (user_key, values['course_id']), values, values['user_id']
+
+    def parse_assignment(self, row, pending_users):
+        values = {
+            'course_id': self._course_id(row),
+            'title': _text(row, 'title', max_length=200),
+            'description': _text(row, 'description', required=False),
+            'due_date': _datetime(row, 'due_date'),
+            'weight': _int(row, 'weight', 100),
+            'is_completed': _bool(row, 'is_completed'),
+        }
+        return (values['course_id'], values['title']), values, None
+
+    def parse_grade(self, row, pending_users):
+        username = _text(row, 'username')
+        user_id = self._map('users').get(username)
+        course_id = self._course_id(row)
+        enrollment_id = self._map('enrollments').get((user_id, course_id))
+        if enrollment_id is None:
+            raise RowError(f"'{username}' is not enrolled in course '{_text(row, 'course')}'")
+        assignment_id = None
+        title = _text(row, 'assignment', required=False)
+        if title:
+            assignment_id = self._map('assignments').get((course_id, title))
+            if assignment_id is None:
+                raise RowError(f"unknown assignment '{title}'")
+        values = {
+            'enrollment_id': enrollment_id,
+            'assignment_id': assignment_id,
+            'grade': _decimal(row, 'grade'),
+            'weight': _int(row, 'weight', 100),
+            'description': _text(row, 'description', required=False, max_length=200),
+            'comments': _text(row, 'comments', required=False),
+        }
+        return None, values, user_id
+
+    # Model specific settings: parser, model, key map, natural key fields, fields updated on conflict
+
+    SPECS = {
+        'programs': ('parse_program', Program, 'programs', ('name', 'university'), ['degree_type', 'total_ects_required', 'color']),
+        'courses': ('parse_course', Course, 'courses', ('program_id', 'code'), ['name', 'ects', 'semester_type', 'description']),
+        'enrollments': (
+            'parse_enrollment', Enrollment, 'enrollments', ('user_id', 'course_id'),
+            ['semester_year', 'status', 'is_passed', 'completion_date'],
+        ),
+        'assignments': (
+            'parse_assignment', Assignment, 'assignments', ('course_id', 'title'),
+            ['description', 'due_date', 'weight', 'is_completed'],
+        ),
+        'grades': ('parse_grade', Grade, None, (), []),
+    }
+
+    def import_file(self, path, model_name=None, fmt=None, strict=False):
+        """Import one file. With strict the first invalid row aborts the import."""
+        model_name = model_name or model_for_path(path)
+        if model_name not in self.SPECS:
+            raise ValueError(f"Unknown model '{model_name}', expected one of {', '.join(MODEL_ORDER)}")
+        parser_name, model, key_map, key_fields, update_fields = self.SPECS[model_name]
+        spec = (getattr(self, parser_name), model, key_map, key_fields, update_fields)
+
+        stats = ImportStats(model=model_name, path=str(path))
+        start = time.perf_counter()
+        for chunk in chunked(read_rows(path, fmt), self.chunk_size):
+            self._import_chunk(chunk, spec, stats, strict)
+        stats.seconds = time.perf_counter() - start
+
+        # Maps derived from the one just written are now stale
+        if model_name == 'programs':
+            self._invalidate_derived_maps('programs_by_name')
+        elif model_name == 'courses':
+            self._invalidate_derived_maps('courses_by_code')
+        return stats
+
+    def _import_chunk(self, chunk, spec, stats, strict):
+        """Validate a chunk, then write it in one transaction"""
+        parse, model, key_map, key_fields, update_fields = spec
+        pending_users = set()
+        parsed = {}
+        inserts = []
+        user_ids = set()
+        for line_no, row in chunk:
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                if not isinstance(row, dict):
+                    raise RowError("row must be an object")
+                key, values, user_id = parse(row, pending_users)
+            except RowError as e:
+                if strict:
+                    raise RowError(f"{stats.path}:{line_no}: {e}")
+                stats.errors.append((line_no, str(e)))
+                continue
+            if user_id is not None:
+                user_ids.add(user_id)
+            if key is None:
+                inserts.append(values)
+            else:
+                # Later rows with the same key win
+                parsed[key] = (values, row)
+
+        with transaction.atomic():
+            if pending_users:
+                created_users = User.objects.bulk_create(User(username=username) for username in sorted(pending_users))
+                self._map('users').update((user.username, user.pk) for user in created_users)
+                for key, (values, row) in list(parsed.items()):
+                    if values.get('user_id') is None:
+                        values['user_id'] = self._map('users')[_text(row, 'username')]
+                        user_ids.add(values['user_id'])
+                        del parsed[key]
+                        parsed[(values['user_id'],) + key[1:]] = (values, row)
+
+            existing = self._map(key_map) if key_map else {}
+            to_create, to_update = [], []
+            for key, (values, _) in parsed.items():
+                if key in existing:
+                    to_update.append(model(pk=existing[key], **values))
+                else:
+                    to_create.append(model(**values))
+            to_create.extend(model(**values) for values in inserts)
+
+            created = model.objects.bulk_create(to_create)
+            if to_update and update_fields:
+                model.objects.bulk_update(to_update, update_fields)
+
+        # bulk_create sets primary keys (SQLite >= 3.35, PostgreSQL), keep the map current
+        for obj in created if key_map else ():
+            existing[tuple(getattr(obj, name) for name in key_fields)] = obj.pk
+        stats.created += len(created)
+        stats.updated += len(to_update)
+        stats.user_ids.update(user_ids)
+        self.touched_user_ids.update(user_ids)
+        if model is Assignment and (created or to_update):
+            # Assignment weights feed the GPA of everyone graded on them
+            assignment_ids = [obj.pk for obj in created] + [obj.pk for obj in to_update]
+            self.touched_user_ids.update(
+                Grade.objects.filter(assignment_id__in=assignment_ids).values_list('enrollment__user_id', flat=True)
+            )
+        if to_update and model in (Program, Course):
+            self.parents_changed = True
+
+    def refresh_derived(self):
+        """
+        bulk_create/bulk_update skip the signals, so rebuild the ProgramProgress
+        rows and drop the cached GPA of every user the import touched.
+        """
+        if self.parents_changed:
+            # New ECTS values or requirements can change anyone's progress
+            rebuild_program_progress()
+        elif self.touched_user_ids:
+            rebuild_program_progress(self.touched_user_ids)
+        invalidate_gpa(*self.touched_user_ids)
@@ -0,0 +1,139 @@
+"""
+Study Planner dashboard benchmark.
+
+Seeds a large planner (100k enrollments by default) inside a transaction,
+times the dashboard with the planner indexes in place and with them dropped,
+then rolls everything back so the database is left untouched. The variants
+alternate over several rounds and the cache is cleared before each one, so
+neither side profits from the other's cached GPA rollups or warm pages.
+
+    python manage.py bench_dashboard --enrollments 100000 --repeat 20 --rounds 3
+"""
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from sections.cesar.progress import rebuild_program_progress
+from sections.cesar.models import Assignment, Course, Enrollment, Grade, Program
+from sections.cesar.views import dashboard_context
+
+
+COURSES_PER_PROGRAM = 10
+ASSIGNMENTS_PER_COURSE = 20
+BATCH_SIZE = 5000
+
+
+class Rollback(Exception):
+    """Raised to discard the seeded data at the end of the benchmark"""
+
+
+class Command(BaseCommand):
+    help = "Seed a large planner and report dashboard latency with and without the planner indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enrollments', type=int, default=100_000)
+        parser.add_argument('--courses', type=int, default=100, help="courses per user")
+        parser.add_argument('--repeat', type=int, default=20, help="timed renders per variant and round")
+        parser.add_argument('--rounds', type=int, default=3, help="rounds, each one running both variants")
+
+    def handle(self, *args, **options):
+        timings = {'with indexes': [], 'without indexes': []}
+        try:
+            with transaction.atomic():
+                user = self.seed(options['enrollments'], options['courses'])
+                indexed = True
+                for round_ in range(options['rounds']):
+                    # Alternate which variant runs first
+                    order = [True, False] if round_ % 2 == 0 else [False, True]
+                    for with_indexes in order:
+                        if with_indexes != indexed:
+                            self.set_planner_indexes(with_indexes)
+                            indexed = with_indexes
+                        label = 'with indexes' if with_indexes else 'without indexes'
+                        timings[label] += self.measure(user, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f"{'':<18}{'median ms':>12}{'p95 ms':>12}")
+        for label in ('without indexes', 'with indexes'):
+            samples = timings[label]
+            p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+            self.stdout.write(f"{label:<18}{statistics.median(samples):>12.2f}{p95:>12.2f}")
+
+    def seed(self, n_enrollments, courses_per_user):
+        """Bulk-create programs, courses, users, enrollments, assignments and grades"""
+        start = time.perf_counter()
+        n_courses = courses_per_user
+        n_programs = max(1, n_courses // COURSES_PER_PROGRAM)
+        n_users = max(1, n_enrollments // n_courses)
+
+        programs = Program.objects.bulk_create(
+            Program(name=f'Bench Program {p}', university='Bench', degree_type='master', total_ects_required=120)
+            for p in range(n_programs)
+        )
+        courses = Course.objects.bulk_create(
+            Course(program=programs[c % n_programs], name=f'Bench Course {c}', code=f'B{c}', ects=6)
+            for c in range(n_courses)
+        )
+        users = User.objects.bulk_create(User(username=f'bench_{u}') for u in range(n_users))
+
+        now = timezone.now()
+        Assignment.objects.bulk_create((
+            Assignment(
+                course=course, title=f'Bench Task {a}', due_date=now + timedelta(days=a - ASSIGNMENTS_PER_COURSE // 2),
+                is_completed=a % 3 == 0,
+            )
+            for course in courses for a in range(ASSIGNMENTS_PER_COURSE)
+        ), batch_size=BATCH_SIZE)
+
+        statuses = ['planned', 'in_progress', 'completed', 'dropped']
+        enrollments = Enrollment.objects.bulk_create((
+            Enrollment(
+                user=user, course=course, semester_year='2026',
+                status=statuses[(u + c) % 4], is_passed=(u + c) % 4 == 2,
+            )
+            for u, user in enumerate(users) for c, course in enumerate(courses)
+        ), batch_size=BATCH_SIZE)
+        Grade.objects.bulk_create((
+            Grade(enrollment=enrollment, grade='4.00')
+            for enrollment in enrollments
+        ), batch_size=BATCH_SIZE)
+        # bulk_create skips the signals that maintain the summary table
+        rebuild_program_progress()
+
+        self.stdout.write(
+            f"Seeded {len(enrollments)} enrollments for {n_users} users "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        return users[0]
+
+    def measure(self, user, repeat):
+        """Dashboard latency in ms (data loading plus template rendering), starting from a cold cache"""
+        cache.clear()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            render_to_string('cesar/app2.html', dashboard_context(user))
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def set_planner_indexes(self, present):
+        """Create or drop the composite/partial planner indexes (only inside the rolled back transaction)"""
+        # Plain SQL, the SQLite schema editor refuses to run inside atomic();
+        # an editor that is never entered only renders the CREATE INDEX statements
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for model in (Enrollment, Assignment):
+                for index in model._meta.indexes:
+                    if present:
+                        cursor.execute(str(index.create_sql(model, editor)))
+                    else:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
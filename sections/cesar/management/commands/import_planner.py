@@ -0,0 +1,64 @@
+"""
+Bulk import programs, courses, enrollments, assignments and grades from CSV/JSONL.
+
+    python manage.py import_planner programs.csv courses.csv enrollments.jsonl grades.csv
+    python manage.py import_planner export.jsonl --model enrollments --create-users
+
+The model of each file is inferred from its name unless --model is given.
+Files are imported parents first, whatever order they are passed in.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from sections.cesar.importers import DEFAULT_CHUNK_SIZE, MODEL_ORDER, PlannerImporter, RowError, model_for_path
+
+
+# Invalid rows listed per file before the rest is summarized
+MAX_REPORTED_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = "Stream CSV/JSONL files into the Study Planner models with bulk writes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+')
+        parser.add_argument('--model', choices=MODEL_ORDER, help="model of every file (default: from file name)")
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help="file format (default: from extension)")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--create-users', action='store_true', help="create users missing from enrollments")
+        parser.add_argument('--strict', action='store_true', help="abort on the first invalid row")
+
+    def handle(self, *args, **options):
+        try:
+            files = [(options['model'] or model_for_path(path), path) for path in options['files']]
+        except ValueError as e:
+            raise CommandError(str(e))
+        files.sort(key=lambda item: MODEL_ORDER.index(item[0]))
+
+        importer = PlannerImporter(chunk_size=options['chunk_size'], create_users=options['create_users'])
+        all_stats = []
+        try:
+            for model_name, path in files:
+                stats = importer.import_file(path, model_name, options['format'], strict=options['strict'])
+                all_stats.append(stats)
+                self.report(stats)
+        except (OSError, RowError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            # Chunks committed before a failure still need their derived rows
+            importer.refresh_derived()
+
+        rows = sum(stats.rows for stats in all_stats)
+        seconds = sum(stats.seconds for stats in all_stats)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {rows} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:.0f} rows/s)"
+        ))
+
+    def report(self, stats):
+        self.stdout.write(
+            f"{stats.model:<12} {stats.path}: {stats.created} created, {stats.updated} updated, "
+            f"{len(stats.errors)} invalid in {stats.seconds:.2f}s ({stats.rows_per_second:.0f} rows/s)"
+        )
+        for line_no, message in stats.errors[:MAX_REPORTED_ERRORS]:
+            self.stderr.write(f"  line {line_no}: {message}")
+        if len(stats.errors) > MAX_REPORTED_ERRORS:
+            self.stderr.write(f"  ... and {len(stats.errors) - MAX_REPORTED_ERRORS} more")
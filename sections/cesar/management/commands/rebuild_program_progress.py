@@ -0,0 +1,16 @@
+"""
+Rebuild the denormalized ProgramProgress table from Enrollment in bulk.
+
+    python manage.py rebuild_program_progress
+"""
+from django.core.management.base import BaseCommand
+
+from sections.cesar.progress import rebuild_program_progress
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ProgramProgress summary table from enrollments"
+
+    def handle(self, *args, **options):
+        count = rebuild_program_progress()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} program progress rows"))
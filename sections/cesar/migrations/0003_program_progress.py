@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_program_progress(apps, schema_editor):
+    """
+    Fill ProgramProgress for enrollments that exist before the signals do,
+    with the same grouped aggregate as rebuild_program_progress.
+    """
+    Enrollment = apps.get_model('cesar', 'Enrollment')
+    Program = apps.get_model('cesar', 'Program')
+    ProgramProgress = apps.get_model('cesar', 'ProgramProgress')
+
+    totals = Enrollment.objects.values('user_id', 'course__program_id').annotate(
+        enrollments=Count('id'),
+        earned=Sum('course__ects', filter=Q(is_passed=True)),
+    ).order_by()
+    required = dict(Program.objects.values_list('id', 'total_ects_required'))
+
+    def progress_percent(earned_ects, total_ects_required):
+        return int((earned_ects / total_ects_required) * 100) if total_ects_required > 0 else 0
+
+    ProgramProgress.objects.bulk_create((
+        ProgramProgress(
+            user_id=total['user_id'],
+            program_id=total['course__program_id'],
+            earned_ects=total['earned'] or 0,
+            progress=progress_percent(total['earned'] or 0, required[total['course__program_id']]),
+        )
+        for total in totals
+    ), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cesar', '0002_planner_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('earned_ects', models.IntegerField(default=0)),
+                ('progress', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='progress_rows', to='cesar.program')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='program_progress', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'program')},
+            },
+        ),
+        migrations.RunPython(backfill_program_progress, migrations.RunPython.noop),
+    ]
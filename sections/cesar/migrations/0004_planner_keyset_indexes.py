@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cesar', '0003_program_progress'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='assignment',
+            name='cesar_assign_open_due_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='enrollment',
+            name='cesar_enroll_user_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(condition=models.Q(('is_completed', False)), fields=['course', 'due_date', 'id'], name='cesar_assign_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enrollment',
+            index=models.Index(fields=['user', 'status', 'enrolled_date', 'id'], name='cesar_enroll_user_status_idx'),
+        ),
+    ]
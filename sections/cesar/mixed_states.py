@@ -0,0 +1,164 @@
+"""
+Mixed-State Entanglement - Mathematical Functions
+Negativity, concurrence and purity for batches of bipartite density matrices
+"""
+
+import time
+
+import numpy as np
+
+
+# Largest deviation from Hermiticity / unit trace accepted for a density matrix
+DENSITY_TOLERANCE = 1e-8
+
+# σy ⊗ σy, used by the Wootters spin flip for two-qubit concurrence
+SIGMA_YY = np.kron(np.array([[0, -1j], [1j, 0]]), np.array([[0, -1j], [1j, 0]]))
+
+
+def parse_density_batch(data):
+    """
+    Parse a mixed-state batch request payload.
+    Expects {"dim_a": 2, "dim_b": 2, "density_matrices": [[[...], ...], ...]},
+    where each entry is a number or a complex string such as "0.5+0.5j".
+    
+    Returns:
+        (rhos, dim_a, dim_b) with rhos of shape (N, dim_a * dim_b, dim_a * dim_b)
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Batch payload must be a JSON object")
+    try:
+        dim_a = int(data.get('dim_a', 2))
+        dim_b = int(data.get('dim_b', 2))
+        matrices = data['density_matrices']
+    except KeyError:
+        raise ValueError("Batch payload is missing 'density_matrices'")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid dimensions: {e}")
+    
+    try:
+        rhos = np.asarray(matrices, dtype=complex)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid density matrix format: {e}")
+    
+    dim = dim_a * dim_b
+    if rhos.ndim != 3 or rhos.shape[0] == 0 or rhos.shape[1:] != (dim, dim):
+        raise ValueError(f"'density_matrices' must be a non-empty list of {dim}×{dim} matrices")
+    
+    return rhos, dim_a, dim_b
+
+
+def validate_density_matrices(rhos, normalize=True):
+    """
+    Check Hermiticity, trace and positivity of a (N, d, d) stack. With
+    normalize the matrices are divided by their trace, otherwise the trace
+    must be 1.
+    """
+    hermiticity = np.max(np.abs(rhos - rhos.conj().transpose(0, 2, 1)), axis=(1, 2))
+    bad = np.flatnonzero(hermiticity > DENSITY_TOLERANCE)
+    if bad.size:
+        raise ValueError(f"Density matrix {int(bad[0])} is not Hermitian")
+    
+    traces = np.trace(rhos, axis1=1, axis2=2).real
+    if normalize:
+        bad = np.flatnonzero(traces < DENSITY_TOLERANCE)
+        if bad.size:
+            raise ValueError(f"Density matrix {int(bad[0])} has zero trace")
+        rhos = rhos / traces[:, None, None]
+    else:
+        bad = np.flatnonzero(np.abs(traces - 1) > DENSITY_TOLERANCE)
+        if bad.size:
+            raise ValueError(f"Density matrix {int(bad[0])} does not have unit trace")
+    
+    # Negative eigenvalues would make negativity, concurrence and purity meaningless
+    smallest = np.linalg.eigvalsh(rhos)[:, 0]
+    bad = np.flatnonzero(smallest < -DENSITY_TOLERANCE)
+    if bad.size:
+        raise ValueError(
+            f"Density matrix {int(bad[0])} is not positive semidefinite (eigenvalue {smallest[bad[0]]:.3g})"
+        )
+    return rhos
+
+
+def partial_transpose(rhos, dim_a, dim_b):
+    """Partial transpose over subsystem B of a (N, d, d) stack"""
+    n = rhos.shape[0]
+    blocks = rhos.reshape(n, dim_a, dim_b, dim_a, dim_b)
+    return blocks.transpose(0, 1, 4, 3, 2).reshape(n, dim_a * dim_b, dim_a * dim_b)
+
+
+def purity(rhos):
+    """Tr(ρ²) per matrix; for Hermitian ρ this is the sum of |ρ_ij|²"""
+    return np.einsum('nij,nij->n', rhos, rhos.conj()).real
+
+
+def negativity(rhos, dim_a, dim_b):
+    """
+    Negativity (‖ρ^T_B‖₁ − 1)/2 and logarithmic negativity log2‖ρ^T_B‖₁,
+    from one stacked eigvalsh over the partially transposed batch.
+    """
+    eigenvalues = np.linalg.eigvalsh(partial_transpose(rhos, dim_a, dim_b))
+    trace_norms = np.sum(np.abs(eigenvalues), axis=1)
+    return (trace_norms - 1) / 2, np.log2(trace_norms)
+
+
+def concurrence(rhos):
+    """
+    Wootters concurrence of two-qubit density matrices, max(0, λ1 − λ2 − λ3 − λ4)
+    with λ the square roots of the eigenvalues of √ρ ρ̃ √ρ, ρ̃ = (σy⊗σy) ρ* (σy⊗σy).
+    Every step is a stacked Hermitian eigendecomposition.
+    """
+    if rhos.shape[1:] != (4, 4):
+        raise ValueError("Concurrence is only defined here for 2×2 systems")
+    
+    weights, vectors = np.linalg.eigh(rhos)
+    sqrt_rhos = (vectors * np.sqrt(np.clip(weights, 0, None))[:, None, :]) @ vectors.conj().transpose(0, 2, 1)
+    flipped = SIGMA_YY @ rhos.conj() @ SIGMA_YY
+    
+    eigenvalues = np.linalg.eigvalsh(sqrt_rhos @ flipped @ sqrt_rhos)
+    lambdas = np.sqrt(np.clip(eigenvalues, 0, None))[:, ::-1]
+    return np.maximum(0.0, lambdas[:, 0] - lambdas[:, 1:].sum(axis=1))
+
+
+def analyze_density_matrices(rhos, dim_a, dim_b, normalize=True):
+    """
+    Entanglement measures for a batch of density matrices.
+    
+    Args:
+        rhos: numpy array of shape (N, dim_a * dim_b, dim_a * dim_b)
+        dim_a: dimension of subsystem A
+        dim_b: dimension of subsystem B
+        normalize: divide each matrix by its trace instead of requiring trace 1
+    
+    Returns:
+        dict with negativities, log_negativities, purities, is_entangled (PPT
+        criterion, exact for 2×2 and 2×3), concurrences (2×2 only, else None)
+        and timings in milliseconds per stage
+    """
+    timings = {}
+    
+    start = time.perf_counter()
+    rhos = validate_density_matrices(rhos, normalize)
+    timings['validate'] = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    negativities, log_negativities = negativity(rhos, dim_a, dim_b)
+    timings['negativity'] = (time.perf_counter() - start) * 1000
+    
+    start = time.perf_counter()
+    purities = purity(rhos)
+    timings['purity'] = (time.perf_counter() - start) * 1000
+    
+    concurrences = None
+    if (dim_a, dim_b) == (2, 2):
+        start = time.perf_counter()
+        concurrences = concurrence(rhos)
+        timings['concurrence'] = (time.perf_counter() - start) * 1000
+    
+    return {
+        'negativities': negativities,
+        'log_negativities': log_negativities,
+        'purities': purities,
+        'is_entangled': negativities > DENSITY_TOLERANCE,
+        'concurrences': concurrences,
+        'timings': timings,
+    }
@@ -57,6 +57,14 @@ class Enrollment(models.Model):
     
     class Meta:
         unique_together = ('user', 'course')
+        indexes = [
+            # Dashboard: current enrollments filter(user, status), keyset paginated on (enrolled_date, id)
+            models.Index(fields=['user', 'status', 'enrolled_date', 'id'], name='cesar_enroll_user_status_idx'),
+            # Dashboard: earned ECTS filter(user, is_passed) joined to course
+            models.Index(fields=['user', 'is_passed', 'course'], name='cesar_enroll_user_passed_idx'),
+            # Admin: date_hierarchy on enrolled_date
+            models.Index(fields=['enrolled_date'], name='cesar_enroll_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.course.code}"
@@ -71,6 +79,20 @@ class Assignment(models.Model):
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # Dashboard: upcoming assignments filter(is_completed=False, due_date >= now) ordered by due_date
+            models.Index(fields=['is_completed', 'due_date'], name='cesar_assign_done_due_idx'),
+            # Partial index holding only open assignments, per course in (due_date, id) keyset order
+            models.Index(
+                fields=['course', 'due_date', 'id'],
+                condition=models.Q(is_completed=False),
+                name='cesar_assign_open_due_idx',
+            ),
+            # Admin: date_hierarchy on due_date
+            models.Index(fields=['due_date'], name='cesar_assign_due_idx'),
+        ]
+    
     @property
     def days_until_due(self):
         from datetime import datetime
@@ -91,5 +113,53 @@ class Grade(models.Model):
     description = models.CharField(max_length=200, blank=True)
     comments = models.TextField(blank=True)
     
+    class Meta:
+        indexes = [
+            # Admin: date_hierarchy on date
+            models.Index(fields=['date'], name='cesar_grade_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.enrollment.user.username} - {self.grade}"
+
+def progress_percent(earned_ects, total_ects_required):
+    """Progress towards a program as an integer percentage"""
+    return int((earned_ects / total_ects_required) * 100) if total_ects_required > 0 else 0
+
+
+class ProgramProgress(models.Model):
+    """
+    Denormalized earned ECTS and progress per (user, program).
+    Kept up to date by the Enrollment/Course/Program signals in signals.py;
+    bulk writes bypass signals, so run `manage.py rebuild_program_progress` after them.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='program_progress')
+    program = models.ForeignKey(Program, on_delete=models.CASCADE, related_name='progress_rows')
+    earned_ects = models.IntegerField(default=0)
+    progress = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('user', 'program')
+    
+    @classmethod
+    def refresh(cls, user_id, program_id):
+        """Recompute the row of one (user, program) pair, deleting it when no enrollments are left"""
+        totals = Enrollment.objects.filter(user_id=user_id, course__program_id=program_id).aggregate(
+            enrollments=models.Count('id'),
+            earned=models.Sum('course__ects', filter=models.Q(is_passed=True)),
+        )
+        if not totals['enrollments']:
+            cls.objects.filter(user_id=user_id, program_id=program_id).delete()
+            return None
+        
+        earned = totals['earned'] or 0
+        total_required = Program.objects.values_list('total_ects_required', flat=True).get(pk=program_id)
+        row, _ = cls.objects.update_or_create(
+            user_id=user_id, program_id=program_id,
+            defaults={'earned_ects': earned, 'progress': progress_percent(earned, total_required)},
+        )
+        return row
+    
     def __str__(self):
-        return f"{self.enrollment.user.username} - {self.grade}"
\ No newline at end of file
+        return f"{self.user.username} - {self.program.name}: {self.earned_ects} ECTS"
@@ -0,0 +1,61 @@
+"""
+Keyset (seek) pagination for the Study Planner lists.
+
+Instead of OFFSET, each page continues strictly after the last row of the
+previous one, (f1, f2) > (v1, v2), so the cost of a page does not grow with
+how far into the list it is. The position travels as an opaque cursor.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(obj, fields):
+    """Cursor pointing just after obj in an ordering by fields"""
+    values = [getattr(obj, name) for name in fields]
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, model, fields):
+    """Field values stored in a cursor, converted back through the model fields"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(raw, list) or len(raw) != len(fields):
+            raise ValueError("wrong number of values")
+        return [model._meta.get_field(name).to_python(value) for name, value in zip(fields, raw)]
+    except (ValueError, TypeError, ValidationError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+def keyset_page(queryset, fields, cursor=None, page_size=10):
+    """
+    One page of queryset ordered ascending by fields (the last one must be
+    unique, e.g. 'id'). An invalid cursor starts from the first page.
+    
+    Returns:
+        (items, next_cursor) with next_cursor None on the last page
+    """
+    if cursor:
+        try:
+            values = decode_cursor(cursor, queryset.model, fields)
+        except ValueError:
+            values = None
+        if values is not None:
+            # (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ...
+            after = Q()
+            for i, name in enumerate(fields):
+                step = Q(**{f'{name}__gt': values[i]})
+                for previous, value in zip(fields[:i], values[:i]):
+                    step &= Q(**{previous: value})
+                after |= step
+            queryset = queryset.filter(after)
+    
+    # One extra row tells whether there is a next page
+    items = list(queryset.order_by(*fields)[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+    items = items[:page_size]
+    return items, encode_cursor(items[-1], fields)
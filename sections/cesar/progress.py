@@ -0,0 +1,43 @@
+"""
+ProgramProgress maintenance in bulk: recompute the denormalized summary rows
+from Enrollment with one grouped aggregate query.
+"""
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from .models import Enrollment, Program, ProgramProgress, progress_percent
+
+
+BATCH_SIZE = 5000
+
+
+def rebuild_program_progress(user_ids=None):
+    """
+    Recompute every ProgramProgress row (or those of the given users) with one
+    grouped aggregate query and write them back with bulk_create.
+    Returns the number of rows written.
+    """
+    enrollments = Enrollment.objects.all()
+    rows = ProgramProgress.objects.all()
+    if user_ids is not None:
+        enrollments = enrollments.filter(user_id__in=user_ids)
+        rows = rows.filter(user_id__in=user_ids)
+
+    totals = enrollments.values('user_id', 'course__program_id').annotate(
+        enrollments=Count('id'),
+        earned=Sum('course__ects', filter=Q(is_passed=True)),
+    ).order_by()
+    required = dict(Program.objects.values_list('id', 'total_ects_required'))
+
+    with transaction.atomic():
+        rows.delete()
+        created = ProgramProgress.objects.bulk_create((
+            ProgramProgress(
+                user_id=total['user_id'],
+                program_id=total['course__program_id'],
+                earned_ects=total['earned'] or 0,
+                progress=progress_percent(total['earned'] or 0, required[total['course__program_id']]),
+            )
+            for total in totals
+        ), batch_size=BATCH_SIZE)
+    return len(created)
@@ -3,11 +3,112 @@ Schmidt Rank Calculator - Mathematical Functions
 Calculates Schmidt rank and decomposition for bipartite quantum states
 """
 
+import copy
+import hashlib
+import io
+import warnings
+from collections import OrderedDict
+from itertools import combinations
+from pathlib import Path
+
 import numpy as np
 from scipy.linalg import svd
+from scipy.sparse.linalg import svds
+
+
+# Matrices whose smaller side is at most this size always use the full SVD
+AUTO_FULL_MAX_DIM = 512
+# Number of Schmidt coefficients kept by the truncated methods when k is not given
+DEFAULT_TRUNCATION_K = 64
+# Below this k the Lanczos solver beats randomized range finding
+AUTO_LANCZOS_MAX_K = 16
+# Aspect ratio (large side / small side) from which the Gram path is used
+AUTO_GRAM_MIN_ASPECT = 64
+# ...but only for matrices at least this large; below it the full SVD is as fast
+# and has no sqrt(eps) noise floor on small Schmidt coefficients
+AUTO_GRAM_MIN_SIZE = 2 ** 14
+# Number of large-side columns (or rows) accumulated per Gram chunk
+GRAM_CHUNK_SIZE = 4096
+
+SVD_METHODS = ('auto', 'full', 'randomized', 'lanczos', 'gram')
+
+
+def _singular_values_full(state_matrix):
+    """All singular values through a dense SVD"""
+    return svd(state_matrix, full_matrices=False, compute_uv=False)
+
+
+def _singular_values_randomized(state_matrix, k, oversampling=10, power_iterations=2, seed=0):
+    """
+    Top-k singular values through randomized range finding
+    (Halko, Martinsson, Tropp). Power iterations sharpen slowly decaying spectra.
+    """
+    dim_a, dim_b = state_matrix.shape
+    n_samples = min(k + oversampling, dim_a, dim_b)
+    rng = np.random.default_rng(seed)
+    omega = rng.standard_normal((dim_b, n_samples))
+    if np.iscomplexobj(state_matrix):
+        omega = omega + 1j * rng.standard_normal((dim_b, n_samples))
+    
+    Q, _ = np.linalg.qr(state_matrix @ omega)
+    for _ in range(power_iterations):
+        Q, _ = np.linalg.qr(state_matrix.conj().T @ Q)
+        Q, _ = np.linalg.qr(state_matrix @ Q)
+    
+    # Project onto the captured range and decompose the small matrix
+    small = Q.conj().T @ state_matrix
+    return svd(small, full_matrices=False, compute_uv=False)[:k]
+
+
+def _singular_values_lanczos(state_matrix, k):
+    """Top-k singular values through ARPACK (scipy.sparse.linalg.svds)"""
+    k = min(k, min(state_matrix.shape) - 1)
+    singular_values = svds(state_matrix, k=k, return_singular_vectors=False)
+    return np.sort(singular_values)[::-1]
+
+
+def _singular_values_gram(state_matrix, chunk_size=GRAM_CHUNK_SIZE):
+    """
+    Singular values from the reduced density matrix of the smaller subsystem.
+    
+    rho = M M† (or M† M when B is the smaller side) is accumulated chunk by
+    chunk over the large side, so besides the small rho only one chunk of the
+    state is ever materialized. Eigenvalues are squared singular values, which
+    puts the numerical noise floor at sqrt(eps) instead of eps; eigenvalues
+    below that floor are reported as exact zeros.
+    """
+    dim_a, dim_b = state_matrix.shape
+    if dim_a > dim_b:
+        # Work on M^T so the accumulated rho is always the small side
+        state_matrix = state_matrix.T
+        dim_a, dim_b = dim_b, dim_a
+    
+    rho = np.zeros((dim_a, dim_a), dtype=np.result_type(state_matrix.dtype, np.float64))
+    for start in range(0, dim_b, chunk_size):
+        block = np.asarray(state_matrix[:, start:start + chunk_size])
+        rho += block @ block.conj().T
+    
+    eigenvalues = np.linalg.eigvalsh(rho)[::-1]
+    noise_floor = dim_a * np.finfo(np.float64).eps * max(eigenvalues[0], 0.0)
+    eigenvalues[eigenvalues <= noise_floor] = 0.0
+    return np.sqrt(eigenvalues)
+
 
+def _choose_svd_method(dim_a, dim_b, k):
+    """Pick an SVD method from the matrix size and the requested k"""
+    min_dim = min(dim_a, dim_b)
+    max_dim = max(dim_a, dim_b)
+    if (min_dim <= AUTO_FULL_MAX_DIM and max_dim >= AUTO_GRAM_MIN_ASPECT * min_dim
+            and min_dim * max_dim >= AUTO_GRAM_MIN_SIZE):
+        return 'gram'
+    if min_dim <= AUTO_FULL_MAX_DIM or (k is not None and 2 * k >= min_dim):
+        return 'full'
+    if (k or DEFAULT_TRUNCATION_K) <= AUTO_LANCZOS_MAX_K:
+        return 'lanczos'
+    return 'randomized'
 
-def calculate_schmidt_rank(state_vector, dim_a, dim_b):
+
+def calculate_schmidt_rank(state_vector, dim_a, dim_b, method='auto', k=None, tolerance=1e-10):
     """
     Calculate Schmidt rank and decomposition.
     
@@ -15,21 +116,43 @@ def calculate_schmidt_rank(state_vector, dim_a, dim_b):
         state_vector: numpy array of state vector
         dim_a: dimension of subsystem A
         dim_b: dimension of subsystem B
+        method: 'full', 'randomized', 'lanczos', 'gram' or 'auto' (chosen from matrix size)
+        k: number of top Schmidt coefficients kept by the truncated methods
+        tolerance: coefficients above this value count towards the rank
     
     Returns:
-        dict with schmidt_rank, coefficients, entropy, is_entangled
+        dict with schmidt_rank, coefficients, entropy, is_entangled, and
+        method, requested_method, method_overridden (an explicit truncated
+        method fell back to 'full' because k >= min(dim_a, dim_b)),
+        is_truncated, rank_is_lower_bound, entropy_is_lower_bound
     """
+    if method not in SVD_METHODS:
+        raise ValueError(f"Unknown SVD method '{method}', expected one of {', '.join(SVD_METHODS)}")
+    if k is not None and k < 1:
+        raise ValueError("k must be a positive integer")
+    requested_method = method
+    if method == 'auto':
+        method = _choose_svd_method(dim_a, dim_b, k)
+    
     # Reshape to matrix
     state_matrix = state_vector.reshape(dim_a, dim_b)
     
-    # Singular Value Decomposition
-    U, singular_values, Vh = svd(state_matrix, full_matrices=False)
-    
-    # Schmidt coefficients = singular values
-    schmidt_coeffs = singular_values
+    # Singular Value Decomposition, Schmidt coefficients = singular values
+    min_dim = min(dim_a, dim_b)
+    if method == 'gram':
+        schmidt_coeffs = _singular_values_gram(state_matrix)
+    elif method == 'full' or (k or DEFAULT_TRUNCATION_K) >= min_dim:
+        # A truncated method cannot keep k >= min_dim coefficients; an explicit
+        # request is still answered with the full SVD, but reported as overridden
+        method = 'full'
+        schmidt_coeffs = _singular_values_full(state_matrix)
+    elif method == 'randomized':
+        schmidt_coeffs = _singular_values_randomized(state_matrix, k or DEFAULT_TRUNCATION_K)
+    else:
+        schmidt_coeffs = _singular_values_lanczos(state_matrix, k or DEFAULT_TRUNCATION_K)
+    is_truncated = len(schmidt_coeffs) < min_dim
     
     # Count non-zero coefficients (Schmidt rank)
-    tolerance = 1e-10
     schmidt_rank = np.sum(schmidt_coeffs > tolerance)
     
     # Entanglement check
@@ -40,34 +163,458 @@ def calculate_schmidt_rank(state_vector, dim_a, dim_b):
     probs = nonzero_coeffs ** 2
     entropy = -np.sum(probs * np.log2(probs + 1e-15))
     
+    # With a truncated spectrum every kept coefficient may be non-zero while the
+    # discarded tail is not; both rank and entropy are then only lower bounds
+    rank_is_lower_bound = bool(is_truncated and schmidt_rank == len(schmidt_coeffs))
+    
     return {
         'schmidt_rank': int(schmidt_rank),
         'coefficients': schmidt_coeffs.tolist(),
         'is_entangled': bool(is_entangled),
-        'entropy': float(entropy)
+        'entropy': float(entropy),
+        'method': method,
+        'requested_method': requested_method,
+        'method_overridden': requested_method not in ('auto', method),
+        'is_truncated': bool(is_truncated),
+        'rank_is_lower_bound': rank_is_lower_bound,
+        'entropy_is_lower_bound': rank_is_lower_bound,
+        'discarded_weight': float(max(0.0, 1.0 - np.sum(probs))) if is_truncated else 0.0,
     }
 
 
+# Result cache in front of calculate_schmidt_rank
+SCHMIDT_CACHE_SIZE = 256
+# Amplitudes are rounded to this many decimals before hashing, so near-identical
+# resubmissions (e.g. 0.70710678 vs 1/sqrt(2) after normalization) share an entry
+CACHE_HASH_DECIMALS = 8
+# States larger than this are not cached, hashing them would cost a full copy
+CACHE_MAX_STATE_SIZE = 2 ** 16
+
+
+class SchmidtCache:
+    """Bounded LRU cache of Schmidt results keyed by a content hash"""
+    
+    def __init__(self, maxsize=SCHMIDT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key):
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+    
+    def put(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+    
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+        }
+
+
+schmidt_cache = SchmidtCache()
+
+
+def state_hash(state_vector, dim_a, dim_b, *options):
+    """Content hash of a state: quantized complex128 amplitudes plus dims and options"""
+    # Adding 0.0 turns -0.0 into 0.0 so both hash the same
+    quantized = np.round(np.asarray(state_vector, dtype=np.complex128), CACHE_HASH_DECIMALS) + 0.0
+    digest = hashlib.blake2b(quantized.tobytes(), digest_size=16)
+    digest.update(repr((dim_a, dim_b) + options).encode())
+    return digest.hexdigest()
+
+
+def cached_calculate_schmidt_rank(state_vector, dim_a, dim_b, method='auto', k=None, tolerance=1e-10):
+    """
+    calculate_schmidt_rank behind the LRU result cache.
+    Returns a copy, so callers may modify the result freely.
+    """
+    if len(state_vector) > CACHE_MAX_STATE_SIZE:
+        return calculate_schmidt_rank(state_vector, dim_a, dim_b, method=method, k=k, tolerance=tolerance)
+    
+    key = state_hash(state_vector, dim_a, dim_b, method, k, tolerance)
+    result = schmidt_cache.get(key)
+    if result is None:
+        result = calculate_schmidt_rank(state_vector, dim_a, dim_b, method=method, k=k, tolerance=tolerance)
+        schmidt_cache.put(key, result)
+    return copy.deepcopy(result)
+
+
+def calculate_schmidt_rank_batch(state_vectors, dim_a, dim_b):
+    """
+    Calculate Schmidt rank and decomposition for a batch of states.
+    
+    All states are reshaped into one (N, dim_a, dim_b) stack and decomposed
+    with a single stacked SVD call instead of N separate ones.
+    
+    Args:
+        state_vectors: numpy array of shape (N, dim_a * dim_b)
+        dim_a: dimension of subsystem A
+        dim_b: dimension of subsystem B
+    
+    Returns:
+        dict with schmidt_ranks, coefficients, entropies, is_entangled (numpy arrays)
+    """
+    state_vectors = np.asarray(state_vectors)
+    if state_vectors.ndim != 2 or state_vectors.shape[1] != dim_a * dim_b:
+        raise ValueError(f"Batch shape {state_vectors.shape} doesn't match (N, {dim_a * dim_b})")
+    
+    # Reshape to a stack of matrices and take only the singular values
+    state_matrices = state_vectors.reshape(-1, dim_a, dim_b)
+    schmidt_coeffs = np.linalg.svd(state_matrices, compute_uv=False)
+    
+    tolerance = 1e-10
+    nonzero = schmidt_coeffs > tolerance
+    schmidt_ranks = np.count_nonzero(nonzero, axis=1)
+    
+    # Von Neumann entropy per state, zero coefficients contribute nothing
+    probs = schmidt_coeffs ** 2
+    entropies = -np.sum(np.where(nonzero, probs * np.log2(probs + 1e-15), 0.0), axis=1)
+    
+    return {
+        'schmidt_ranks': schmidt_ranks,
+        'coefficients': schmidt_coeffs,
+        'is_entangled': schmidt_ranks > 1,
+        'entropies': entropies
+    }
+
+
+def _von_neumann_entropy(schmidt_coeffs, tolerance=1e-10):
+    """Entanglement entropy (bits) from Schmidt coefficients"""
+    nonzero_coeffs = schmidt_coeffs[schmidt_coeffs > tolerance]
+    probs = nonzero_coeffs ** 2
+    return float(-np.sum(probs * np.log2(probs + 1e-15)))
+
+
+def qubit_count(state_vector):
+    """Number of qubits of a 2^n state vector"""
+    n_qubits = int(len(state_vector)).bit_length() - 1
+    if n_qubits < 1 or 2 ** n_qubits != len(state_vector):
+        raise ValueError(f"State vector size ({len(state_vector)}) is not a power of 2")
+    return n_qubits
+
+
+def entanglement_sweep(state_vector, tolerance=1e-10):
+    """
+    Entanglement entropy across every contiguous cut of an n-qubit state.
+    
+    A single left-to-right sweep (MPS-style canonicalization): the SVD at
+    cut l leaves a left-isometric part, so the singular values of
+    diag(s) Vh reshaped for the next qubit are exactly the Schmidt
+    coefficients of cut l + 1. Coefficients below tolerance are dropped, so
+    the carried matrix only grows with the actual entanglement.
+    
+    Returns:
+        list of dicts with cut (qubits on the left), schmidt_rank, entropy, coefficients
+    """
+    n_qubits = qubit_count(state_vector)
+    remainder = np.asarray(state_vector).reshape(1, -1)
+    
+    profile = []
+    for cut in range(1, n_qubits):
+        bond_dim = remainder.shape[0]
+        remainder = remainder.reshape(bond_dim * 2, -1)
+        _, schmidt_coeffs, Vh = svd(remainder, full_matrices=False)
+        
+        keep = schmidt_coeffs > tolerance
+        if not keep.any():
+            raise ValueError("State vector has zero norm")
+        schmidt_coeffs = schmidt_coeffs[keep]
+        profile.append({
+            'cut': cut,
+            'schmidt_rank': int(len(schmidt_coeffs)),
+            'entropy': _von_neumann_entropy(schmidt_coeffs, tolerance),
+            'coefficients': schmidt_coeffs.tolist(),
+        })
+        
+        # Carry the right factor to the next cut
+        remainder = schmidt_coeffs[:, None] * Vh[keep]
+    
+    return profile
+
+
+def subset_entanglement(state_vector, max_size, tolerance=1e-10):
+    """
+    Entanglement entropy of every qubit subset of size 1..max_size against
+    the rest. Each subset is moved to the front with one transpose and its
+    2^|S| × 2^|S| reduced density matrix is eigendecomposed.
+    
+    Returns:
+        list of dicts with subset (tuple of qubit indices) and entropy
+    """
+    n_qubits = qubit_count(state_vector)
+    if not 1 <= max_size < n_qubits:
+        raise ValueError(f"Subset size must be between 1 and {n_qubits - 1}")
+    tensor = np.asarray(state_vector).reshape((2,) * n_qubits)
+    
+    results = []
+    for size in range(1, max_size + 1):
+        for subset in combinations(range(n_qubits), size):
+            rest = [q for q in range(n_qubits) if q not in subset]
+            state_matrix = tensor.transpose(list(subset) + rest).reshape(2 ** size, -1)
+            rho = state_matrix @ state_matrix.conj().T
+            eigenvalues = np.clip(np.linalg.eigvalsh(rho), 0.0, None)
+            results.append({
+                'subset': subset,
+                'entropy': _von_neumann_entropy(np.sqrt(eigenvalues)[::-1], tolerance),
+            })
+    
+    return results
+
+
+# Largest state that MatrixProductState.to_dense will materialize
+MPS_MAX_DENSE_QUBITS = 24
+
+
+class MatrixProductState:
+    """
+    Matrix Product State of n qubits.
+    
+    tensors[i] has shape (chi_left, 2, chi_right) with chi = 1 at both ends;
+    schmidt_values[i] holds the Schmidt coefficients of the bond between
+    qubit i and i + 1. Memory is O(n·χ²) instead of O(2^n).
+    """
+    
+    def __init__(self, tensors, schmidt_values=None, truncation_error=0.0):
+        self.tensors = tensors
+        self.schmidt_values = schmidt_values
+        self.truncation_error = truncation_error
+    
+    @property
+    def n_qubits(self):
+        return len(self.tensors)
+    
+    @property
+    def bond_dims(self):
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+    
+    @property
+    def memory_bytes(self):
+        return sum(tensor.nbytes for tensor in self.tensors)
+    
+    @classmethod
+    def from_dense(cls, state_vector, max_bond_dim=None, tolerance=1e-10):
+        """
+        Build an MPS by successive truncated SVDs from left to right.
+        At every bond at most max_bond_dim coefficients above tolerance are
+        kept; the discarded weight is summed into truncation_error, which
+        bounds the infidelity 1 - |⟨original|mps⟩|². A truncated MPS is then
+        canonicalized, so it is normalized again and schmidt_values are the
+        exact (unit-norm) spectra of the state it represents.
+        """
+        n_qubits = qubit_count(state_vector)
+        remainder = np.asarray(state_vector, dtype=np.complex128).reshape(1, -1)
+        
+        tensors, schmidt_values, truncation_error = [], [], 0.0
+        for _ in range(n_qubits - 1):
+            bond_dim = remainder.shape[0]
+            U, singular_values, Vh = svd(remainder.reshape(bond_dim * 2, -1), full_matrices=False)
+            singular_values, kept, discarded = _truncate_spectrum(singular_values, max_bond_dim, tolerance)
+            truncation_error += discarded
+            tensors.append(U[:, :kept].reshape(bond_dim, 2, kept))
+            schmidt_values.append(singular_values)
+            remainder = singular_values[:, None] * Vh[:kept]
+        tensors.append(remainder.reshape(remainder.shape[0], 2, 1))
+        
+        mps = cls(tensors, schmidt_values, truncation_error)
+        if truncation_error > 0:
+            # Later truncations also change the spectra at earlier bonds
+            mps.canonicalize(tolerance=tolerance)
+        return mps
+    
+    @classmethod
+    def from_family(cls, family, n_qubits, max_bond_dim=None):
+        """
+        Build a named n-qubit state directly as an MPS, without ever
+        allocating 2^n amplitudes: 'zero' |0..0⟩, 'plus' |+..+⟩,
+        'ghz' (|0..0⟩ + |1..1⟩)/√2 and 'w' (|10..0⟩ + ... + |0..01⟩)/√n.
+        """
+        if n_qubits < 2:
+            raise ValueError("An MPS needs at least 2 qubits")
+        
+        if family == 'zero':
+            site = np.array([1.0, 0.0]).reshape(1, 2, 1)
+            tensors = [site] * n_qubits
+        elif family == 'plus':
+            site = np.full((1, 2, 1), 1 / np.sqrt(2))
+            tensors = [site] * n_qubits
+        elif family == 'ghz':
+            # Bond index remembers the bit shared by every qubit
+            middle = np.zeros((2, 2, 2))
+            middle[0, 0, 0] = middle[1, 1, 1] = 1.0
+            tensors = [middle[:1] + middle[1:]] + [middle] * (n_qubits - 2) + [middle.sum(axis=2, keepdims=True)]
+            tensors[0] = tensors[0] / np.sqrt(2)
+        elif family == 'w':
+            # Bond index remembers whether the single 1 has been placed yet
+            middle = np.zeros((2, 2, 2))
+            middle[0, 0, 0] = middle[0, 1, 1] = middle[1, 0, 1] = 1.0
+            last = np.zeros((2, 2, 1))
+            last[0, 1, 0] = last[1, 0, 0] = 1.0
+            tensors = [middle[:1] / np.sqrt(n_qubits)] + [middle] * (n_qubits - 2) + [last]
+        else:
+            raise ValueError(f"Unknown MPS family '{family}'")
+        
+        mps = cls([np.array(tensor, dtype=np.complex128) for tensor in tensors])
+        mps.canonicalize(max_bond_dim)
+        return mps
+    
+    def canonicalize(self, max_bond_dim=None, tolerance=1e-10):
+        """
+        Bring the MPS into canonical form and fill in the Schmidt values:
+        a QR sweep to the right, then an SVD sweep back to the left that
+        truncates every bond to max_bond_dim. Normalizes the state.
+        """
+        tensors = self.tensors
+        for i in range(self.n_qubits - 1):
+            chi_left, _, chi_right = tensors[i].shape
+            Q, R = np.linalg.qr(tensors[i].reshape(chi_left * 2, chi_right))
+            tensors[i] = Q.reshape(chi_left, 2, -1)
+            tensors[i + 1] = np.tensordot(R, tensors[i + 1], axes=(1, 0))
+        
+        schmidt_values = [None] * (self.n_qubits - 1)
+        norm = np.linalg.norm(tensors[-1])
+        if norm < 1e-10:
+            raise ValueError("State vector has zero norm")
+        tensors[-1] = tensors[-1] / norm
+        for i in range(self.n_qubits - 1, 0, -1):
+            chi_left, _, chi_right = tensors[i].shape
+            U, singular_values, Vh = svd(tensors[i].reshape(chi_left, 2 * chi_right), full_matrices=False)
+            singular_values, kept, discarded = _truncate_spectrum(singular_values, max_bond_dim, tolerance)
+            self.truncation_error += discarded
+            if discarded:
+                # Keep the truncated state normalized, like the Schmidt values shown for it
+                singular_values = singular_values / np.linalg.norm(singular_values)
+            tensors[i] = Vh[:kept].reshape(kept, 2, chi_right)
+            tensors[i - 1] = np.tensordot(tensors[i - 1], U[:, :kept] * singular_values, axes=(2, 0))
+            schmidt_values[i - 1] = singular_values
+        self.schmidt_values = schmidt_values
+        return self
+    
+    def amplitudes(self, basis_states):
+        """
+        Amplitudes of the given computational basis states (integers, qubit 0
+        is the most significant bit), contracted for all states at once.
+        """
+        if self.n_qubits > 62:
+            raise ValueError("Integer basis states only cover up to 62 qubits, use amplitude() with a bit string")
+        basis_states = np.atleast_1d(np.asarray(basis_states, dtype=np.int64))
+        shifts = np.arange(self.n_qubits - 1, -1, -1)
+        return self._contract_bits((basis_states[:, None] >> shifts) & 1)
+    
+    def amplitude(self, bitstring):
+        """Amplitude of a single basis state given as a bit string such as '0110'"""
+        if len(bitstring) != self.n_qubits or set(bitstring) - {'0', '1'}:
+            raise ValueError(f"Expected a bit string of {self.n_qubits} zeros and ones")
+        bits = np.frombuffer(bitstring.encode(), dtype=np.uint8) - ord('0')
+        return complex(self._contract_bits(bits[None, :])[0])
+    
+    def _contract_bits(self, bits):
+        """Contract the MPS for every row of a (m, n_qubits) array of bits"""
+        vectors = np.ones((len(bits), 1), dtype=np.complex128)
+        for site, tensor in enumerate(self.tensors):
+            # vectors[m] @ tensor[:, bits[m, site], :] for every m
+            vectors = np.einsum('ml,lmr->mr', vectors, tensor[:, bits[:, site], :])
+        return vectors[:, 0]
+    
+    def to_dense(self):
+        """Contract the full state vector (only for small n)"""
+        if self.n_qubits > MPS_MAX_DENSE_QUBITS:
+            raise ValueError(f"Refusing to build a dense state of {self.n_qubits} qubits")
+        state = self.tensors[0].reshape(2, -1)
+        for tensor in self.tensors[1:]:
+            state = np.tensordot(state, tensor, axes=(1, 0)).reshape(-1, tensor.shape[2])
+        return state.reshape(-1)
+    
+    def entropy_profile(self, tolerance=1e-10):
+        """Entropy at every bond, same format as entanglement_sweep"""
+        return [{
+            'cut': cut,
+            'schmidt_rank': int(np.sum(coeffs > tolerance)),
+            'entropy': _von_neumann_entropy(coeffs, tolerance),
+            'coefficients': coeffs.tolist(),
+        } for cut, coeffs in enumerate(self.schmidt_values, start=1)]
+
+
+def _truncate_spectrum(singular_values, max_bond_dim=None, tolerance=1e-10):
+    """
+    Keep at most max_bond_dim singular values above tolerance (at least one).
+    Returns (kept values, how many were kept, discarded weight).
+    """
+    kept = max(1, int(np.sum(singular_values > tolerance)))
+    if max_bond_dim is not None:
+        kept = min(kept, max_bond_dim)
+    discarded = float(np.sum(singular_values[kept:] ** 2))
+    return singular_values[:kept], kept, discarded
+
+
 def normalize_state(state_vector):
-    """Normalize quantum state vector"""
+    """
+    Normalize quantum state vector.
+    
+    An already normalized input is not copied (large memory-mapped states);
+    it comes back as a read-only view of the caller's array, so writing to the
+    result raises instead of silently changing the source. Copy it to modify.
+    """
     norm = np.linalg.norm(state_vector)
     if norm < 1e-10:
         raise ValueError("State vector has zero norm")
+    if abs(norm - 1) < 1e-12:
+        view = np.asarray(state_vector).view()
+        view.flags.writeable = False
+        return view
     return state_vector / norm
 
 
+def normalize_states(state_vectors):
+    """Normalize every row of a (N, dim) batch of state vectors"""
+    norms = np.linalg.norm(state_vectors, axis=1, keepdims=True)
+    zero_rows = np.flatnonzero(norms[:, 0] < 1e-10)
+    if zero_rows.size:
+        raise ValueError(f"State vector {int(zero_rows[0])} has zero norm")
+    return state_vectors / norms
+
+
 def parse_state_input(input_string):
     """
     Parse state vector from string.
     Supports: "1, 0, 0, 1" or "[1, 0, 0, 1]"
     """
     cleaned = input_string.strip().strip('[]')
+    sep = ',' if ',' in cleaned else ' '
+    parts = cleaned.split(',') if sep == ',' else cleaned.split()
     
-    if ',' in cleaned:
-        parts = cleaned.split(',')
-    else:
-        parts = cleaned.split()
+    # Fast path: numpy parses the whole string (including "a+bj" values) in C.
+    # It skips empty fields (trailing commas) and misreads a bare "j" as -1j,
+    # so its result only counts when every token was read and none is a bare j.
+    if not any(p.strip() in ('j', '+j', '-j') for p in parts):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                state_vector = np.fromstring(cleaned, dtype=complex, sep=sep)
+            except (DeprecationWarning, ValueError):
+                state_vector = None
+        if state_vector is not None and len(state_vector) == len(parts):
+            return state_vector
     
+    # Slow path for anything numpy rejects, e.g. "(1+2j)", with a useful error
     try:
         state_vector = np.array([complex(p.strip()) for p in parts])
     except ValueError as e:
@@ -76,6 +623,87 @@ def parse_state_input(input_string):
     return state_vector
 
 
+def load_state_file(source, dim_a, dim_b):
+    """
+    Load a binary state vector without copying it into memory.
+    
+    Args:
+        source: file path or uploaded file object
+        dim_a: dimension of subsystem A
+        dim_b: dimension of subsystem B
+    
+    .npy files are opened with np.load(mmap_mode='r'), anything else is read as
+    raw complex128 with np.memmap. In-memory uploads are wrapped with
+    np.frombuffer. The result is a flat read-only array that reshapes into the
+    dim_a × dim_b matrix without a copy.
+    """
+    path = None
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        name = path.name
+    else:
+        name = getattr(source, 'name', '') or ''
+        if hasattr(source, 'temporary_file_path'):
+            # Large Django uploads are already spooled to disk
+            path = Path(source.temporary_file_path())
+    is_npy = name.lower().endswith('.npy')
+    
+    try:
+        if path is not None and is_npy:
+            state_vector = np.load(path, mmap_mode='r', allow_pickle=False)
+        elif path is not None:
+            if path.stat().st_size % np.dtype(np.complex128).itemsize:
+                raise ValueError("Raw state file size is not a multiple of 16 bytes (complex128)")
+            state_vector = np.memmap(path, dtype=np.complex128, mode='r')
+        elif is_npy:
+            state_vector = np.load(io.BytesIO(source.read()), allow_pickle=False)
+        else:
+            state_vector = np.frombuffer(source.read(), dtype=np.complex128)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Invalid state file: {e}")
+    
+    if state_vector.dtype.kind not in 'fc':
+        raise ValueError(f"State file must contain real or complex floats, got {state_vector.dtype}")
+    state_vector = state_vector.reshape(-1)
+    if len(state_vector) != dim_a * dim_b:
+        raise ValueError(f"State vector size ({len(state_vector)}) doesn't match dimensions {dim_a}×{dim_b}")
+    
+    return state_vector
+
+
+def parse_batch_input(data):
+    """
+    Parse a batch request payload.
+    Expects {"dim_a": 2, "dim_b": 2, "states": [[...], [...]]}, where each
+    amplitude is a number or a complex string such as "0.5+0.5j".
+    
+    Returns:
+        (state_vectors, dim_a, dim_b) with state_vectors of shape (N, dim_a * dim_b)
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Batch payload must be a JSON object")
+    try:
+        dim_a = int(data.get('dim_a', 2))
+        dim_b = int(data.get('dim_b', 2))
+        states = data['states']
+    except KeyError:
+        raise ValueError("Batch payload is missing 'states'")
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid dimensions: {e}")
+    
+    try:
+        state_vectors = np.asarray(states, dtype=complex)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid state vector format: {e}")
+    
+    if state_vectors.ndim != 2 or state_vectors.shape[0] == 0:
+        raise ValueError("'states' must be a non-empty list of equal-length state vectors")
+    if state_vectors.shape[1] != dim_a * dim_b:
+        raise ValueError(f"State vector size ({state_vectors.shape[1]}) doesn't match dimensions {dim_a}×{dim_b}")
+    
+    return state_vectors, dim_a, dim_b
+
+
 def get_predefined_states():
     """Get dictionary of common quantum states"""
     sqrt2 = np.sqrt(2)
@@ -112,3 +740,18 @@ def get_predefined_states():
             'dims': [2, 2]
         },
     }
+
+
+# Predefined states are built once and their results precomputed at import
+PREDEFINED_STATES = get_predefined_states()
+
+
+def _warm_predefined_cache():
+    for state_info in PREDEFINED_STATES.values():
+        dim_a, dim_b = state_info['dims']
+        cached_calculate_schmidt_rank(normalize_state(state_info['vector']), dim_a, dim_b)
+    # Warming is not real traffic, start the counters from zero
+    schmidt_cache.hits = schmidt_cache.misses = 0
+
+
+_warm_predefined_cache()
@@ -0,0 +1,111 @@
+"""
+Signal handlers that keep the denormalized ProgramProgress rows in sync
+and invalidate the cached weighted GPA.
+Each change only recomputes the (user, program) rows it can affect.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .grades import invalidate_gpa
+from .models import Assignment, Course, Enrollment, Grade, Program, ProgramProgress, progress_percent
+
+
+@receiver(pre_save, sender=Enrollment)
+def remember_previous_program(sender, instance, **kwargs):
+    """Remember the old (user, program) so moving an enrollment refreshes both rows"""
+    instance._previous_progress_key = None
+    if instance.pk:
+        previous = Enrollment.objects.filter(pk=instance.pk).values_list('user_id', 'course__program_id').first()
+        instance._previous_progress_key = previous
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def refresh_enrollment_progress(sender, instance, **kwargs):
+    program_id = Course.objects.values_list('program_id', flat=True).filter(pk=instance.course_id).first()
+    if program_id is not None:
+        ProgramProgress.refresh(instance.user_id, program_id)
+    
+    previous = getattr(instance, '_previous_progress_key', None)
+    if previous and previous != (instance.user_id, program_id):
+        ProgramProgress.refresh(*previous)
+
+
+@receiver(pre_save, sender=Course)
+def remember_previous_course(sender, instance, **kwargs):
+    instance._previous_program_id = None
+    if instance.pk:
+        instance._previous_program_id = Course.objects.values_list('program_id', flat=True).filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Course)
+def refresh_course_progress(sender, instance, created, **kwargs):
+    """ECTS or program changes of a course affect every enrolled user"""
+    if created:
+        return
+    program_ids = {instance.program_id, getattr(instance, '_previous_program_id', None)} - {None}
+    user_ids = Enrollment.objects.filter(course=instance).values_list('user_id', flat=True)
+    for user_id in user_ids:
+        for program_id in program_ids:
+            ProgramProgress.refresh(user_id, program_id)
+
+
+@receiver(post_save, sender=Program)
+def refresh_program_progress(sender, instance, created, **kwargs):
+    """A new ECTS requirement only changes the percentage, not the earned ECTS"""
+    if created:
+        return
+    rows = list(ProgramProgress.objects.filter(program=instance))
+    for row in rows:
+        row.progress = progress_percent(row.earned_ects, instance.total_ects_required)
+    ProgramProgress.objects.bulk_update(rows, ['progress'])
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def invalidate_grade_gpa(sender, instance, **kwargs):
+    user_id = Enrollment.objects.values_list('user_id', flat=True).filter(pk=instance.enrollment_id).first()
+    if user_id is not None:
+        invalidate_gpa(user_id)
+
+
+@receiver(post_save, sender=Assignment)
+def invalidate_assignment_gpa(sender, instance, created, **kwargs):
+    """Assignment weights are part of the GPA of everyone graded on it"""
+    if created:
+        return
+    user_ids = set(Grade.objects.filter(assignment=instance).values_list('enrollment__user_id', flat=True))
+    invalidate_gpa(*user_ids)
+
+
+@receiver(pre_delete, sender=Assignment)
+def remember_assignment_graders(sender, instance, **kwargs):
+    """Deleting an assignment nulls Grade.assignment in a queryset update, no Grade signal fires"""
+    instance._graded_user_ids = set(Grade.objects.filter(assignment=instance).values_list('enrollment__user_id', flat=True))
+
+
+@receiver(post_delete, sender=Assignment)
+def invalidate_deleted_assignment_gpa(sender, instance, **kwargs):
+    """Its grades fall back to the default weight"""
+    invalidate_gpa(*getattr(instance, '_graded_user_ids', ()))
+
+
+@receiver(post_save, sender=Course)
+def invalidate_course_gpa(sender, instance, created, **kwargs):
+    """Course code and program appear in the GPA breakdowns"""
+    if created:
+        return
+    invalidate_gpa(*set(Enrollment.objects.filter(course=instance).values_list('user_id', flat=True)))
+
+
+@receiver(post_save, sender=Enrollment)
+def invalidate_enrollment_gpa(sender, instance, created, **kwargs):
+    """Moving an enrollment to another course moves its grades too"""
+    if not created:
+        invalidate_gpa(instance.user_id)
+
+
+@receiver(post_save, sender=Program)
+def invalidate_program_gpa(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_gpa(*set(Enrollment.objects.filter(course__program=instance).values_list('user_id', flat=True)))
@@ -0,0 +1,727 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .grades import compute_weighted_gpa, get_weighted_gpa
+from .importers import PlannerImporter, RowError
+from .progress import rebuild_program_progress
+from .models import Assignment, Course, Enrollment, Grade, Program, ProgramProgress
+from .mixed_states import analyze_density_matrices, partial_transpose
+from .schmidt import (
+    MatrixProductState, SchmidtCache, cached_calculate_schmidt_rank, calculate_schmidt_rank, entanglement_sweep,
+    load_state_file, normalize_state, parse_state_input, schmidt_cache, subset_entanglement,
+)
+
+
+class App1BatchApiTests(SimpleTestCase):
+    """JSON batch mode of app1: one stacked decomposition for N states"""
+
+    def post_batch(self, payload):
+        return self.client.post(reverse('cesar_app1'), json.dumps(payload), content_type='application/json')
+
+    def test_results_keep_request_order(self):
+        states = [[1, 0, 0, 1], [1, 0, 0, 0], [0.8, 0, 0, 0.6], ['0.5+0.5j', 0, 0, '0.5-0.5j']]
+        response = self.post_batch({'dim_a': 2, 'dim_b': 2, 'states': states})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(data['schmidt_ranks'], [2, 1, 2, 2])
+        self.assertEqual(data['is_entangled'], [True, False, True, True])
+        for state, coefficients in zip(states, data['coefficients']):
+            expected = calculate_schmidt_rank(normalize_state(np.array(state, dtype=complex)), 2, 2, method='full')
+            np.testing.assert_allclose(coefficients, expected['coefficients'], atol=1e-12)
+
+    def test_invalid_items_are_reported(self):
+        response = self.post_batch({'dim_a': 2, 'dim_b': 2, 'states': [[1, 0, 0, 1], [0, 0, 0, 0]]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('State vector 1 has zero norm', response.json()['error'])
+        response = self.post_batch({'dim_a': 2, 'dim_b': 2, 'states': [[1, 0, 0, 1], [1, 0, 0]]})
+        self.assertEqual(response.status_code, 400)
+        response = self.post_batch({'dim_a': 2, 'dim_b': 2, 'states': [[1, 0, 0, 'abc']]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid state vector format', response.json()['error'])
+        response = self.post_batch({'dim_a': 2, 'dim_b': 3, 'states': [[1, 0, 0, 1]]})
+        self.assertIn("doesn't match dimensions 2×3", response.json()['error'])
+
+    def test_normalize_flag_must_be_boolean(self):
+        for payload in ({'dim_a': 2, 'dim_b': 2, 'states': [[1, 0, 0, 1]]},
+                        {'dim_a': 2, 'dim_b': 1, 'density_matrices': [[[1, 0], [0, 0]]]}):
+            response = self.post_batch({**payload, 'normalize': 'false'})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['error'], "'normalize' must be true or false")
+            self.assertEqual(self.post_batch({**payload, 'normalize': False}).status_code, 200)
+
+    def test_batch_file_upload(self):
+        payload = json.dumps({'dim_a': 2, 'dim_b': 4, 'states': [[1, 0, 0, 0, 0, 0, 0, 1], [1, 1, 1, 1, 1, 1, 1, 1]]})
+        upload = SimpleUploadedFile('states.json', payload.encode(), content_type='application/json')
+        response = self.client.post(reverse('cesar_app1'), {'batch_file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['schmidt_ranks'], [2, 1])
+        broken = SimpleUploadedFile('states.json', b'{"states": [', content_type='application/json')
+        self.assertEqual(self.client.post(reverse('cesar_app1'), {'batch_file': broken}).status_code, 400)
+
+
+class GramSchmidtAccuracyTests(SimpleTestCase):
+    """The Gram-matrix path must agree with the full SVD path"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(42)
+
+    def random_state(self, dim_a, dim_b, rank=None):
+        if rank is None:
+            matrix = self.rng.standard_normal((dim_a, dim_b)) + 1j * self.rng.standard_normal((dim_a, dim_b))
+        else:
+            matrix = self.rng.standard_normal((dim_a, rank)) @ self.rng.standard_normal((rank, dim_b))
+        return normalize_state(matrix.ravel())
+
+    def assert_matches_full(self, state_vector, dim_a, dim_b):
+        full = calculate_schmidt_rank(state_vector, dim_a, dim_b, method='full')
+        gram = calculate_schmidt_rank(state_vector, dim_a, dim_b, method='gram')
+        self.assertEqual(gram['schmidt_rank'], full['schmidt_rank'])
+        self.assertEqual(gram['is_entangled'], full['is_entangled'])
+        np.testing.assert_allclose(gram['coefficients'], full['coefficients'], atol=1e-7)
+        self.assertAlmostEqual(gram['entropy'], full['entropy'], places=8)
+
+    def test_small_side_a(self):
+        self.assert_matches_full(self.random_state(4, 4096), 4, 4096)
+
+    def test_small_side_b(self):
+        self.assert_matches_full(self.random_state(2048, 8), 2048, 8)
+
+    def test_rank_deficient(self):
+        self.assert_matches_full(self.random_state(16, 2048, rank=3), 16, 2048)
+
+    def test_product_and_bell_states(self):
+        self.assert_matches_full(normalize_state(np.array([1.0, 0, 0, 0])), 2, 2)
+        self.assert_matches_full(normalize_state(np.array([1.0, 0, 0, 1])), 2, 2)
+
+    def test_auto_picks_gram_for_rectangular_states(self):
+        result = calculate_schmidt_rank(self.random_state(4, 4096), 4, 4096)
+        self.assertEqual(result['method'], 'gram')
+
+    def test_auto_keeps_full_svd_for_tiny_states(self):
+        # Coefficients far below the Gram noise floor must survive on small matrices
+        matrix = np.zeros((2, 128))
+        matrix[0, 0], matrix[1, 1] = 1.0, 1e-9
+        result = calculate_schmidt_rank(normalize_state(matrix.ravel()), 2, 128)
+        self.assertEqual(result['method'], 'full')
+        self.assertEqual(result['schmidt_rank'], 2)
+
+
+class TruncatedSvdAccuracyTests(SimpleTestCase):
+    """Randomized and Lanczos top-k spectra must agree with the full SVD"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(11)
+
+    def low_rank_state(self, dim_a, dim_b, rank):
+        matrix = self.rng.standard_normal((dim_a, rank)) @ self.rng.standard_normal((rank, dim_b))
+        return normalize_state(matrix.ravel())
+
+    def test_low_rank_states_match_full(self):
+        state = self.low_rank_state(600, 700, rank=5)
+        full = calculate_schmidt_rank(state, 600, 700, method='full')
+        for method in ('randomized', 'lanczos'):
+            result = calculate_schmidt_rank(state, 600, 700, method=method, k=10)
+            self.assertEqual(result['method'], method)
+            self.assertEqual(result['schmidt_rank'], full['schmidt_rank'])
+            np.testing.assert_allclose(result['coefficients'][:5], full['coefficients'][:5], atol=1e-9)
+            self.assertAlmostEqual(result['entropy'], full['entropy'], places=8)
+            # The whole spectrum fits in k, so nothing is a lower bound
+            self.assertTrue(result['is_truncated'])
+            self.assertFalse(result['rank_is_lower_bound'])
+            self.assertAlmostEqual(result['discarded_weight'], 0.0, places=9)
+
+    def test_full_rank_state_is_a_lower_bound(self):
+        # Full rank with a geometrically decaying spectrum
+        u, _ = np.linalg.qr(self.rng.standard_normal((600, 600)))
+        v, _ = np.linalg.qr(self.rng.standard_normal((600, 600)))
+        state = normalize_state(((u * 0.8 ** np.arange(600)) @ v).ravel())
+        full = calculate_schmidt_rank(state, 600, 600, method='full')
+        for method in ('randomized', 'lanczos'):
+            result = calculate_schmidt_rank(state, 600, 600, method=method, k=8)
+            self.assertEqual(result['schmidt_rank'], 8)
+            self.assertTrue(result['rank_is_lower_bound'])
+            self.assertTrue(result['entropy_is_lower_bound'])
+            self.assertLess(result['entropy'], full['entropy'])
+            np.testing.assert_allclose(result['coefficients'], full['coefficients'][:8], rtol=1e-6)
+            self.assertAlmostEqual(result['discarded_weight'], 1 - np.sum(np.square(full['coefficients'][:8])), places=9)
+
+    def test_explicit_method_override_is_reported(self):
+        result = calculate_schmidt_rank(normalize_state(np.array([1.0, 0, 0, 1])), 2, 2, method='randomized')
+        self.assertEqual(result['method'], 'full')
+        self.assertTrue(result['method_overridden'])
+        self.assertFalse(calculate_schmidt_rank(normalize_state(np.array([1.0, 0, 0, 1])), 2, 2)['method_overridden'])
+
+
+class StateIngestionTests(SimpleTestCase):
+    """Vectorized text parsing and memory-mapped binary state files"""
+
+    def setUp(self):
+        self.state = normalize_state(np.arange(1, 17) + 1j * np.arange(16))
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_parse_state_input_formats(self):
+        np.testing.assert_array_equal(parse_state_input('[1, 0, 0, 1]'), [1, 0, 0, 1])
+        np.testing.assert_array_equal(parse_state_input('0.5+0.5j 0 0 -1j'), [0.5 + 0.5j, 0, 0, -1j])
+        np.testing.assert_array_equal(parse_state_input('(1+2j), 0'), [1 + 2j, 0])
+        with self.assertRaises(ValueError):
+            parse_state_input('1, abc')
+
+    def test_parse_state_input_matches_complex(self):
+        # numpy's fast path reads a bare j as -1j and skips empty fields
+        np.testing.assert_array_equal(parse_state_input('j, 1'), [1j, 1])
+        np.testing.assert_array_equal(parse_state_input('1 -j'), [1, -1j])
+        with self.assertRaises(ValueError):
+            parse_state_input('1, 0,')
+
+    def test_npy_and_raw_files_are_memory_mapped(self):
+        npy_path = os.path.join(self.tmpdir.name, 'state.npy')
+        raw_path = os.path.join(self.tmpdir.name, 'state.bin')
+        np.save(npy_path, self.state)
+        self.state.tofile(raw_path)
+        for path in (npy_path, raw_path):
+            loaded = load_state_file(path, 4, 4)
+            self.assertIsInstance(loaded, np.memmap)
+            np.testing.assert_array_equal(loaded, self.state)
+            self.assertTrue(np.shares_memory(loaded.reshape(4, 4), loaded))
+
+    def test_normalized_input_is_not_aliased_writably(self):
+        source = np.array([1.0, 0, 0, 0])
+        result = normalize_state(source)
+        self.assertTrue(np.shares_memory(result, source))
+        with self.assertRaises(ValueError):
+            result[0] = 5
+        self.assertEqual(source[0], 1.0)
+        # Inputs that need scaling come back as new arrays
+        scaled = normalize_state(np.array([1.0, 0, 0, 1]))
+        self.assertTrue(scaled.flags.writeable)
+
+    def test_dimension_mismatch(self):
+        raw_path = os.path.join(self.tmpdir.name, 'state.bin')
+        self.state.tofile(raw_path)
+        with self.assertRaises(ValueError):
+            load_state_file(raw_path, 2, 4)
+
+
+class SchmidtCacheTests(SimpleTestCase):
+    """LRU result cache in front of calculate_schmidt_rank"""
+
+    def setUp(self):
+        self.addCleanup(schmidt_cache.clear)
+        schmidt_cache.clear()
+
+    def test_near_identical_states_hit(self):
+        first = cached_calculate_schmidt_rank(normalize_state(np.array([0.707, 0, 0, 0.707])), 2, 2)
+        second = cached_calculate_schmidt_rank(normalize_state(np.array([1, 0, 0, 1])), 2, 2)
+        self.assertEqual(first, second)
+        self.assertEqual((schmidt_cache.hits, schmidt_cache.misses), (1, 1))
+
+    def test_results_are_copies(self):
+        state = normalize_state(np.array([1, 0, 0, 1]))
+        cached_calculate_schmidt_rank(state, 2, 2)['coefficients'].clear()
+        self.assertEqual(len(cached_calculate_schmidt_rank(state, 2, 2)['coefficients']), 2)
+
+    def test_lru_eviction(self):
+        cache = SchmidtCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['size'], 2)
+
+
+class EntanglementSweepTests(SimpleTestCase):
+    """Multipartite sweep must match independent decompositions of each cut"""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.n_qubits = 8
+        self.state = normalize_state(rng.standard_normal(2 ** 8) + 1j * rng.standard_normal(2 ** 8))
+
+    def test_contiguous_cuts_match_full_svd(self):
+        profile = entanglement_sweep(self.state)
+        self.assertEqual([point['cut'] for point in profile], list(range(1, self.n_qubits)))
+        for point in profile:
+            dim_a = 2 ** point['cut']
+            full = calculate_schmidt_rank(self.state, dim_a, 2 ** self.n_qubits // dim_a, method='full')
+            self.assertEqual(point['schmidt_rank'], full['schmidt_rank'])
+            self.assertAlmostEqual(point['entropy'], full['entropy'], places=9)
+
+    def test_subsets_match_contiguous_cuts(self):
+        profile = entanglement_sweep(self.state)
+        subsets = {item['subset']: item['entropy'] for item in subset_entanglement(self.state, 2)}
+        self.assertEqual(len(subsets), 8 + 28)
+        self.assertAlmostEqual(subsets[(0,)], profile[0]['entropy'], places=9)
+        self.assertAlmostEqual(subsets[(0, 1)], profile[1]['entropy'], places=9)
+
+    def test_ghz_profile(self):
+        ghz = np.zeros(2 ** 10)
+        ghz[0] = ghz[-1] = 1 / np.sqrt(2)
+        for point in entanglement_sweep(ghz):
+            self.assertEqual(point['schmidt_rank'], 2)
+            self.assertAlmostEqual(point['entropy'], 1.0, places=9)
+
+
+class MatrixProductStateTests(SimpleTestCase):
+    """Dense <-> MPS conversion, truncation error and directly built families"""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.state = normalize_state(rng.standard_normal(2 ** 9) + 1j * rng.standard_normal(2 ** 9))
+
+    def test_exact_round_trip(self):
+        mps = MatrixProductState.from_dense(self.state)
+        np.testing.assert_allclose(mps.to_dense(), self.state, atol=1e-12)
+        np.testing.assert_allclose(mps.amplitudes(np.arange(2 ** 9)), self.state, atol=1e-12)
+        self.assertAlmostEqual(mps.amplitude('000000101'), self.state[5], places=12)
+        self.assertEqual(mps.truncation_error, 0.0)
+
+    def test_truncation_error_is_reported(self):
+        mps = MatrixProductState.from_dense(self.state, max_bond_dim=4)
+        self.assertLessEqual(max(mps.bond_dims), 4)
+        truncated = mps.to_dense()
+        self.assertAlmostEqual(np.linalg.norm(truncated), 1.0, places=12)
+        infidelity = 1 - abs(np.vdot(self.state, truncated)) ** 2
+        self.assertGreater(infidelity, 0)
+        self.assertLessEqual(infidelity, mps.truncation_error + 1e-12)
+
+    def test_truncated_profile_is_normalized(self):
+        mps = MatrixProductState.from_dense(self.state, max_bond_dim=3)
+        for point, expected in zip(mps.entropy_profile(), entanglement_sweep(mps.to_dense())):
+            self.assertAlmostEqual(np.sum(np.square(point['coefficients'])), 1.0, places=12)
+            self.assertLessEqual(point['schmidt_rank'], 3)
+            self.assertAlmostEqual(point['entropy'], expected['entropy'], places=9)
+
+    def test_bond_cap_below_exact_dimension_is_normalized(self):
+        mps = MatrixProductState.from_family('ghz', 6, max_bond_dim=1)
+        self.assertEqual(max(mps.bond_dims), 1)
+        self.assertAlmostEqual(np.linalg.norm(mps.to_dense()), 1.0, places=12)
+        self.assertAlmostEqual(mps.truncation_error, 0.5, places=12)
+        for point in mps.entropy_profile():
+            self.assertEqual(point['schmidt_rank'], 1)
+            self.assertAlmostEqual(point['entropy'], 0.0, places=12)
+
+    def test_profile_matches_dense_sweep(self):
+        for mps in (MatrixProductState.from_dense(self.state), MatrixProductState.from_dense(self.state).canonicalize()):
+            for point, expected in zip(mps.entropy_profile(), entanglement_sweep(self.state)):
+                self.assertAlmostEqual(point['entropy'], expected['entropy'], places=9)
+
+    def test_families_match_dense_states(self):
+        n_qubits = 6
+        ghz = np.zeros(2 ** n_qubits)
+        ghz[0] = ghz[-1] = 1 / np.sqrt(2)
+        w = np.zeros(2 ** n_qubits)
+        w[[2 ** i for i in range(n_qubits)]] = 1 / np.sqrt(n_qubits)
+        for family, expected in (('ghz', ghz), ('w', w), ('plus', np.full(2 ** n_qubits, 2 ** (-n_qubits / 2)))):
+            mps = MatrixProductState.from_family(family, n_qubits)
+            np.testing.assert_allclose(mps.to_dense(), expected, atol=1e-12)
+
+    def test_form_bounds_qubits(self):
+        url = reverse('cesar_app1')
+        response = self.client.post(url, {'input_method': 'mps', 'mps_family': 'ghz', 'mps_qubits': '1100'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['error'], "Number of qubits must be between 2 and 1000")
+        response = self.client.post(url, {'input_method': 'mps', 'mps_family': 'ghz', 'mps_qubits': '1000'})
+        self.assertIsNone(response.context['error'])
+        self.assertContains(response, '(dense: 2^1004 bytes)')
+
+    def test_large_ghz_without_dense_state(self):
+        mps = MatrixProductState.from_family('ghz', 64)
+        self.assertEqual(max(mps.bond_dims), 2)
+        self.assertAlmostEqual(abs(mps.amplitude('1' * 64)), 1 / np.sqrt(2), places=12)
+        self.assertEqual(mps.amplitude('0' * 63 + '1'), 0)
+        self.assertAlmostEqual(mps.entropy_profile()[31]['entropy'], 1.0, places=9)
+
+
+class MixedStateTests(SimpleTestCase):
+    """Vectorized negativity, concurrence and purity on Werner states"""
+
+    def setUp(self):
+        bell = np.array([1, 0, 0, 1]) / np.sqrt(2)
+        self.ps = np.linspace(0, 1, 21)
+        self.rhos = np.array([p * np.outer(bell, bell) + (1 - p) / 4 * np.eye(4) for p in self.ps])
+
+    def test_werner_states(self):
+        result = analyze_density_matrices(self.rhos, 2, 2)
+        expected = np.maximum(0, (3 * self.ps - 1) / 2)
+        np.testing.assert_allclose(result['concurrences'], expected, atol=1e-9)
+        np.testing.assert_allclose(result['negativities'], expected / 2, atol=1e-9)
+        np.testing.assert_allclose(result['purities'], (1 + 3 * self.ps ** 2) / 4, atol=1e-12)
+        np.testing.assert_array_equal(result['is_entangled'], self.ps > 1 / 3 + 1e-9)
+        self.assertEqual(set(result['timings']), {'validate', 'negativity', 'purity', 'concurrence'})
+
+    def test_partial_transpose_is_an_involution(self):
+        rhos = self.rhos.reshape(-1, 4, 4)
+        np.testing.assert_array_equal(partial_transpose(partial_transpose(rhos, 2, 2), 2, 2), rhos)
+
+    def test_non_hermitian_rejected(self):
+        with self.assertRaises(ValueError):
+            analyze_density_matrices(np.array([[[1, 1], [0, 0]]], dtype=complex), 2, 1)
+
+    def test_negative_eigenvalue_rejected(self):
+        # Hermitian with unit trace, but eigenvalues 1.5 and -0.5
+        rho = np.array([[[0.5, 1], [1, 0.5]]], dtype=complex)
+        with self.assertRaisesRegex(ValueError, 'not positive semidefinite'):
+            analyze_density_matrices(rho, 2, 1, normalize=False)
+
+
+def seed_planner(user, n_programs, n_courses, start=0):
+    """Programs with courses the user is enrolled in, plus assignments and grades"""
+    for p in range(start, start + n_programs):
+        program = Program.objects.create(name=f'Program {p}', university='QIT', degree_type='master', total_ects_required=120)
+        for c in range(n_courses):
+            course = Course.objects.create(program=program, name=f'Course {p}.{c}', code=f'C{p}-{c}', ects=6)
+            enrollment = Enrollment.objects.create(
+                user=user, course=course, semester_year='2026',
+                status='completed' if c % 2 else 'in_progress', is_passed=bool(c % 2),
+            )
+            Assignment.objects.create(course=course, title=f'Task {p}.{c}', due_date=timezone.now() + timedelta(days=c + 1))
+            Grade.objects.create(enrollment=enrollment, grade='4.50')
+
+
+class StudyPlannerDashboardTests(TestCase):
+    """The dashboard must load in a constant number of queries"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('student')
+        self.client.force_login(self.user)
+
+    def dashboard_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('cesar_app2'), params)
+            self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_query_count_is_flat(self):
+        seed_planner(self.user, n_programs=1, n_courses=2)
+        _, small = self.dashboard_queries()
+        seed_planner(self.user, n_programs=5, n_courses=6, start=1)
+        response, large = self.dashboard_queries()
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.context['programs_data']), 6)
+
+    def test_earned_ects_per_program(self):
+        seed_planner(self.user, n_programs=2, n_courses=4)
+        other = User.objects.create_user('other')
+        Enrollment.objects.create(user=other, course=Course.objects.first(), semester_year='2026', is_passed=True)
+        response, _ = self.dashboard_queries()
+        # Courses 1 and 3 of each program are passed, 6 ECTS each
+        self.assertEqual([data['earned_ects'] for data in response.context['programs_data']], [12, 12])
+        self.assertEqual([data['progress'] for data in response.context['programs_data']], [10, 10])
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(reverse('cesar_app2'))
+        self.assertRedirects(response, f"{reverse('cesar_login')}?next={reverse('cesar_app2')}")
+
+    def test_login_redirects_to_dashboard(self):
+        self.client.logout()
+        User.objects.create_user('login', password='pw')
+        response = self.client.post(reverse('cesar_login'), {'username': 'login', 'password': 'pw'})
+        self.assertRedirects(response, reverse('cesar_app2'))
+
+    def test_shows_only_own_data(self):
+        other = User.objects.create_user('other')
+        seed_planner(other, n_programs=1, n_courses=2)
+        response, _ = self.dashboard_queries()
+        self.assertEqual(list(response.context['enrollments']), [])
+        self.assertEqual(list(response.context['upcoming_assignments']), [])
+
+    def test_keyset_pagination(self):
+        # 30 in-progress enrollments and 60 upcoming assignments, 3 and 12 pages
+        seed_planner(self.user, n_programs=1, n_courses=60)
+        pages, seen, cursor = [], [], None
+        while True:
+            response, n_queries = self.dashboard_queries(**({'enrollments_after': cursor} if cursor else {}))
+            pages.append(n_queries)
+            seen += [enrollment.pk for enrollment in response.context['enrollments']]
+            cursor = response.context['enrollments_next']
+            if cursor is None:
+                break
+        expected = Enrollment.objects.filter(user=self.user, status='in_progress').order_by('enrolled_date', 'id')
+        self.assertEqual(seen, list(expected.values_list('pk', flat=True)))
+        self.assertEqual(len(pages), 3)
+        # The first page also fills the GPA cache
+        self.assertEqual(pages[1], pages[2])
+
+        seen, cursor = [], None
+        while True:
+            response, _ = self.dashboard_queries(**({'assignments_after': cursor} if cursor else {}))
+            seen += [(a.due_date, a.pk) for a in response.context['upcoming_assignments']]
+            cursor = response.context['assignments_next']
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 60)
+        self.assertEqual(seen, sorted(seen))
+
+    def test_invalid_cursor_starts_over(self):
+        seed_planner(self.user, n_programs=1, n_courses=2)
+        response, _ = self.dashboard_queries(enrollments_after='not-a-cursor')
+        self.assertEqual(len(response.context['enrollments']), 1)
+
+
+class PlannerAdminTests(TestCase):
+    """Admin changelists must not issue a query per displayed row"""
+
+    CHANGELISTS = ('program', 'course', 'enrollment', 'assignment', 'grade', 'programprogress')
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self, model_name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'admin:cesar_{model_name}_changelist'))
+            self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_query_count_is_flat(self):
+        student = User.objects.create_user('student')
+        seed_planner(student, n_programs=1, n_courses=2)
+        small = {name: self.changelist_queries(name) for name in self.CHANGELISTS}
+        for u in range(5):
+            seed_planner(User.objects.create_user(f'student{u}'), n_programs=2, n_courses=5, start=10 * (u + 1))
+        large = {name: self.changelist_queries(name) for name in self.CHANGELISTS}
+        self.assertEqual(small, large)
+
+    def test_grade_changelist_query_count_is_flat(self):
+        # A handful of grades against more than a full page of them
+        seed_planner(User.objects.create_user('student'), n_programs=1, n_courses=2)
+        small = self.changelist_queries('grade')
+        seed_planner(User.objects.create_user('student2'), n_programs=4, n_courses=25, start=10)
+        self.assertEqual(self.changelist_queries('grade'), small)
+
+    def test_autocomplete_search(self):
+        seed_planner(User.objects.create_user('student'), n_programs=1, n_courses=3)
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'term': 'C0-1', 'app_label': 'cesar', 'model_name': 'grade', 'field_name': 'enrollment',
+        })
+        self.assertEqual([row['text'] for row in response.json()['results']], ['student - C0-1'])
+
+
+class ProgramProgressTests(TestCase):
+    """Signals keep the summary table in sync, the rebuild command reproduces it"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('student')
+        self.program = Program.objects.create(name='QIT', university='QIT', degree_type='master', total_ects_required=60)
+        self.course = Course.objects.create(program=self.program, name='Quantum', code='Q1', ects=6)
+
+    def progress(self, program=None):
+        return ProgramProgress.objects.filter(user=self.user, program=program or self.program).first()
+
+    def test_enrollment_signals(self):
+        enrollment = Enrollment.objects.create(user=self.user, course=self.course, semester_year='2026')
+        self.assertEqual((self.progress().earned_ects, self.progress().progress), (0, 0))
+        enrollment.is_passed = True
+        enrollment.save()
+        self.assertEqual((self.progress().earned_ects, self.progress().progress), (6, 10))
+        enrollment.delete()
+        self.assertIsNone(self.progress())
+
+    def test_course_and_program_changes(self):
+        Enrollment.objects.create(user=self.user, course=self.course, semester_year='2026', is_passed=True)
+        self.course.ects = 12
+        self.course.save()
+        self.assertEqual(self.progress().earned_ects, 12)
+        self.program.total_ects_required = 120
+        self.program.save()
+        self.assertEqual(self.progress().progress, 10)
+
+        other = Program.objects.create(name='CS', university='QIT', degree_type='master', total_ects_required=120)
+        self.course.program = other
+        self.course.save()
+        self.assertIsNone(self.progress())
+        self.assertEqual(self.progress(other).earned_ects, 12)
+
+    def test_rebuild_matches_signals(self):
+        seed_planner(self.user, n_programs=3, n_courses=4)
+        expected = set(ProgramProgress.objects.values_list('user_id', 'program_id', 'earned_ects', 'progress'))
+        ProgramProgress.objects.all().delete()
+        self.assertEqual(rebuild_program_progress(), len(expected))
+        self.assertEqual(set(ProgramProgress.objects.values_list('user_id', 'program_id', 'earned_ects', 'progress')), expected)
+
+
+class ProgramProgressMigrationTests(TransactionTestCase):
+    """Migrating to the summary table backfills it from existing enrollments"""
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('cesar', target)])
+        return executor.loader.project_state([('cesar', target)]).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes('cesar')[0][1])
+
+    def test_backfill(self):
+        apps = self.migrate('0002_planner_indexes')
+        program = apps.get_model('cesar', 'Program').objects.create(
+            name='QIT', university='QIT', degree_type='master', total_ects_required=60,
+        )
+        Course = apps.get_model('cesar', 'Course')
+        Enrollment = apps.get_model('cesar', 'Enrollment')
+        user = apps.get_model('auth', 'User').objects.create(username='student')
+        for code, passed in (('Q1', True), ('Q2', True), ('Q3', False)):
+            course = Course.objects.create(program=program, name=code, code=code, ects=6)
+            Enrollment.objects.create(user=user, course=course, semester_year='2026', is_passed=passed)
+
+        apps = self.migrate('0003_program_progress')
+        rows = apps.get_model('cesar', 'ProgramProgress').objects.values_list('user_id', 'program_id', 'earned_ects', 'progress')
+        self.assertEqual(list(rows), [(user.pk, program.pk, 12, 20)])
+
+
+class WeightedGpaTests(TestCase):
+    """Weighted GPA in SQL, with per-user cache invalidated by Grade changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('student')
+        program = Program.objects.create(name='QIT', university='QIT', degree_type='master')
+        self.course = Course.objects.create(program=program, name='Quantum', code='Q1')
+        self.enrollment = Enrollment.objects.create(user=self.user, course=self.course, semester_year='2026')
+        self.exam = Assignment.objects.create(course=self.course, title='Exam', due_date=timezone.now(), weight=300)
+
+    def test_grade_and_assignment_weights(self):
+        Grade.objects.create(enrollment=self.enrollment, grade='5.00', weight=100, assignment=self.exam)
+        Grade.objects.create(enrollment=self.enrollment, grade='3.00', weight=100)
+        Grade.objects.create(enrollment=self.enrollment, grade='4.00', weight=0)
+        result = compute_weighted_gpa(self.user.pk)
+        # (5 * 300 + 3 * 100) / 400
+        self.assertAlmostEqual(result['gpa'], 4.5)
+        self.assertAlmostEqual(result['by_course'][0]['gpa'], 4.5)
+        self.assertEqual(result['by_program'][0]['name'], 'QIT')
+
+    def test_cache_invalidation(self):
+        grade = Grade.objects.create(enrollment=self.enrollment, grade='3.00')
+        self.assertAlmostEqual(get_weighted_gpa(self.user.pk)['gpa'], 3.0)
+        with self.assertNumQueries(0):
+            get_weighted_gpa(self.user.pk)
+        grade.grade = '4.00'
+        grade.save()
+        self.assertAlmostEqual(get_weighted_gpa(self.user.pk)['gpa'], 4.0)
+        grade.delete()
+        self.assertIsNone(get_weighted_gpa(self.user.pk)['gpa'])
+
+    def test_deleting_assignment_invalidates_gpa(self):
+        Grade.objects.create(enrollment=self.enrollment, grade='5.00', assignment=self.exam)
+        Grade.objects.create(enrollment=self.enrollment, grade='3.00')
+        # (5 * 300 + 3 * 100) / 400
+        self.assertAlmostEqual(get_weighted_gpa(self.user.pk)['gpa'], 4.5)
+        self.exam.delete()
+        # Both grades now carry the default weight of 100
+        self.assertAlmostEqual(get_weighted_gpa(self.user.pk)['gpa'], 4.0)
+
+
+class PlannerImportTests(TestCase):
+    """Bulk import resolves foreign keys in memory and keeps derived tables in sync"""
+
+    def setUp(self):
+        cache.clear()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def import_all(self, importer=None):
+        importer = importer or PlannerImporter(chunk_size=2, create_users=True)
+        files = [
+            ('programs', self.write('programs.csv', 'name,university,degree_type,total_ects_required\nQIT,Uni,master,60\nBad,Uni,doctor,60\n')),
+            ('courses', self.write('courses.csv', 'program,code,name,ects\nQIT,Q1,Quantum,6\nQIT,Q2,Info,12\nNope,Q3,X,6\n')),
+            ('enrollments', self.write('enrollments.jsonl', '\n'.join([
+                '{"username": "ada", "course": "Q1", "semester_year": "2026", "is_passed": true}',
+                '{"username": "ada", "course": "Q2", "semester_year": "2026"}',
+                '{"username": "bob", "course": "Q1", "semester_year": "2026", "is_passed": "yes"}',
+                'not json',
+            ]))),
+            ('assignments', self.write('assignments.csv', 'course,title,due_date,weight\nQ1,Exam,2026-12-01,300\n')),
+            ('grades', self.write('grades.csv', 'username,course,assignment,grade\nada,Q1,Exam,5.00\nada,Q2,,3.00\nbob,Q2,,4.00\n')),
+        ]
+        all_stats = [importer.import_file(path, model) for model, path in files]
+        importer.refresh_derived()
+        return {stats.model: stats for stats in all_stats}
+
+    def test_assignment_weight_change_invalidates_gpa(self):
+        self.import_all()
+        ada = User.objects.get(username='ada').pk
+        # (5 * 300 + 3 * 100) / 400
+        self.assertAlmostEqual(get_weighted_gpa(ada)['gpa'], 4.5)
+        importer = PlannerImporter()
+        importer.import_file(self.write('weights.csv', 'course,title,due_date,weight\nQ1,Exam,2026-12-01,100\n'), 'assignments')
+        importer.refresh_derived()
+        self.assertIn(ada, importer.touched_user_ids)
+        self.assertAlmostEqual(get_weighted_gpa(ada)['gpa'], 4.0)
+
+    def import_generated(self, prefix, n_rows):
+        """Import n_rows of every model (one chunk each) and return the number of queries"""
+        files = [
+            ('programs', 'programs.csv', 'name,university,degree_type,total_ects_required\n'
+             + ''.join(f'{prefix}P{i},Uni,master,60\n' for i in range(n_rows))),
+            ('courses', 'courses.csv', 'program,code,name,ects\n'
+             + ''.join(f'{prefix}P{i},{prefix}C{i},Course,6\n' for i in range(n_rows))),
+            ('enrollments', 'enrollments.csv', 'username,course,semester_year,is_passed\n'
+             + ''.join(f'{prefix}u{i},{prefix}C{i},2026,true\n' for i in range(n_rows))),
+            ('assignments', 'assignments.csv', 'course,title,due_date,weight\n'
+             + ''.join(f'{prefix}C{i},Exam,2026-12-01,300\n' for i in range(n_rows))),
+            ('grades', 'grades.csv', 'username,course,assignment,grade\n'
+             + ''.join(f'{prefix}u{i},{prefix}C{i},Exam,4.00\n' for i in range(n_rows))),
+        ]
+        importer = PlannerImporter(create_users=True)
+        with CaptureQueriesContext(connection) as queries:
+            for model, name, content in files:
+                stats = importer.import_file(self.write(f'{prefix}{name}', content), model)
+                self.assertEqual((stats.created, stats.errors), (n_rows, []))
+            importer.refresh_derived()
+        return len(queries)
+
+    def test_query_count_is_flat(self):
+        # Map loads plus a few queries per chunk, never one per row
+        small = self.import_generated('a', 2)
+        large = self.import_generated('b', 40)
+        self.assertEqual(small, large)
+        self.assertEqual(ProgramProgress.objects.count(), 42)
+
+    def test_import_pipeline(self):
+        stats = self.import_all()
+        self.assertEqual([(s.created, len(s.errors)) for s in stats.values()], [(1, 1), (2, 1), (3, 1), (1, 0), (2, 1)])
+        self.assertEqual(Enrollment.objects.count(), 3)
+
+        ada = User.objects.get(username='ada')
+        progress = ProgramProgress.objects.get(user=ada)
+        self.assertEqual((progress.earned_ects, progress.progress), (6, 10))
+        # (5 * 300 + 3 * 100) / 400
+        self.assertAlmostEqual(get_weighted_gpa(ada.pk)['gpa'], 4.5)
+
+    def test_reimport_updates_instead_of_duplicating(self):
+        self.import_all()
+        stats = self.import_all()
+        self.assertEqual(stats['courses'].updated, 2)
+        self.assertEqual(stats['enrollments'].created, 0)
+        self.assertEqual(Course.objects.count(), 2)
+
+    def test_strict_mode(self):
+        path = self.write('programs.csv', 'name,university,degree_type\nBad,Uni,doctor\n')
+        with self.assertRaises(RowError):
+            PlannerImporter().import_file(path, strict=True)
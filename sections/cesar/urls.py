@@ -1,9 +1,14 @@
-from django.urls import path
+from django.contrib.auth import views as auth_views
+from django.urls import path, reverse_lazy
 from . import views
 
 urlpatterns = [
     path("", views.index, name="cesar_index"),
     path("app1/", views.app1, name="cesar_app1"),
+    path("app1/cache/", views.app1_cache_stats, name="cesar_app1_cache"),
     path("app2/", views.app2, name="cesar_app2"),
+    path("login/", auth_views.LoginView.as_view(
+        template_name="cesar/login.html", next_page=reverse_lazy("cesar_app2"),
+    ), name="cesar_login"),
     path("app3/", views.app3, name="cesar_app3"),
 ]
@@ -1,12 +1,49 @@
+import json
+import time
+from pathlib import Path
+
+from django.conf import settings
 from django.shortcuts import render
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
-from django.db.models import Sum, Avg
 from django.utils import timezone
-from django.contrib.auth.models import User
+from django.contrib.auth.decorators import login_required
+
+from .schmidt import (
+    cached_calculate_schmidt_rank, calculate_schmidt_rank_batch, normalize_state, normalize_states,
+    parse_state_input, parse_batch_input, load_state_file, schmidt_cache, PREDEFINED_STATES,
+    entanglement_sweep, subset_entanglement, MatrixProductState,
+)
+from .mixed_states import analyze_density_matrices, parse_density_batch
+from .grades import get_weighted_gpa
+from .pagination import keyset_page
+from .models import Program, Course, Enrollment, Assignment, Grade, ProgramProgress
+
+
+# Directory that server-side state files can be referenced from (app1 "file" input)
+STATE_FILE_ROOT = Path(getattr(settings, 'CESAR_STATE_FILE_ROOT', Path(settings.BASE_DIR) / 'state_files'))
+
+# Larger state vectors are summarized instead of printed in the result table
+STATE_DISPLAY_LIMIT = 64
 
-from .schmidt import calculate_schmidt_rank, normalize_state, parse_state_input, get_predefined_states
-from .models import Program, Course, Enrollment, Assignment, Grade
+# Qubits accepted by the MPS family input (memory grows linearly, not as 2^n)
+MPS_MAX_QUBITS = 1000
+# Beyond this many qubits the dense size is shown as a power of two instead of filesizeformat
+DENSE_BYTES_MAX_QUBITS = 60
+
+# Study Planner list page sizes
+ENROLLMENTS_PAGE_SIZE = 10
+ASSIGNMENTS_PAGE_SIZE = 5
+
+
+def _resolve_state_file(name):
+    """Resolve a referenced state file name inside STATE_FILE_ROOT"""
+    root = STATE_FILE_ROOT.resolve()
+    path = (root / name).resolve()
+    if root not in path.parents or not path.is_file():
+        raise ValueError(f"State file '{name}' not found")
+    return path
 
 
 def index(request):
@@ -22,7 +59,217 @@ def index(request):
     return HttpResponse(html)
 
 
+@csrf_exempt
 def app1(request):
+    """
+    Entry point for the Schmidt Rank Calculator.
+    JSON bodies and uploaded batch files go to the batch API, everything
+    else is the regular (CSRF protected) form.
+    """
+    if request.method == 'POST' and (
+        request.content_type == 'application/json' or 'batch_file' in request.FILES
+    ):
+        return app1_batch(request)
+    return app1_form(request)
+
+
+def _payload_flag(data, name, default):
+    """Boolean batch option; "false" would be truthy, so only JSON true/false are accepted"""
+    value = data.get(name, default)
+    if not isinstance(value, bool):
+        raise ValueError(f"'{name}' must be true or false")
+    return value
+
+
+def app1_batch(request):
+    """
+    Batch API, returns JSON for N states in one call.
+    Payloads with 'states' get the pure-state Schmidt decomposition, payloads
+    with 'density_matrices' the mixed-state measures.
+    """
+    try:
+        start = time.perf_counter()
+        if 'batch_file' in request.FILES:
+            data = json.load(request.FILES['batch_file'])
+        else:
+            data = json.loads(request.body)
+        if isinstance(data, dict) and 'density_matrices' in data:
+            return _density_batch(data, (time.perf_counter() - start) * 1000)
+        state_vectors, dim_a, dim_b = parse_batch_input(data)
+        if _payload_flag(data, 'normalize', True):
+            state_vectors = normalize_states(state_vectors)
+        result = calculate_schmidt_rank_batch(state_vectors, dim_a, dim_b)
+    except (ValueError, UnicodeDecodeError) as e:
+        # json.JSONDecodeError is a ValueError subclass
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    return JsonResponse({
+        'count': len(state_vectors),
+        'dim_a': dim_a,
+        'dim_b': dim_b,
+        'schmidt_ranks': result['schmidt_ranks'].tolist(),
+        'coefficients': result['coefficients'].tolist(),
+        'is_entangled': result['is_entangled'].tolist(),
+        'entropies': result['entropies'].tolist(),
+    })
+
+
+def _density_batch(data, load_ms):
+    """Mixed-state part of the batch API: negativity, concurrence and purity"""
+    start = time.perf_counter()
+    rhos, dim_a, dim_b = parse_density_batch(data)
+    parse_ms = (time.perf_counter() - start) * 1000
+    
+    result = analyze_density_matrices(rhos, dim_a, dim_b, normalize=_payload_flag(data, 'normalize', True))
+    timings = {'load_json': load_ms, 'parse': parse_ms, **result['timings']}
+    concurrences = result['concurrences']
+    
+    return JsonResponse({
+        'count': len(rhos),
+        'dim_a': dim_a,
+        'dim_b': dim_b,
+        'negativities': result['negativities'].tolist(),
+        'log_negativities': result['log_negativities'].tolist(),
+        'purities': result['purities'].tolist(),
+        'concurrences': concurrences.tolist() if concurrences is not None else None,
+        'is_entangled': result['is_entangled'].tolist(),
+        'timings_ms': timings,
+    })
+
+
+def _svd_options(request):
+    """SVD options (method, top-k, tolerance) from the app1 form"""
+    method = request.POST.get('method', 'auto')
+    k = request.POST.get('k', '').strip()
+    k = int(k) if k else None
+    tolerance = float(request.POST.get('tolerance') or 1e-10)
+    return method, k, tolerance
+
+
+def _decorate_profile(profile):
+    """Add bar labels and widths to an entropy profile for the template"""
+    n_qubits = len(profile) + 1
+    for point in profile:
+        # Maximum possible entropy at this cut is min(l, n - l) bits
+        max_entropy = min(point['cut'], n_qubits - point['cut'])
+        point['label'] = f"{point['cut']} | {n_qubits - point['cut']}"
+        point['width_percent'] = point['entropy'] / max_entropy * 100
+    return profile
+
+
+def _mps_summary(mps):
+    """Template data describing an MPS and its memory footprint"""
+    return {
+        'n_qubits': mps.n_qubits,
+        'bond_dims': mps.bond_dims,
+        'max_bond_dim': max(mps.bond_dims),
+        'memory_bytes': mps.memory_bytes,
+        # 16 bytes per complex128 amplitude; an exact int this large would overflow filesizeformat
+        'dense_bytes': 16 * 2 ** mps.n_qubits if mps.n_qubits <= DENSE_BYTES_MAX_QUBITS else None,
+        'dense_bytes_log2': mps.n_qubits + 4,
+        'truncation_error': mps.truncation_error,
+    }
+
+
+def _dense_result(request, input_method):
+    """Schmidt decomposition of a dense state vector (manual, predefined or file input)"""
+    if input_method == 'manual':
+        state_str = request.POST.get('state_vector', '')
+        dim_a = int(request.POST.get('dim_a', 2))
+        dim_b = int(request.POST.get('dim_b', 2))
+        state_vector = parse_state_input(state_str)
+        
+    elif input_method == 'predefined':
+        state_key = request.POST.get('predefined_state')
+        state_info = PREDEFINED_STATES[state_key]
+        state_vector = state_info['vector']
+        dim_a, dim_b = state_info['dims']
+        
+    elif input_method == 'file':
+        dim_a = int(request.POST.get('file_dim_a', 2))
+        dim_b = int(request.POST.get('file_dim_b', 2))
+        if 'state_file' in request.FILES:
+            source = request.FILES['state_file']
+        else:
+            source = _resolve_state_file(request.POST.get('state_file_name', '').strip())
+        state_vector = load_state_file(source, dim_a, dim_b)
+    
+    else:
+        raise ValueError(f"Unknown input method '{input_method}'")
+        
+    # Validate dimensions
+    if len(state_vector) != dim_a * dim_b:
+        raise ValueError(f"State vector size ({len(state_vector)}) doesn't match dimensions {dim_a}×{dim_b}")
+    
+    state_vector = normalize_state(state_vector)
+    method, k, tolerance = _svd_options(request)
+    
+    # Execute main mathematical logic
+    result = cached_calculate_schmidt_rank(state_vector, dim_a, dim_b, method=method, k=k, tolerance=tolerance)
+    if len(state_vector) <= STATE_DISPLAY_LIMIT:
+        result['state_vector'] = state_vector.tolist()
+    else:
+        result['state_vector'] = f"{len(state_vector)} amplitudes (not shown)"
+    result['dim_a'] = dim_a
+    result['dim_b'] = dim_b
+    
+    # Optional entropy profile over every contiguous cut of an n-qubit state
+    if request.POST.get('entropy_profile'):
+        result['entropy_profile'] = _decorate_profile(entanglement_sweep(state_vector, tolerance=tolerance))
+        
+        subset_size = request.POST.get('subset_size', '').strip()
+        if subset_size:
+            result['subset_entropies'] = subset_entanglement(state_vector, int(subset_size), tolerance=tolerance)
+    
+    # Optional compression into a Matrix Product State
+    max_bond_dim = request.POST.get('mps_max_bond', '').strip()
+    if max_bond_dim:
+        mps = MatrixProductState.from_dense(state_vector, int(max_bond_dim), tolerance)
+        result['mps'] = _mps_summary(mps)
+    
+    return result
+
+
+def _mps_result(request):
+    """
+    Entanglement of an n-qubit family state built directly as an MPS, so
+    states far beyond dense reach (30+ qubits) never allocate 2^n amplitudes.
+    """
+    family = request.POST.get('mps_family', 'ghz')
+    n_qubits = int(request.POST.get('mps_qubits', 10))
+    if not 2 <= n_qubits <= MPS_MAX_QUBITS:
+        raise ValueError(f"Number of qubits must be between 2 and {MPS_MAX_QUBITS}")
+    max_bond_dim = request.POST.get('mps_max_bond', '').strip()
+    _, _, tolerance = _svd_options(request)
+    
+    mps = MatrixProductState.from_family(family, n_qubits, int(max_bond_dim) if max_bond_dim else None)
+    profile = mps.entropy_profile(tolerance)
+    
+    # Headline numbers are for the half-chain cut
+    half = profile[n_qubits // 2 - 1]
+    result = {
+        'schmidt_rank': half['schmidt_rank'],
+        'coefficients': half['coefficients'],
+        'is_entangled': half['schmidt_rank'] > 1,
+        'entropy': half['entropy'],
+        'method': 'mps',
+        'dim_a': f"2^{half['cut']}",
+        'dim_b': f"2^{n_qubits - half['cut']}",
+        'state_vector': f"MPS of {n_qubits} qubits (not shown)",
+        'entropy_profile': _decorate_profile(profile),
+        'mps': _mps_summary(mps),
+    }
+    
+    bitstring = request.POST.get('mps_amplitude', '').strip()
+    if bitstring:
+        result['mps']['amplitude_query'] = bitstring
+        result['mps']['amplitude'] = mps.amplitude(bitstring)
+    
+    return result
+
+
+@csrf_protect
+def app1_form(request):
     """View for the Schmidt Rank Calculator application"""
     
     # Initialize variables to hold calculation results and potential errors
@@ -34,30 +281,10 @@ def app1(request):
         try:
             input_method = request.POST.get('input_method', 'manual')
             
-            if input_method == 'manual':
-                state_str = request.POST.get('state_vector', '')
-                dim_a = int(request.POST.get('dim_a', 2))
-                dim_b = int(request.POST.get('dim_b', 2))
-                state_vector = parse_state_input(state_str)
-                
-            elif input_method == 'predefined':
-                state_key = request.POST.get('predefined_state')
-                states = get_predefined_states()
-                state_info = states[state_key]
-                state_vector = state_info['vector']
-                dim_a, dim_b = state_info['dims']
-                
-            # Validate dimensions
-            if len(state_vector) != dim_a * dim_b:
-                raise ValueError(f"State vector size ({len(state_vector)}) doesn't match dimensions {dim_a}×{dim_b}")
-            
-            state_vector = normalize_state(state_vector)
-            
-            # Execute main mathematical logic
-            result = calculate_schmidt_rank(state_vector, dim_a, dim_b)
-            result['state_vector'] = state_vector.tolist()
-            result['dim_a'] = dim_a
-            result['dim_b'] = dim_b
+            if input_method == 'mps':
+                result = _mps_result(request)
+            else:
+                result = _dense_result(request, input_method)
             
             # Prepare coefficient data for HTML rendering
             max_coeff = max(result['coefficients'])
@@ -76,66 +303,91 @@ def app1(request):
     context = {
         'result': result,
         'error': error,
-        'predefined_states': get_predefined_states()
+        'predefined_states': PREDEFINED_STATES,
+        'mps_max_qubits': MPS_MAX_QUBITS,
     }
     
     # Render the HTML template with the context data
     return render(request, "cesar/app1.html", context)
 
-def app2(request):
-    """Study Planner - Main Dashboard with actual ORM logic"""
-    
-    # Grab the first user in the database (your superuser) to act as our student
-    user = User.objects.first()
-    
+
+def app1_cache_stats(request):
+    """Debug endpoint with hit/miss counters of the Schmidt result cache"""
+    if not settings.DEBUG:
+        raise Http404("Cache statistics are only available with DEBUG enabled")
+    return JsonResponse(schmidt_cache.stats())
+
+
+def dashboard_context(user, enrollments_cursor=None, assignments_cursor=None):
+    """
+    Template context of the Study Planner dashboard for one user (or None).
+    Enrollments and upcoming assignments are keyset paginated, the cursors
+    come from the previous page.
+    """
     programs_data = []
     current_enrollments = []
     upcoming_assignments = []
+    enrollments_next = assignments_next = None
     gpa = None
+    gpa_data = {'by_course': [], 'by_program': []}
     
     if user:
-        # 1. Fetch programs the user is enrolled in
-        programs = Program.objects.filter(courses__enrollments__user=user).distinct()
+        # 1. Programs the user is enrolled in, read from the ProgramProgress
+        #    summary rows (one per program, kept in sync by signals)
+        progress_rows = ProgramProgress.objects.filter(user=user).select_related('program').order_by('program_id')
         
-        for program in programs:
-            # Calculate earned ECTS (sum of ECTS for passed courses in this program)
-            earned_result = Enrollment.objects.filter(
-                user=user, 
-                course__program=program, 
-                is_passed=True
-            ).aggregate(total_ects=Sum('course__ects'))
-            
-            earned = earned_result['total_ects'] or 0
-            progress = int((earned / program.total_ects_required) * 100) if program.total_ects_required > 0 else 0
-            
+        for row in progress_rows:
             programs_data.append({
-                'program': program,
-                'earned_ects': earned,
-                'progress': progress
+                'program': row.program,
+                'earned_ects': row.earned_ects,
+                'progress': row.progress
             })
             
-        # 2. Fetch active enrollments
-        current_enrollments = Enrollment.objects.filter(user=user, status='in_progress')
+        # 2. Fetch active enrollments (course is shown by the template), one page
+        #    in (enrolled_date, id) order
+        current_enrollments, enrollments_next = keyset_page(
+            Enrollment.objects.filter(user=user, status='in_progress').select_related('course'),
+            ('enrolled_date', 'id'), enrollments_cursor, ENROLLMENTS_PAGE_SIZE,
+        )
         
-        # 3. Fetch upcoming assignments (not completed, due date in the future)
-        upcoming_assignments = Assignment.objects.filter(
-            course__enrollments__user=user,
-            is_completed=False,
-            due_date__gte=timezone.now()
-        ).order_by('due_date')[:5]  # Limit to next 5
+        # 3. Fetch upcoming assignments (not completed, due date in the future),
+        #    one page in (due_date, id) order
+        upcoming_assignments, assignments_next = keyset_page(
+            Assignment.objects.filter(
+                course__enrollments__user=user,
+                is_completed=False,
+                due_date__gte=timezone.now()
+            ).select_related('course'),
+            ('due_date', 'id'), assignments_cursor, ASSIGNMENTS_PAGE_SIZE,
+        )
         
-        # 4. Calculate Overall GPA
-        gpa_result = Grade.objects.filter(enrollment__user=user).aggregate(avg_grade=Avg('grade'))
-        gpa = gpa_result['avg_grade']
+        # 4. Weighted GPA (overall, per course, per program), cached per user
+        gpa_data = get_weighted_gpa(user.pk)
+        gpa = gpa_data['gpa']
 
-    context = {
+    return {
         'user_exists': bool(user),
         'programs_data': programs_data,
         'enrollments': current_enrollments,
+        'enrollments_next': enrollments_next,
+        'enrollments_cursor': enrollments_cursor,
         'upcoming_assignments': upcoming_assignments,
+        'assignments_next': assignments_next,
+        'assignments_cursor': assignments_cursor,
         'gpa': round(gpa, 2) if gpa else None,
+        'gpa_by_course': gpa_data['by_course'],
+        'gpa_by_program': gpa_data['by_program'],
     }
-    
+
+
+@login_required(login_url='cesar_login')
+def app2(request):
+    """Study Planner - Main Dashboard for the logged in student"""
+    context = dashboard_context(
+        request.user,
+        enrollments_cursor=request.GET.get('enrollments_after'),
+        assignments_cursor=request.GET.get('assignments_after'),
+    )
     return render(request, "cesar/app2.html", context)
 
 def app3(request):
@@ -0,0 +1,129 @@
+"""
+Server-side simulator sessions for app2.
+
+Each session lives in a Django cache under its circuit id: the state as
+raw complex128 bytes plus a bounded history of the gates applied to it.
+Requests only carry the circuit id and the next gate. The cache alias comes
+from settings.EMMANUEL_CIRCUIT_CACHE ("default" otherwise); with several
+worker processes it must name a shared backend (database, Redis,
+Memcached), a local-memory cache would only know the sessions created by
+the worker that happens to serve the request. Undo applies the
+inverse (conjugate transpose) of the last gate instead of restoring a
+stored copy of the state; redo applies the gate again.
+"""
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import caches
+
+from .circuits import Gate, parse_gate
+from .simulator import StateVector
+
+CACHE_KEY = "emmanuel:circuit:{}"
+# Idle sessions expire after an hour
+SESSION_TIMEOUT = 60 * 60
+# Gates remembered for undo/redo; older ones can no longer be undone
+HISTORY_LIMIT = 100
+# 2^16 amplitudes = 1 MiB per session
+SESSION_MAX_QUBITS = 16
+
+
+def _store():
+    """Cache holding the sessions, looked up per call so settings overrides apply."""
+    return caches[getattr(settings, "EMMANUEL_CIRCUIT_CACHE", "default")]
+
+
+def _gate_record(gate: Gate) -> dict:
+    """JSON-able gate (full float precision, unlike the label)."""
+    return {"gate": gate.name, "qubits": list(gate.qubits), "params": list(gate.params)}
+
+
+class CircuitSession:
+    """A StateVector with its gate history, loaded from and saved to the cache."""
+
+    def __init__(self, circuit_id: str, state: StateVector, history: list[dict] | None = None, position: int = 0):
+        self.circuit_id = circuit_id
+        self.state = state
+        self.history = history or []
+        # history[:position] is applied, history[position:] can be redone
+        self.position = position
+
+    @classmethod
+    def create(cls, n_qubits: int = 2, amplitudes=None, initial: str | None = None) -> "CircuitSession":
+        """New session in |initial⟩ (a bitstring), the given amplitudes, or |0…0⟩."""
+        if not 1 <= n_qubits <= SESSION_MAX_QUBITS:
+            raise ValueError(f"Number of qubits must be between 1 and {SESSION_MAX_QUBITS}")
+        if initial:
+            state = StateVector.from_bitstring(initial)
+            if state.n_qubits != n_qubits:
+                raise ValueError(f"Initial state has {state.n_qubits} qubits, expected {n_qubits}")
+        else:
+            state = StateVector(n_qubits, amplitudes)
+        session = cls(uuid.uuid4().hex, state)
+        session.save()
+        return session
+
+    @classmethod
+    def load(cls, circuit_id: str) -> "CircuitSession | None":
+        """Stored session, or None when unknown or expired."""
+        data = _store().get(CACHE_KEY.format(circuit_id)) if circuit_id else None
+        if data is None:
+            return None
+        # frombuffer is read-only, the simulator updates in place
+        amplitudes = np.frombuffer(data["state"], dtype=np.complex128).copy()
+        return cls(circuit_id, StateVector(data["n_qubits"], amplitudes), data["history"], data["position"])
+
+    def save(self) -> None:
+        _store().set(CACHE_KEY.format(self.circuit_id), {
+            "n_qubits": self.state.n_qubits,
+            "state": self.state.amplitudes.tobytes(),
+            "history": self.history,
+            "position": self.position,
+        }, SESSION_TIMEOUT)
+
+    def _run(self, gate: Gate, inverse: bool = False) -> None:
+        if max(gate.qubits) >= self.state.n_qubits:
+            raise ValueError(f"Gate '{gate.label}' needs more than {self.state.n_qubits} qubits")
+        matrix, targets, controls = gate.operation()
+        self.state.apply_matrix(matrix.conj().T if inverse else matrix, targets, controls)
+
+    def apply(self, gate: Gate) -> None:
+        """Apply a gate, forgetting anything that could have been redone."""
+        self._run(gate)
+        del self.history[self.position:]
+        self.history.append(_gate_record(gate))
+        if len(self.history) > HISTORY_LIMIT:
+            del self.history[:-HISTORY_LIMIT]
+        self.position = len(self.history)
+
+    def undo(self) -> bool:
+        """Revert the last applied gate. False when there is nothing to undo."""
+        if self.position == 0:
+            return False
+        self.position -= 1
+        self._run(parse_gate(self.history[self.position]), inverse=True)
+        return True
+
+    def redo(self) -> bool:
+        """Re-apply the last undone gate. False when there is nothing to redo."""
+        if self.position == len(self.history):
+            return False
+        self._run(parse_gate(self.history[self.position]))
+        self.position += 1
+        return True
+
+    def delete(self) -> None:
+        _store().delete(CACHE_KEY.format(self.circuit_id))
+
+    @property
+    def can_undo(self) -> bool:
+        return self.position > 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self.position < len(self.history)
+
+    def labels(self) -> list[str]:
+        """Labels of the applied gates, oldest first."""
+        return [parse_gate(record).label for record in self.history[:self.position]]
@@ -0,0 +1,217 @@
+"""
+Circuits for app2's circuit mode: parsing, gate fusion and execution.
+
+A circuit is a list of Gate(name, qubits, params) with qubits listed
+controls first (CX 0 1 flips qubit 1 when qubit 0 is |1⟩). Runs of
+consecutive gates touching at most FUSION_MAX_QUBITS qubits are multiplied
+into one small unitary and applied to the state once.
+"""
+import json
+import re
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .simulator import ALIASES, CONTROLLED_GATES, GATES, PARAMETRIC_GATES, StateVector, gate_matrix
+
+# Largest fused block (a 2^k x 2^k matrix applied with tensordot)
+FUSION_MAX_QUBITS = 2
+# Web limits for circuit mode
+CIRCUIT_MAX_QUBITS = 22
+CIRCUIT_MAX_GATES = 10_000
+
+# "RX(1.57) 2", "CX 0 1", "h q0"
+_GATE_RE = re.compile(r"^\s*([A-Za-z]+)\s*(?:\(([^)]*)\))?\s*(.*?)\s*$")
+
+
+@dataclass(frozen=True)
+class Gate:
+    name: str
+    qubits: tuple[int, ...]
+    params: tuple[float, ...] = ()
+    # Explicit 2x2 matrix of a "U" gate (merged single-qubit gates from the optimizer)
+    unitary: np.ndarray | None = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        name = ALIASES.get(self.name.upper(), self.name.upper())
+        object.__setattr__(self, "name", name)
+        if name == "U":
+            if self.unitary is None or np.shape(self.unitary) != (2, 2) or len(self.qubits) != 1:
+                raise ValueError("U takes one qubit and a 2x2 unitary")
+            return
+        if name == "SWAP":
+            expected = 2
+        elif name in CONTROLLED_GATES:
+            expected = CONTROLLED_GATES[name][1] + 1
+        elif name in GATES or name in PARAMETRIC_GATES:
+            expected = 1
+        else:
+            raise ValueError(f"Unknown gate '{self.name}'")
+        if len(self.qubits) != expected:
+            raise ValueError(f"{name} takes {expected} qubit(s), got {len(self.qubits)}")
+        if len(set(self.qubits)) != len(self.qubits):
+            raise ValueError(f"{name} qubits must be distinct")
+        if (name in PARAMETRIC_GATES) != bool(self.params) or len(self.params) > 1:
+            raise ValueError(f"{name} takes {'one angle' if name in PARAMETRIC_GATES else 'no parameters'}")
+
+    @property
+    def label(self) -> str:
+        params = f"({', '.join(f'{p:g}' for p in self.params)})" if self.params else ""
+        return f"{self.name}{params} {' '.join(map(str, self.qubits))}"
+
+    def operation(self) -> tuple[np.ndarray, list[int], list[int]]:
+        """(matrix, targets, controls) for StateVector.apply_matrix."""
+        if self.name == "U":
+            return np.asarray(self.unitary, dtype=np.complex128), [self.qubits[0]], []
+        if self.name == "SWAP":
+            swap = np.eye(4, dtype=np.complex128)[[0, 2, 1, 3]]
+            return swap, list(self.qubits), []
+        if self.name in CONTROLLED_GATES:
+            base = CONTROLLED_GATES[self.name][0]
+            return gate_matrix(base), [self.qubits[-1]], list(self.qubits[:-1])
+        return gate_matrix(self.name, *self.params), [self.qubits[0]], []
+
+
+def parse_gate(spec) -> Gate:
+    """Gate from "RX(0.5) 2" text or {"gate": "RX", "qubits": [2], "params": [0.5]}."""
+    if isinstance(spec, dict):
+        try:
+            return Gate(str(spec["gate"]), tuple(int(q) for q in spec["qubits"]),
+                        tuple(float(p) for p in spec.get("params", ())))
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid gate {spec!r}: {e}")
+    match = _GATE_RE.match(str(spec))
+    if not match or not match.group(3):
+        raise ValueError(f"Invalid gate '{spec}', expected e.g. 'H 0' or 'CX 0 1'")
+    name, params, qubits = match.groups()
+    params = tuple(float(p) for p in params.split(",")) if params else ()
+    return Gate(name, tuple(int(q.lstrip("qQ")) for q in qubits.replace(",", " ").split()), params)
+
+
+def parse_circuit(source) -> list[Gate]:
+    """
+    Circuit from a JSON list (of gate strings or dicts), a JSON string of one,
+    or text with one gate per line or separated by semicolons.
+    """
+    if isinstance(source, str):
+        stripped = source.strip()
+        if stripped.startswith("["):
+            source = json.loads(stripped)
+        else:
+            source = [part for line in stripped.splitlines() for part in line.split(";")]
+            source = [part for part in source if part.strip() and not part.strip().startswith("#")]
+    if not isinstance(source, list):
+        raise ValueError("A circuit must be a list of gates")
+    if len(source) > CIRCUIT_MAX_GATES:
+        raise ValueError(f"Too many gates ({len(source)}, limit {CIRCUIT_MAX_GATES})")
+    return [parse_gate(spec) for spec in source]
+
+
+def gate_unitary(gates: list[Gate], qubits: list[int]) -> np.ndarray:
+    """Unitary of a gate sequence on the given qubits (qubits[0] = most significant bit)."""
+    k = len(qubits)
+    local = {q: i for i, q in enumerate(qubits)}
+    # Columns of the unitary are the images of the basis states
+    basis = np.eye(1 << k, dtype=np.complex128)
+    unitary = np.empty_like(basis)
+    column = StateVector(k)
+    for j in range(1 << k):
+        column.amplitudes[...] = basis[j]
+        for gate in gates:
+            matrix, targets, controls = gate.operation()
+            column.apply_matrix(matrix, [local[q] for q in targets], [local[q] for q in controls])
+        unitary[:, j] = column.amplitudes
+    return unitary
+
+
+@dataclass
+class Block:
+    """Consecutive gates applied as one operation."""
+    gates: list[Gate]
+    indices: list[int]
+    qubits: list[int]
+    matrix: np.ndarray | None = None  # fused unitary on qubits, None = apply the single gate directly
+
+    @property
+    def fused(self) -> bool:
+        return self.matrix is not None
+
+
+def fuse(circuit: list[Gate], max_qubits: int = FUSION_MAX_QUBITS) -> list[Block]:
+    """Greedily group consecutive gates whose combined support stays within max_qubits."""
+    blocks, current, indices, support = [], [], [], []
+    for i, gate in enumerate(circuit):
+        merged = support + [q for q in gate.qubits if q not in support]
+        if current and len(merged) > max_qubits:
+            blocks.append(Block(current, indices, support))
+            current, indices, merged = [], [], list(gate.qubits)
+        current.append(gate)
+        indices.append(i)
+        support = merged
+    if current:
+        blocks.append(Block(current, indices, support))
+    for block in blocks:
+        if len(block.gates) > 1 and len(block.qubits) <= max_qubits:
+            block.qubits = sorted(block.qubits)
+            block.matrix = gate_unitary(block.gates, block.qubits)
+    return blocks
+
+
+def run_circuit(circuit: list[Gate], n_qubits: int, initial: str | None = None, fusion: bool = True) -> dict:
+    """
+    Apply a circuit to |initial⟩ (default |0…0⟩).
+
+    Returns:
+        dict with state (StateVector), blocks [{gates, qubits, fused, ms}],
+        fusion_ms, apply_ms, gate_count, block_count
+    """
+    for gate in circuit:
+        if max(gate.qubits) >= n_qubits:
+            raise ValueError(f"Gate '{gate.label}' needs more than {n_qubits} qubits")
+    state = StateVector.from_bitstring(initial) if initial else StateVector(n_qubits)
+    if state.n_qubits != n_qubits:
+        raise ValueError(f"Initial state has {state.n_qubits} qubits, expected {n_qubits}")
+
+    start = time.perf_counter()
+    if fusion:
+        blocks = fuse(circuit)
+    else:
+        blocks = [Block([gate], [i], list(gate.qubits)) for i, gate in enumerate(circuit)]
+    fusion_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for block in blocks:
+        start = time.perf_counter()
+        if block.fused:
+            state.apply_matrix(block.matrix, block.qubits)
+        else:
+            matrix, targets, controls = block.gates[0].operation()
+            state.apply_matrix(matrix, targets, controls)
+        timings.append({
+            "gates": [gate.label for gate in block.gates],
+            "indices": block.indices,
+            "qubits": block.qubits,
+            "fused": block.fused,
+            "ms": (time.perf_counter() - start) * 1000,
+        })
+    return {
+        "state": state,
+        "blocks": timings,
+        "fusion_ms": fusion_ms,
+        "apply_ms": sum(t["ms"] for t in timings),
+        "gate_count": len(circuit),
+        "block_count": len(blocks),
+    }
+
+
+def top_outcomes(state: StateVector, limit: int = 32, threshold: float = 1e-12) -> list[tuple[int, complex, float]]:
+    """(basis index, amplitude, probability) of the most likely outcomes, most likely first."""
+    probabilities = state.probabilities()
+    if probabilities.size > limit:
+        candidates = np.argpartition(probabilities, -limit)[-limit:]
+    else:
+        candidates = np.arange(probabilities.size)
+    candidates = candidates[probabilities[candidates] > threshold]
+    order = candidates[np.argsort(-probabilities[candidates], kind="stable")]
+    return [(int(i), complex(state.amplitudes[i]), float(probabilities[i])) for i in order]
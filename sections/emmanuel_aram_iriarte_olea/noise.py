@@ -0,0 +1,320 @@
+"""
+Noisy circuit simulation for app2's circuit mode.
+
+A NoiseModel applies depolarizing, amplitude-damping and bit-flip channels
+to every qubit a gate touched, right after the gate. Two backends:
+
+- density: the exact 2^n x 2^n density matrix, ρ ← UρU† and ρ ← Σ KρK†,
+  16·4^n bytes, so small n only
+- trajectory: Monte-Carlo state vectors, each channel picks one Kraus
+  operator K with probability ‖Kψ‖² and applies K/‖Kψ‖; averaging the
+  outcome probabilities of many trajectories estimates diag(ρ). Batches of
+  trajectories run in parallel on a process pool.
+
+backend="auto" picks the density matrix while its memory estimate stays
+under DENSITY_MATRIX_MAX_BYTES, trajectories otherwise.
+"""
+import math
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+
+import numpy as np
+
+from .circuits import Gate, gate_unitary
+from .pools import discard_pool, get_pool
+from .simulator import GATES, StateVector
+
+BACKENDS = ("auto", "density", "trajectory")
+
+# Largest density matrix backend run (its memory estimate, see memory_estimate)
+DENSITY_MATRIX_MAX_BYTES = 64 * 1024 * 1024
+# Memory shared by all trajectory workers; fewer workers run when states are large
+TRAJECTORY_MAX_BYTES = 1024 * 1024 * 1024
+# Trajectories below this run inline, a pool only pays off above it
+TRAJECTORY_INLINE_MAX = 32
+DEFAULT_TRAJECTORIES = 200
+
+
+@dataclass(frozen=True)
+class Channel:
+    """Single-qubit channel as Kraus operators; weights are set for mixtures of unitaries."""
+    name: str
+    kraus: tuple[np.ndarray, ...]
+    # Probability of each Kraus operator when it does not depend on the state
+    weights: tuple[float, ...] | None = None
+
+    @property
+    def superoperator(self) -> np.ndarray:
+        """4x4 Σ K ⊗ K* acting on the (row, column) index pair of the qubit in ρ."""
+        return sum(np.kron(k, k.conj()) for k in self.kraus)
+
+
+def depolarizing(p: float) -> Channel:
+    """ρ ← (1 - p)ρ + p·I/2, i.e. X, Y and Z each with probability p/4."""
+    weights = (1 - 3 * p / 4, p / 4, p / 4, p / 4)
+    kraus = tuple(math.sqrt(w) * GATES[name] for w, name in zip(weights, "IXYZ"))
+    return Channel("depolarizing", kraus, weights)
+
+
+def amplitude_damping(gamma: float) -> Channel:
+    """|1⟩ decays to |0⟩ with probability gamma."""
+    k0 = np.array([[1, 0], [0, math.sqrt(1 - gamma)]], dtype=np.complex128)
+    k1 = np.array([[0, math.sqrt(gamma)], [0, 0]], dtype=np.complex128)
+    return Channel("amplitude_damping", (k0, k1))
+
+
+def bit_flip(p: float) -> Channel:
+    """X with probability p."""
+    return Channel("bit_flip", (math.sqrt(1 - p) * GATES["I"], math.sqrt(p) * GATES["X"]), (1 - p, p))
+
+
+@dataclass(frozen=True)
+class NoiseModel:
+    """Channel strengths applied after every gate to each of its qubits (0 = off)."""
+    depolarizing: float = 0.0
+    amplitude_damping: float = 0.0
+    bit_flip: float = 0.0
+
+    def __post_init__(self):
+        for name in ("depolarizing", "amplitude_damping", "bit_flip"):
+            value = getattr(self, name)
+            if not 0 <= value <= 1:
+                raise ValueError(f"{name} must be a probability between 0 and 1, got {value}")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NoiseModel":
+        """NoiseModel from {"depolarizing": 0.01, ...}; unknown keys are rejected."""
+        if not isinstance(data, dict):
+            raise ValueError("Noise must be an object of channel strengths")
+        unknown = set(data) - {"depolarizing", "amplitude_damping", "bit_flip"}
+        if unknown:
+            raise ValueError(f"Unknown noise channel(s): {', '.join(sorted(unknown))}")
+        try:
+            strengths = {name: float(value or 0) for name, value in data.items()}
+        except (TypeError, ValueError):
+            raise ValueError("Noise strengths must be numbers")
+        return cls(**strengths)
+
+    @property
+    def is_ideal(self) -> bool:
+        return not (self.depolarizing or self.amplitude_damping or self.bit_flip)
+
+    def channels(self) -> list[Channel]:
+        """Active channels, in the order they are applied."""
+        channels = []
+        if self.depolarizing:
+            channels.append(depolarizing(self.depolarizing))
+        if self.amplitude_damping:
+            channels.append(amplitude_damping(self.amplitude_damping))
+        if self.bit_flip:
+            channels.append(bit_flip(self.bit_flip))
+        return channels
+
+
+def memory_estimate(n_qubits: int, backend: str, workers: int = 1) -> int:
+    """
+    Bytes a run needs: the density matrix plus a tensordot result and the
+    Kraus sum, or per worker one state, one temporary and the probability sum.
+    """
+    if backend == "density":
+        return 3 * 16 * (1 << (2 * n_qubits))
+    return workers * (2 * 16 + 8) * (1 << n_qubits)
+
+
+def choose_backend(n_qubits: int, backend: str = "auto") -> str:
+    """Backend to run; auto keeps the exact density matrix while it fits DENSITY_MATRIX_MAX_BYTES."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Choose from {', '.join(BACKENDS)}")
+    if backend == "auto":
+        fits = memory_estimate(n_qubits, "density") <= DENSITY_MATRIX_MAX_BYTES
+        return "density" if fits else "trajectory"
+    if backend == "density" and memory_estimate(n_qubits, "density") > DENSITY_MATRIX_MAX_BYTES:
+        raise ValueError(f"A {n_qubits}-qubit density matrix needs more than {DENSITY_MATRIX_MAX_BYTES >> 20} MiB, use trajectories")
+    return backend
+
+
+def trajectory_workers(n_qubits: int, trajectories: int) -> int:
+    """Worker processes for a trajectory run: one per core, fewer when their states would not fit."""
+    if trajectories <= TRAJECTORY_INLINE_MAX:
+        return 1
+    fit = TRAJECTORY_MAX_BYTES // memory_estimate(n_qubits, "trajectory")
+    return max(1, min(os.cpu_count() or 1, fit, trajectories // TRAJECTORY_INLINE_MAX))
+
+
+def _apply_left(tensor: np.ndarray, matrix: np.ndarray, axes: list[int]) -> np.ndarray:
+    """Contract a 2^k x 2^k matrix into k axes of a (2,)*m tensor (new array)."""
+    k = len(axes)
+    product = np.tensordot(matrix.reshape((2,) * (2 * k)), tensor, axes=(list(range(k, 2 * k)), axes))
+    return np.moveaxis(product, list(range(k)), axes)
+
+
+class DensityMatrix:
+    """Mixed state of n qubits as a (2,)*2n tensor: row axes 0..n-1, column axes n..2n-1."""
+
+    def __init__(self, state: StateVector):
+        self.n_qubits = state.n_qubits
+        psi = state.amplitudes
+        self.tensor = np.outer(psi, psi.conj()).reshape((2,) * (2 * self.n_qubits))
+
+    def apply_operator(self, matrix: np.ndarray, qubits: list[int]) -> None:
+        """ρ ← MρM†."""
+        columns = [self.n_qubits + q for q in qubits]
+        self.tensor = _apply_left(_apply_left(self.tensor, matrix, qubits), matrix.conj(), columns)
+
+    def apply_superoperator(self, superoperator: np.ndarray, qubit: int) -> None:
+        """ρ ← Σ KρK† on one qubit, as one contraction with the 4x4 superoperator."""
+        self.tensor = _apply_left(self.tensor, superoperator, [qubit, self.n_qubits + qubit])
+
+    def apply_channel(self, channel: Channel, qubit: int) -> None:
+        self.apply_superoperator(channel.superoperator, qubit)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        size = 1 << self.n_qubits
+        return self.tensor.reshape(size, size)
+
+    def probabilities(self) -> np.ndarray:
+        return np.clip(np.diagonal(self.matrix).real, 0, None)
+
+    def purity(self) -> float:
+        """tr(ρ²), 1 for a pure state."""
+        return float(np.vdot(self.matrix, self.matrix).real)
+
+
+def _gate_operator(gate: Gate) -> np.ndarray:
+    """Full unitary of a gate on its own qubits (controls included)."""
+    return gate_unitary([gate], list(gate.qubits))
+
+
+def _initial_state(n_qubits: int, initial: str | None) -> StateVector:
+    state = StateVector.from_bitstring(initial) if initial else StateVector(n_qubits)
+    if state.n_qubits != n_qubits:
+        raise ValueError(f"Initial state has {state.n_qubits} qubits, expected {n_qubits}")
+    return state
+
+
+def run_density(circuit: list[Gate], n_qubits: int, noise: NoiseModel, initial: str | None = None) -> DensityMatrix:
+    """Exact noisy run on the density matrix."""
+    rho = DensityMatrix(_initial_state(n_qubits, initial))
+    # All channels on a qubit folded into one superoperator, applied in model order
+    noise_op = np.eye(4, dtype=np.complex128)
+    for channel in noise.channels():
+        noise_op = channel.superoperator @ noise_op
+    for gate in circuit:
+        rho.apply_operator(_gate_operator(gate), list(gate.qubits))
+        if not noise.is_ideal:
+            for q in gate.qubits:
+                rho.apply_superoperator(noise_op, q)
+    return rho
+
+
+def _reduced_qubit(state: StateVector, qubit: int) -> np.ndarray:
+    """2x2 reduced density matrix of one qubit."""
+    v = state.amplitudes.reshape(1 << qubit, 2, -1).transpose(1, 0, 2).reshape(2, -1)
+    return v @ v.conj().T
+
+
+class _Sampler:
+    """Picks and applies one Kraus operator of a channel per call."""
+
+    def __init__(self, channel: Channel):
+        self.kraus = np.array(channel.kraus)
+        self.cdf = np.cumsum(channel.weights) if channel.weights is not None else None
+        # Mixtures of unitaries: K/√w is fixed, and the identity branch needs no work
+        self.unitaries = None
+        if channel.weights is not None:
+            self.unitaries = [k / math.sqrt(w) if w else None for k, w in zip(channel.kraus, channel.weights)]
+            self.unitaries = [None if u is None or np.allclose(u, GATES["I"]) else u for u in self.unitaries]
+
+    def __call__(self, state: StateVector, qubit: int, rng: np.random.Generator) -> None:
+        if self.cdf is not None:
+            i = min(int(np.searchsorted(self.cdf, rng.random() * self.cdf[-1], side="right")), len(self.cdf) - 1)
+            if self.unitaries[i] is not None:
+                state.apply_matrix(self.unitaries[i], [qubit])
+            return
+        # ‖Kψ‖² = tr(K ρ_q K†) with ρ_q the qubit's reduced density matrix
+        reduced = _reduced_qubit(state, qubit)
+        weights = np.clip(np.einsum("kij,jl,kil->k", self.kraus, reduced, self.kraus.conj()).real, 0, None)
+        cdf = np.cumsum(weights)
+        i = min(int(np.searchsorted(cdf, rng.random() * cdf[-1], side="right")), len(cdf) - 1)
+        state.apply_matrix(self.kraus[i] / math.sqrt(weights[i]), [qubit])
+
+
+def _trajectory_batch(circuit: list[Gate], n_qubits: int, noise: NoiseModel, initial: str | None,
+                      count: int, seed: np.random.SeedSequence) -> np.ndarray:
+    """Sum of the outcome probabilities of count trajectories (the pool's unit of work)."""
+    rng = np.random.default_rng(seed)
+    samplers = [_Sampler(channel) for channel in noise.channels()]
+    operations = [gate.operation() for gate in circuit]
+    start = _initial_state(n_qubits, initial)
+    total = np.zeros(1 << n_qubits)
+    for _ in range(count):
+        state = start.copy()
+        for gate, (matrix, targets, controls) in zip(circuit, operations):
+            state.apply_matrix(matrix, targets, controls)
+            for q in gate.qubits:
+                for sample in samplers:
+                    sample(state, q, rng)
+        total += state.probabilities()
+    return total
+
+
+def run_trajectories(circuit: list[Gate], n_qubits: int, noise: NoiseModel, trajectories: int,
+                     initial: str | None = None, seed: int | None = None, workers: int | None = None) -> np.ndarray:
+    """Outcome probabilities averaged over trajectories, in batches spread over the pool."""
+    if trajectories < 1:
+        raise ValueError("At least one trajectory is needed")
+    workers = workers or trajectory_workers(n_qubits, trajectories)
+    counts = [trajectories // workers + (i < trajectories % workers) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    if workers == 1:
+        return _trajectory_batch(circuit, n_qubits, noise, initial, trajectories, seeds[0]) / trajectories
+    try:
+        pending = [
+            get_pool().submit(_trajectory_batch, circuit, n_qubits, noise, initial, count, batch_seed)
+            for count, batch_seed in zip(counts, seeds)
+        ]
+        return sum(future.result() for future in pending) / trajectories
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory): start a fresh pool next time, finish inline now
+        discard_pool()
+        total = sum(_trajectory_batch(circuit, n_qubits, noise, initial, count, batch_seed)
+                    for count, batch_seed in zip(counts, seeds))
+        return total / trajectories
+
+
+def run_noisy(circuit: list[Gate], n_qubits: int, noise: NoiseModel, backend: str = "auto",
+              trajectories: int = DEFAULT_TRAJECTORIES, initial: str | None = None, seed: int | None = None) -> dict:
+    """
+    Noisy run with the chosen (or automatically picked) backend.
+
+    Returns:
+        dict with probabilities (2^n array), backend, requested, trajectories
+        and workers (None / 1 for the density matrix), memory_bytes (estimate),
+        purity (density matrix only), ms
+    """
+    for gate in circuit:
+        if max(gate.qubits) >= n_qubits:
+            raise ValueError(f"Gate '{gate.label}' needs more than {n_qubits} qubits")
+    used = choose_backend(n_qubits, backend)
+    start = time.perf_counter()
+    purity = None
+    if used == "density":
+        workers, trajectories = 1, None
+        rho = run_density(circuit, n_qubits, noise, initial)
+        probabilities, purity = rho.probabilities(), rho.purity()
+    else:
+        workers = trajectory_workers(n_qubits, trajectories)
+        probabilities = run_trajectories(circuit, n_qubits, noise, trajectories, initial, seed, workers)
+    return {
+        "probabilities": probabilities,
+        "backend": used,
+        "requested": backend,
+        "trajectories": trajectories,
+        "workers": workers,
+        "memory_bytes": memory_estimate(n_qubits, used, workers),
+        "purity": purity,
+        "ms": (time.perf_counter() - start) * 1000,
+    }
@@ -0,0 +1,213 @@
+"""
+Circuit optimization pass for app2's circuit mode.
+
+One left-to-right sweep over the circuit keeping, per qubit, the stack of
+surviving operations that touch it:
+
+- consecutive single-qubit gates on a qubit are multiplied into one 2x2
+  matrix (a "U" gate); runs that multiply to the identity disappear
+- a diagonal single-qubit gate (Z, S, T, RZ, P, ...) commutes backwards
+  past gates that are diagonal on its qubit (its qubit is a control, or
+  the gate is CZ) and joins the run before them
+- a self-inverse multi-qubit gate (CX, CZ, SWAP, CCX, ...) meeting its twin
+  with nothing in between on any of its qubits cancels with it
+
+FLOP estimates count real floating point operations of the simulator's
+update for each gate on an n-qubit state (complex multiply = 6, add = 2).
+
+Benchmark on random circuits:
+
+    python -m sections.emmanuel_aram_iriarte_olea.optimizer --qubits 16 --gates 400 --circuits 5
+"""
+import argparse
+import time
+
+import numpy as np
+
+from .circuits import Gate, run_circuit
+from .simulator import CONTROLLED_GATES
+
+# Multi-qubit gates equal to their own inverse
+SELF_INVERSE = {"CX", "CNOT", "CY", "CZ", "CH", "CCX", "TOFFOLI", "SWAP"}
+# Gates whose qubits are all interchangeable (the same operation in any qubit order)
+SYMMETRIC = {"CZ", "SWAP"}
+CANONICAL = {"CNOT": "CX", "TOFFOLI": "CCX"}
+
+TOLERANCE = 1e-12
+
+
+def _is_diagonal(matrix: np.ndarray) -> bool:
+    return abs(matrix[0, 1]) < TOLERANCE and abs(matrix[1, 0]) < TOLERANCE
+
+
+def _diagonal_on(gate: Gate, qubit: int) -> bool:
+    """Whether a multi-qubit gate acts diagonally on qubit (so diagonal gates there commute with it)."""
+    if gate.name in CONTROLLED_GATES:
+        base = CONTROLLED_GATES[gate.name][0]
+        return qubit != gate.qubits[-1] or base == "Z"
+    return False
+
+
+def _cancels(first: Gate, second: Gate) -> bool:
+    """second undoes first (same self-inverse gate on the same qubits)."""
+    name = CANONICAL.get(first.name, first.name)
+    if name != CANONICAL.get(second.name, second.name) or first.name not in SELF_INVERSE:
+        return False
+    if name in SYMMETRIC:
+        return set(first.qubits) == set(second.qubits)
+    # Controls in any order, same target
+    return first.qubits[-1] == second.qubits[-1] and set(first.qubits[:-1]) == set(second.qubits[:-1])
+
+
+class _Run:
+    """Single-qubit gates on one qubit merged into one matrix."""
+
+    def __init__(self, gate: Gate, matrix: np.ndarray):
+        self.qubit = gate.qubits[0]
+        self.gates = [gate]
+        self.matrix = matrix
+
+    def to_gate(self) -> Gate:
+        if len(self.gates) == 1:
+            return self.gates[0]
+        return Gate("U", (self.qubit,), unitary=self.matrix)
+
+
+def optimize(circuit: list[Gate]) -> list[Gate]:
+    """
+    Equivalent circuit with inverse pairs cancelled and single-qubit runs merged.
+    Sweeps repeat until nothing changes, a run vanishing can expose a new pair.
+    """
+    while True:
+        optimized = _sweep(circuit)
+        if len(optimized) == len(circuit):
+            return optimized
+        circuit = optimized
+
+
+def _sweep(circuit: list[Gate]) -> list[Gate]:
+    """One optimization sweep."""
+    ops = []  # _Run or Gate, None once removed
+    stacks = {}  # qubit -> indices of the surviving ops touching it, in circuit order
+
+    for gate in circuit:
+        if len(gate.qubits) == 1:
+            q = gate.qubits[0]
+            matrix = gate.operation()[0]
+            stack = stacks.setdefault(q, [])
+            # The run this gate can join: the top of the stack, or further down
+            # past gates that are diagonal on q when the gate itself is diagonal
+            target = None
+            for i in reversed(stack):
+                if isinstance(ops[i], _Run):
+                    target = i
+                    break
+                if not (_is_diagonal(matrix) and _diagonal_on(ops[i], q)):
+                    break
+            if target is None:
+                ops.append(_Run(gate, matrix))
+                stack.append(len(ops) - 1)
+                continue
+            run = ops[target]
+            run.gates.append(gate)
+            run.matrix = matrix @ run.matrix
+            if np.allclose(run.matrix, np.eye(2), atol=TOLERANCE):
+                ops[target] = None
+                stack.remove(target)
+            continue
+
+        tops = {stacks[q][-1] if stacks.get(q) else None for q in gate.qubits}
+        if len(tops) == 1 and None not in tops:
+            previous = tops.pop()
+            other = ops[previous]
+            if isinstance(other, Gate) and set(other.qubits) == set(gate.qubits) and _cancels(other, gate):
+                ops[previous] = None
+                for q in gate.qubits:
+                    stacks[q].pop()
+                continue
+        ops.append(gate)
+        for q in gate.qubits:
+            stacks.setdefault(q, []).append(len(ops) - 1)
+
+    return [op.to_gate() if isinstance(op, _Run) else op for op in ops if op is not None]
+
+
+def gate_flops(gate: Gate, n_qubits: int) -> int:
+    """Real floating point operations the simulator spends on gate for an n-qubit state."""
+    matrix, targets, controls = gate.operation()
+    # Amplitudes the gate touches: controls restrict it to a 2^-c fraction of the state
+    touched = 1 << (n_qubits - len(controls))
+    if len(targets) > 1:
+        if gate.name == "SWAP":
+            return 0  # pure data movement
+        # tensordot: every amplitude is a 2^k term complex dot product
+        return touched * (1 << len(targets)) * 8
+    if _is_diagonal(matrix):
+        # Entries equal to 1 are skipped, each other one multiplies half the amplitudes
+        return (touched // 2) * 6 * sum(abs(matrix[i, i] - 1) > TOLERANCE for i in range(2))
+    if abs(matrix[0, 0]) < TOLERANCE and abs(matrix[1, 1]) < TOLERANCE:
+        return touched * 6  # anti-diagonal: one multiply per amplitude
+    # General 2x2: per amplitude pair 4 multiplies and 2 adds
+    return (touched // 2) * (4 * 6 + 2 * 2)
+
+
+def circuit_cost(circuit: list[Gate], n_qubits: int) -> dict:
+    """Gate count and estimated FLOPs when applying the circuit gate by gate."""
+    return {"gates": len(circuit), "flops": sum(gate_flops(gate, n_qubits) for gate in circuit)}
+
+
+def random_circuit(n_qubits: int, n_gates: int, rng: np.random.Generator) -> list[Gate]:
+    """Random circuit over a small Clifford+T alphabet (which leaves plenty to optimize)."""
+    single = ["H", "X", "Z", "S", "SDG", "T", "TDG", "RZ"]
+    multi = ["CX", "CZ", "SWAP"]
+    circuit = []
+    for _ in range(n_gates):
+        if rng.random() < 0.7:
+            name = single[rng.integers(len(single))]
+            params = (float(rng.uniform(-np.pi, np.pi)),) if name == "RZ" else ()
+            circuit.append(Gate(name, (int(rng.integers(n_qubits)),), params))
+        else:
+            name = multi[rng.integers(len(multi))]
+            circuit.append(Gate(name, tuple(int(q) for q in rng.choice(n_qubits, 2, replace=False))))
+    return circuit
+
+
+def benchmark(n_qubits: int = 16, n_gates: int = 400, n_circuits: int = 5, seed: int = 0) -> list[dict]:
+    """Gate counts, FLOPs and wall time of random circuits before and after optimize()."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for _ in range(n_circuits):
+        circuit = random_circuit(n_qubits, n_gates, rng)
+        start = time.perf_counter()
+        optimized = optimize(circuit)
+        optimize_ms = (time.perf_counter() - start) * 1000
+        plain = run_circuit(circuit, n_qubits, fusion=False)
+        fast = run_circuit(optimized, n_qubits, fusion=False)
+        error = float(np.max(np.abs(plain["state"].amplitudes - fast["state"].amplitudes)))
+        rows.append({
+            "before": circuit_cost(circuit, n_qubits),
+            "after": circuit_cost(optimized, n_qubits),
+            "optimize_ms": optimize_ms,
+            "apply_ms_before": plain["apply_ms"],
+            "apply_ms_after": fast["apply_ms"],
+            "max_error": error,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the circuit optimizer on random circuits")
+    parser.add_argument("--qubits", type=int, default=16)
+    parser.add_argument("--gates", type=int, default=400)
+    parser.add_argument("--circuits", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'gates':>13} {'MFLOPs':>17} {'apply ms':>17} {'opt ms':>8} {'max err':>9}")
+    for row in benchmark(args.qubits, args.gates, args.circuits, args.seed):
+        print(
+            f"{row['before']['gates']:>6} → {row['after']['gates']:<4} "
+            f"{row['before']['flops'] / 1e6:>7.1f} → {row['after']['flops'] / 1e6:<7.1f} "
+            f"{row['apply_ms_before']:>7.1f} → {row['apply_ms_after']:<7.1f} "
+            f"{row['optimize_ms']:>8.2f} {row['max_error']:>9.1e}"
+        )
@@ -0,0 +1,202 @@
+"""
+Longest palindromic substring engines for app1.
+
+- expand: expand around each of the 2n-1 centers, O(n²) worst case, O(1) space
+- manacher: Manacher's algorithm, O(n) time, one radius per center
+- auto: expand for short inputs, manacher above EXPAND_MAX_LENGTH
+
+PalindromeIndex wraps one radius array and answers the analytics queries
+(count, longest per prefix, maximal palindromes) from it in O(n) each.
+"""
+import time
+
+import numpy as np
+
+ALGORITHMS = ("auto", "expand", "manacher")
+
+# Above this length expand-around-center is never run (a run of 2000 equal
+# characters already costs ~1M comparisons in pure Python)
+EXPAND_MAX_LENGTH = 2000
+
+
+def expand_around_center(s: str, left: int, right: int) -> int:
+    """Expand from center while characters match. Returns length."""
+    while left >= 0 and right < len(s) and s[left] == s[right]:
+        left -= 1
+        right += 1
+    return right - left - 1
+
+
+def longest_expand(s: str) -> tuple[str, int, int]:
+    """Returns (substring, start_idx, length). Expand-around-center algorithm O(n²)."""
+    if not s:
+        return "", 0, 0
+    start, max_len = 0, 1
+    for i in range(len(s)):
+        len1 = expand_around_center(s, i, i)
+        len2 = expand_around_center(s, i, i + 1)
+        length = max(len1, len2)
+        if length > max_len:
+            max_len = length
+            start = i - (length - 1) // 2
+    return s[start : start + max_len], start, max_len
+
+
+def manacher_radii(s: str) -> list[int]:
+    """
+    Palindrome radius of every center, O(n).
+
+    Centers are the 2n+1 positions of s interleaved with separators
+    (#a#b#a#): even positions are gaps, odd positions are characters.
+    radii[i] is the length of the longest palindrome of s centered there,
+    starting at s[(i - radii[i]) // 2].
+    """
+    t = [None] * (2 * len(s) + 1)
+    t[1::2] = s
+    m = len(t)
+    radii = [0] * m
+    center = right = 0
+    for i in range(m):
+        # Mirror of i around the rightmost palindrome found so far
+        r = min(radii[2 * center - i], right - i) if i < right else 0
+        a, b = i - r - 1, i + r + 1
+        while a >= 0 and b < m and t[a] == t[b]:
+            a -= 1
+            b += 1
+        r = b - i - 1
+        radii[i] = r
+        if i + r > right:
+            center, right = i, i + r
+    return radii
+
+
+class PalindromeIndex:
+    """
+    Manacher radii of a string, computed once, and the queries built on them.
+    Center c with radius r covers s[(c - r) // 2 : (c + r) // 2].
+    """
+
+    def __init__(self, s: str):
+        self.s = s
+        self.radii = np.array(manacher_radii(s), dtype=np.int64)
+
+    def longest(self) -> tuple[str, int, int]:
+        """Returns (substring, start_idx, length)."""
+        if not self.s:
+            return "", 0, 0
+        # First maximum = leftmost center, the same answer expand-around-center gives
+        center = int(np.argmax(self.radii))
+        max_len = int(self.radii[center])
+        start = (center - max_len) // 2
+        return self.s[start : start + max_len], start, max_len
+
+    def count(self) -> int:
+        """Number of palindromic substrings (by position), each center adds ceil(r / 2)."""
+        return int(((self.radii + 1) // 2).sum())
+
+    def longest_ending_at(self) -> np.ndarray:
+        """
+        Length of the longest palindrome ending at every position.
+
+        A palindrome ending at s[e] centered at c has length 2e + 2 - c, so the
+        longest one uses the leftmost center whose right edge c + r reaches
+        2e + 2: a searchsorted on the running maximum of the right edges.
+        """
+        n = len(self.s)
+        if not n:
+            return np.zeros(0, dtype=np.int64)
+        reach = np.maximum.accumulate(np.arange(len(self.radii)) + self.radii)
+        edges = 2 * np.arange(n, dtype=np.int64) + 2
+        centers = np.searchsorted(reach, edges, side="left")
+        return edges - centers
+
+    def longest_per_prefix(self) -> tuple[np.ndarray, np.ndarray]:
+        """(lengths, starts): longest palindrome inside s[:j + 1] for every j (leftmost on ties)."""
+        ending = self.longest_ending_at()
+        if not len(ending):
+            return ending, ending
+        lengths = np.maximum.accumulate(ending)
+        # End of the palindrome that last raised the maximum
+        grows = np.r_[True, lengths[1:] > lengths[:-1]]
+        ends = np.maximum.accumulate(np.where(grows, np.arange(len(ending)), 0))
+        return lengths, ends - lengths + 1
+
+    def maximal(self, min_length: int = 2) -> tuple[np.ndarray, np.ndarray]:
+        """(starts, lengths) of all maximal palindromes, one per center, in center order."""
+        centers = np.flatnonzero(self.radii >= max(min_length, 1))
+        lengths = self.radii[centers]
+        return (centers - lengths) // 2, lengths
+
+
+def longest_manacher(s: str) -> tuple[str, int, int]:
+    """Returns (substring, start_idx, length). Manacher's algorithm O(n)."""
+    return PalindromeIndex(s).longest()
+
+
+ENGINES = {"expand": longest_expand, "manacher": longest_manacher}
+
+
+def choose_algorithm(s: str, algorithm: str = "auto") -> str:
+    """Engine to run; expand is replaced by manacher above EXPAND_MAX_LENGTH."""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}'. Choose from {', '.join(ALGORITHMS)}")
+    if algorithm in ("auto", "expand") and len(s) <= EXPAND_MAX_LENGTH:
+        return "expand"
+    return "manacher"
+
+
+def longest_palindrome(s: str, algorithm: str = "auto") -> tuple[str, int, int]:
+    """Longest palindromic substring with the chosen (or guarded) engine."""
+    return ENGINES[choose_algorithm(s, algorithm)](s)
+
+
+def timed_longest_palindrome(s: str, algorithm: str = "auto") -> dict:
+    """
+    Run the chosen engine and, when the input is small enough, the other one
+    too for comparison.
+
+    Returns:
+        dict with substring, start, length, algorithm (engine used),
+        requested, timings_ms {engine: ms or None when skipped},
+        index (the PalindromeIndex built by the manacher run, for the analytics)
+    """
+    used = choose_algorithm(s, algorithm)
+    timings = {}
+    result = index = None
+    for name, engine in ENGINES.items():
+        if name == "expand" and len(s) > EXPAND_MAX_LENGTH:
+            timings[name] = None
+            continue
+        start = time.perf_counter()
+        if name == "manacher":
+            index = PalindromeIndex(s)
+            answer = index.longest()
+        else:
+            answer = engine(s)
+        timings[name] = (time.perf_counter() - start) * 1000
+        if name == used:
+            result = answer
+    substring, start, length = result
+    return {
+        "substring": substring,
+        "start": start,
+        "length": length,
+        "algorithm": used,
+        "requested": algorithm,
+        "timings_ms": timings,
+        "index": index,
+    }
+
+
+def score_strings(strings: list[str], algorithm: str = "auto") -> list[dict]:
+    """Longest palindrome of every string (the batch endpoint's unit of work)."""
+    results = []
+    for s in strings:
+        substring, start, length = longest_palindrome(s, algorithm)
+        results.append({
+            "substring": substring,
+            "start": start,
+            "length": length,
+            "algorithm": choose_algorithm(s, algorithm),
+        })
+    return results
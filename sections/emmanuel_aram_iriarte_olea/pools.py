@@ -0,0 +1,27 @@
+"""
+Process pool shared by app1's batch scoring and app2's noisy trajectories.
+
+One worker per core, started on first use. When a worker dies (e.g. killed
+for memory) the pool is broken for good: callers catch BrokenProcessPool,
+call discard_pool() and the next get_pool() starts a fresh one.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """The shared pool, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+    return _pool
+
+
+def discard_pool() -> None:
+    """Drop a broken pool so the next get_pool() replaces it."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
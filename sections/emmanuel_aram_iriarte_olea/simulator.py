@@ -0,0 +1,286 @@
+"""
+N-qubit state-vector simulator for app2.
+
+The state is one complex128 array of 2^n amplitudes. Qubit 0 is the most
+significant bit of the basis index (|q0 q1 ... q(n-1)⟩), the convention of
+the original two-qubit table where the first qubit selects |1x⟩.
+
+Gates are applied in place on a (2,)*n view of the array: controls fix their
+axes to 1 by basic indexing, the target axes are split into their 2^k
+sub-views (the |0⟩ and |1⟩ halves for one target, quarters for two) and those
+are updated block by block, so temporaries never exceed 2^k blocks of
+BLOCK_SIZE amplitudes whatever the number of qubits.
+"""
+import math
+
+import numpy as np
+
+# Largest block (in amplitudes) of each target sub-view updated at a time
+BLOCK_SIZE = 1 << 16
+# Refuse states that would not fit comfortably in memory (2^28 amplitudes = 4 GiB)
+MAX_QUBITS = 28
+# Uniform draws per searchsorted call while sampling shots
+SAMPLE_CHUNK = 1 << 20
+
+SQRT1_2 = 1 / math.sqrt(2)
+
+GATES = {
+    "I": np.eye(2, dtype=np.complex128),
+    "X": np.array([[0, 1], [1, 0]], dtype=np.complex128),
+    "Y": np.array([[0, -1j], [1j, 0]], dtype=np.complex128),
+    "Z": np.array([[1, 0], [0, -1]], dtype=np.complex128),
+    "H": np.array([[SQRT1_2, SQRT1_2], [SQRT1_2, -SQRT1_2]], dtype=np.complex128),
+    "S": np.array([[1, 0], [0, 1j]], dtype=np.complex128),
+    "SDG": np.array([[1, 0], [0, -1j]], dtype=np.complex128),
+    "T": np.array([[1, 0], [0, np.exp(1j * math.pi / 4)]], dtype=np.complex128),
+    "TDG": np.array([[1, 0], [0, np.exp(-1j * math.pi / 4)]], dtype=np.complex128),
+    "SX": np.array([[1 + 1j, 1 - 1j], [1 - 1j, 1 + 1j]], dtype=np.complex128) / 2,
+}
+
+# Single-qubit gates taking one angle
+PARAMETRIC_GATES = ("RX", "RY", "RZ", "P")
+
+# Multi-qubit gates as (base gate, number of controls); qubits are listed controls first
+CONTROLLED_GATES = {
+    "CX": ("X", 1),
+    "CNOT": ("X", 1),
+    "CY": ("Y", 1),
+    "CZ": ("Z", 1),
+    "CH": ("H", 1),
+    "CCX": ("X", 2),
+    "TOFFOLI": ("X", 2),
+}
+
+# Names used by the original app2 buttons
+ALIASES = {"PAULIX": "X", "PAULIY": "Y", "PAULIZ": "Z", "HADAMARD": "H"}
+
+
+def gate_matrix(name: str, *params: float) -> np.ndarray:
+    """2x2 complex128 matrix of a named single-qubit gate."""
+    name = ALIASES.get(name.upper(), name.upper())
+    if name in GATES:
+        if params:
+            raise ValueError(f"Gate {name} takes no parameters")
+        return GATES[name]
+    if name in PARAMETRIC_GATES:
+        if len(params) != 1:
+            raise ValueError(f"Gate {name} takes exactly one angle")
+        theta = float(params[0])
+        c, s = math.cos(theta / 2), math.sin(theta / 2)
+        if name == "RX":
+            return np.array([[c, -1j * s], [-1j * s, c]], dtype=np.complex128)
+        if name == "RY":
+            return np.array([[c, -s], [s, c]], dtype=np.complex128)
+        if name == "RZ":
+            return np.array([[np.exp(-1j * theta / 2), 0], [0, np.exp(1j * theta / 2)]], dtype=np.complex128)
+        return np.array([[1, 0], [0, np.exp(1j * theta)]], dtype=np.complex128)
+    raise ValueError(f"Unknown gate '{name}'")
+
+
+def _blocks(*views: np.ndarray):
+    """Matching sub-views of equally shaped views (e.g. the |0⟩ and |1⟩ halves), at most BLOCK_SIZE amplitudes each."""
+    depth, size = 0, views[0].size
+    while size > BLOCK_SIZE:
+        size //= views[0].shape[depth]
+        depth += 1
+    for idx in np.ndindex(*views[0].shape[:depth]):
+        yield tuple(view[idx] for view in views)
+
+
+def _apply_2x2(a0: np.ndarray, a1: np.ndarray, m: np.ndarray) -> None:
+    """a0, a1 <- m @ (a0, a1) in place; diagonal and anti-diagonal gates avoid the general update."""
+    m00, m01, m10, m11 = m[0, 0], m[0, 1], m[1, 0], m[1, 1]
+    if m01 == 0 and m10 == 0:
+        for b0, b1 in _blocks(a0, a1):
+            if m00 != 1:
+                b0 *= m00
+            if m11 != 1:
+                b1 *= m11
+    elif m00 == 0 and m11 == 0:
+        for b0, b1 in _blocks(a0, a1):
+            swapped = b0 * m10
+            np.multiply(b1, m01, out=b0)
+            b1[...] = swapped
+    else:
+        for b0, b1 in _blocks(a0, a1):
+            new0 = m00 * b0 + m01 * b1
+            b1 *= m11
+            b1 += m10 * b0
+            b0[...] = new0
+
+
+def _apply_dense(views: list[np.ndarray], m: np.ndarray) -> None:
+    """views[i] <- sum_j m[i, j] views[j] in place; zero entries (permutations, phases) are skipped."""
+    terms = [[(j, m[i, j]) for j in range(len(views)) if m[i, j] != 0] for i in range(len(views))]
+    for blocks in _blocks(*views):
+        rows = []
+        for row_terms in terms:
+            row = np.zeros_like(blocks[0])
+            for j, mij in row_terms:
+                row += mij * blocks[j]
+            rows.append(row)
+        for block, row in zip(blocks, rows):
+            block[...] = row
+
+
+class StateVector:
+    """
+    Pure state of n qubits, updated in place by the apply_* methods
+    (which return self so calls can be chained).
+    """
+
+    def __init__(self, n_qubits: int, amplitudes=None):
+        if not 1 <= n_qubits <= MAX_QUBITS:
+            raise ValueError(f"Number of qubits must be between 1 and {MAX_QUBITS}")
+        self.n_qubits = n_qubits
+        if amplitudes is None:
+            self.amplitudes = np.zeros(1 << n_qubits, dtype=np.complex128)
+            self.amplitudes[0] = 1
+        else:
+            self.amplitudes = np.array(amplitudes, dtype=np.complex128).reshape(-1)
+            if self.amplitudes.size != 1 << n_qubits:
+                raise ValueError(f"Expected {1 << n_qubits} amplitudes, got {self.amplitudes.size}")
+
+    @classmethod
+    def from_bitstring(cls, bits: str) -> "StateVector":
+        """Computational basis state, e.g. '0110'."""
+        if not bits or set(bits) - {"0", "1"}:
+            raise ValueError("Bitstring must contain only 0 and 1")
+        state = cls(len(bits))
+        state.amplitudes[0] = 0
+        state.amplitudes[int(bits, 2)] = 1
+        return state
+
+    @property
+    def tensor(self) -> np.ndarray:
+        """(2,)*n view of the amplitudes, axis k is qubit k."""
+        return self.amplitudes.reshape((2,) * self.n_qubits)
+
+    def _check_qubits(self, qubits) -> None:
+        for q in qubits:
+            if not 0 <= q < self.n_qubits:
+                raise ValueError(f"Qubit {q} out of range for {self.n_qubits} qubits")
+        if len(set(qubits)) != len(qubits):
+            raise ValueError("Target and control qubits must be distinct")
+
+    def _controlled_view(self, controls) -> tuple[np.ndarray, list[int]]:
+        """View of the subspace where every control is |1⟩, and the remaining axes (qubits)."""
+        index = [slice(None)] * self.n_qubits
+        for c in controls:
+            index[c] = 1
+        free = [q for q in range(self.n_qubits) if q not in controls]
+        return self.tensor[tuple(index)], free
+
+    def apply_matrix(self, matrix, targets, controls=()) -> "StateVector":
+        """
+        Apply a 2^k x 2^k matrix to the k target qubits (targets[0] is the most
+        significant bit of the matrix index), only where all controls are |1⟩.
+        """
+        targets, controls = [int(q) for q in targets], [int(q) for q in controls]
+        self._check_qubits(targets + controls)
+        matrix = np.asarray(matrix, dtype=np.complex128)
+        if matrix.shape != (1 << len(targets),) * 2:
+            raise ValueError(f"Matrix shape {matrix.shape} does not match {len(targets)} target qubits")
+        view, free = self._controlled_view(controls)
+        axes = [free.index(t) for t in targets]
+
+        if len(targets) == 1:
+            index0 = [slice(None)] * view.ndim
+            index1 = [slice(None)] * view.ndim
+            # Length-1 slices rather than 0/1 so even a 1-d view stays a view
+            index0[axes[0]], index1[axes[0]] = slice(0, 1), slice(1, 2)
+            _apply_2x2(view[tuple(index0)], view[tuple(index1)], matrix)
+            return self
+
+        # Multi-qubit matrices: one sub-view per basis state of the targets, in matrix index order
+        k = len(targets)
+        views = []
+        for i in range(1 << k):
+            index = [slice(None)] * view.ndim
+            for t, axis in enumerate(axes):
+                bit = (i >> (k - 1 - t)) & 1
+                index[axis] = slice(bit, bit + 1)
+            views.append(view[tuple(index)])
+        _apply_dense(views, matrix)
+        return self
+
+    def apply_gate(self, name: str, *qubits: int, params=()) -> "StateVector":
+        """
+        Apply a named gate. Single-qubit gates take one target, controlled gates
+        (CX, CZ, CCX, ...) list their controls first, SWAP takes two qubits.
+        """
+        upper = ALIASES.get(name.upper(), name.upper())
+        if upper == "SWAP":
+            if len(qubits) != 2:
+                raise ValueError("SWAP takes two qubits")
+            a, b = qubits
+            self._check_qubits([a, b])
+            # Only |..0..1..⟩ and |..1..0..⟩ exchange amplitudes
+            index01 = [slice(None)] * self.n_qubits
+            index10 = [slice(None)] * self.n_qubits
+            index01[a], index01[b] = slice(0, 1), slice(1, 2)
+            index10[a], index10[b] = slice(1, 2), slice(0, 1)
+            view01, view10 = self.tensor[tuple(index01)], self.tensor[tuple(index10)]
+            for b01, b10 in _blocks(view01, view10):
+                swapped = b01.copy()
+                b01[...] = b10
+                b10[...] = swapped
+            return self
+        if upper in CONTROLLED_GATES:
+            base, n_controls = CONTROLLED_GATES[upper]
+            if len(qubits) != n_controls + 1:
+                raise ValueError(f"{upper} takes {n_controls} control(s) and one target")
+            return self.apply_matrix(gate_matrix(base), [qubits[-1]], qubits[:-1])
+        if len(qubits) != 1:
+            raise ValueError(f"{upper} takes exactly one target qubit")
+        return self.apply_matrix(gate_matrix(upper, *params), [qubits[0]])
+
+    def probabilities(self) -> np.ndarray:
+        """|amplitude|² of every basis state."""
+        return np.abs(self.amplitudes) ** 2
+
+    def marginal_probabilities(self, qubits=None) -> np.ndarray:
+        """
+        Outcome probabilities of measuring only the given qubits (all by default),
+        qubits[0] being the most significant bit of the outcome index.
+        """
+        if qubits is None:
+            return self.probabilities()
+        qubits = [int(q) for q in qubits]
+        self._check_qubits(qubits)
+        others = tuple(q for q in range(self.n_qubits) if q not in qubits)
+        marginal = self.probabilities().reshape((2,) * self.n_qubits).sum(axis=others)
+        # Remaining axes are in increasing qubit order, put them in the requested one
+        order = sorted(qubits)
+        return marginal.transpose([order.index(q) for q in qubits]).reshape(-1)
+
+    def sample_counts(self, shots: int, qubits=None, rng: np.random.Generator | None = None) -> np.ndarray:
+        """
+        Histogram of shots measurements of the given qubits (index = outcome).
+        Uniform draws are located in the cumulative distribution with
+        searchsorted, SAMPLE_CHUNK at a time, and only their counts are kept.
+        """
+        if shots < 0:
+            raise ValueError("Number of shots must be non-negative")
+        rng = rng or np.random.default_rng()
+        cdf = np.cumsum(self.marginal_probabilities(qubits))
+        cdf /= cdf[-1]
+        counts = np.zeros(cdf.size, dtype=np.int64)
+        for start in range(0, shots, SAMPLE_CHUNK):
+            draws = rng.random(min(SAMPLE_CHUNK, shots - start))
+            counts += np.bincount(np.searchsorted(cdf, draws, side="right"), minlength=cdf.size)
+        return counts
+
+    def norm(self) -> float:
+        return float(np.linalg.norm(self.amplitudes))
+
+    def copy(self) -> "StateVector":
+        return StateVector(self.n_qubits, self.amplitudes.copy())
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.amplitudes.nbytes
+
+    def labels(self) -> list[str]:
+        """Ket labels |00…⟩ of every basis state (small states only)."""
+        return [f"|{i:0{self.n_qubits}b}⟩" for i in range(1 << self.n_qubits)]
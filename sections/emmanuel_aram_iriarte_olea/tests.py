@@ -0,0 +1,485 @@
+import json
+import random
+from unittest import mock
+
+import numpy as np
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from . import pools, simulator, views
+from .palindromes import EXPAND_MAX_LENGTH, PalindromeIndex, longest_expand, longest_manacher, timed_longest_palindrome
+from .circuit_store import CACHE_KEY, HISTORY_LIMIT, CircuitSession
+from .circuits import Gate, parse_circuit, run_circuit
+from .noise import NoiseModel, choose_backend, run_density, run_noisy, run_trajectories
+from .optimizer import circuit_cost, gate_flops, optimize, random_circuit
+from .simulator import SQRT1_2, StateVector, gate_matrix
+
+
+class PalindromeEngineTests(SimpleTestCase):
+    """Manacher must return exactly what expand-around-center returns"""
+
+    def test_examples(self):
+        for s, expected in (("babad", "bab"), ("cbbd", "bb"), ("racecar", "racecar"), ("a", "a"), ("", "")):
+            self.assertEqual(longest_manacher(s)[0], expected)
+            self.assertEqual(longest_expand(s)[0], expected)
+
+    def test_agrees_with_expand(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            s = "".join(rng.choice("ab") for _ in range(rng.randint(1, 60)))
+            self.assertEqual(longest_manacher(s), longest_expand(s), s)
+
+    def test_guard_skips_expand(self):
+        result = timed_longest_palindrome("ab" * EXPAND_MAX_LENGTH, "expand")
+        self.assertEqual(result["algorithm"], "manacher")
+        self.assertIsNone(result["timings_ms"]["expand"])
+        self.assertEqual(result["length"], 2 * EXPAND_MAX_LENGTH - 1)
+
+
+class App1ViewTests(SimpleTestCase):
+
+    def test_reports_both_timings(self):
+        response = self.client.post(reverse("emmanuel_app1"), {"input_string": "cbbd", "algorithm": "manacher"})
+        self.assertContains(response, 'Result:</strong> "bb"')
+        self.assertContains(response, "Manacher (O(n))")
+        self.assertContains(response, "Expand around centers (O(n²))")
+
+
+class PalindromeIndexTests(SimpleTestCase):
+    """Analytics from the shared radius array against brute force"""
+
+    @staticmethod
+    def brute(s):
+        palindromes = [(i, j - i) for i in range(len(s)) for j in range(i + 1, len(s) + 1) if s[i:j] == s[i:j][::-1]]
+        per_prefix = [max((length, -start) for start, length in palindromes if start + length <= j) for j in range(1, len(s) + 1)]
+        return len(palindromes), [(length, -start) for length, start in per_prefix]
+
+    def test_against_brute_force(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            s = "".join(rng.choice("abc") for _ in range(rng.randint(1, 16)))
+            index = PalindromeIndex(s)
+            count, per_prefix = self.brute(s)
+            self.assertEqual(index.count(), count, s)
+            lengths, starts = index.longest_per_prefix()
+            self.assertEqual(list(zip(lengths.tolist(), starts.tolist())), per_prefix, s)
+
+    def test_maximal(self):
+        starts, lengths = PalindromeIndex("abacabad").maximal()
+        self.assertEqual(list(zip(starts.tolist(), lengths.tolist())), [(0, 3), (0, 7), (4, 3)])
+
+    def test_view_analytics(self):
+        response = self.client.post(reverse("emmanuel_app1"), {"input_string": "aaa", "analytics": "on"})
+        self.assertContains(response, "<strong>Palindromic substrings:</strong> 6")
+
+
+class App1RenderingTests(SimpleTestCase):
+    """Result rendering stays small and streams for large inputs"""
+
+    def test_three_slices(self):
+        response = self.client.post(reverse("emmanuel_app1"), {"input_string": "xxabcbayy"})
+        self.assertContains(response, '<div class="string-display">xx<span class="palindrome">abcba</span>yy</div>')
+
+    def test_escapes_input(self):
+        response = self.client.post(reverse("emmanuel_app1"), {"input_string": "<b>"})
+        self.assertNotContains(response, "<b>")
+
+    def test_large_upload_streams_elided(self):
+        text = "xy" * 40_000 + "racecar" + "yz" * 40_000
+        upload = SimpleUploadedFile("input.txt", text.encode())
+        response = self.client.post(reverse("emmanuel_app1"), {"input_file": upload, "algorithm": "auto"})
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode()
+        self.assertIn("160007 characters", body)
+        self.assertLess(len(body), 30_000)
+
+
+class App1BatchTests(SimpleTestCase):
+    """Batch endpoint: input order, per-item and total limits, NDJSON in and out"""
+
+    def post(self, data, content_type="application/json"):
+        response = self.client.post(reverse("emmanuel_app1_batch"), data, content_type=content_type)
+        if response.streaming:
+            return response, [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        return response, response.json()
+
+    def test_json_inline(self):
+        response, lines = self.post({"strings": ["babad", "cbbd", 7, "racecar"], "algorithm": "manacher"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([line["index"] for line in lines], [0, 1, 2, 3])
+        self.assertEqual([line.get("substring") for line in lines], ["bab", "bb", None, "racecar"])
+        self.assertEqual(lines[2]["error"], "Expected a string")
+
+    def test_process_pool_preserves_order(self):
+        rng = random.Random(5)
+        strings = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 3000))) for _ in range(200)]
+        strings[17] = "a" * (views.BATCH_MAX_ITEM_CHARS + 1)
+        response, lines = self.post("\n".join(json.dumps(s) for s in strings), "application/x-ndjson")
+        self.assertEqual([line["index"] for line in lines], list(range(200)))
+        self.assertIn("too long", lines[17]["error"])
+        for i in (0, 100, 199):
+            self.assertEqual(lines[i]["length"], longest_manacher(strings[i])[2])
+
+    def test_total_limit(self):
+        with mock.patch.object(views, "BATCH_MAX_TOTAL_CHARS", 10):
+            response, body = self.post(["abcdef", "abcdef"])
+        self.assertEqual(response.status_code, 413)
+        self.assertIn("Batch too large", body["error"])
+
+
+def dense_operator(n, matrix, targets, controls=()):
+    """Full 2^n x 2^n operator of a (controlled) gate, built index by index"""
+    size, k = 1 << n, len(targets)
+    operator = np.zeros((size, size), dtype=complex)
+    for i in range(size):
+        bits = [(i >> (n - 1 - q)) & 1 for q in range(n)]
+        if not all(bits[c] for c in controls):
+            operator[i, i] = 1
+            continue
+        column = int("".join(str(bits[t]) for t in targets), 2)
+        for row in range(1 << k):
+            out = bits[:]
+            for j, t in enumerate(targets):
+                out[t] = (row >> (k - 1 - j)) & 1
+            operator[int("".join(map(str, out)), 2), i] += matrix[row, column]
+    return operator
+
+
+class StateVectorTests(SimpleTestCase):
+    """In-place gate application against dense operators"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(11)
+
+    def random_state(self, n):
+        psi = self.rng.normal(size=1 << n) + 1j * self.rng.normal(size=1 << n)
+        return psi / np.linalg.norm(psi)
+
+    def test_against_dense_operator(self):
+        for _ in range(100):
+            n = int(self.rng.integers(2, 6))
+            qubits = [int(q) for q in self.rng.permutation(n)]
+            k = int(self.rng.integers(1, 3))
+            targets, controls = qubits[:k], qubits[k:k + int(self.rng.integers(0, n - k + 1))]
+            if k == 1:
+                matrix = gate_matrix(str(self.rng.choice(["X", "Y", "Z", "H", "T", "SX"])))
+            else:
+                matrix, _ = np.linalg.qr(self.rng.normal(size=(4, 4)) + 1j * self.rng.normal(size=(4, 4)))
+            psi = self.random_state(n)
+            state = StateVector(n, psi).apply_matrix(matrix, targets, controls)
+            np.testing.assert_allclose(state.amplitudes, dense_operator(n, matrix, targets, controls) @ psi, atol=1e-12)
+
+    def test_blocked_updates(self):
+        psi = self.random_state(7)
+        with mock.patch.object(simulator, "BLOCK_SIZE", 4):
+            blocked = StateVector(7, psi).apply_gate("H", 3).apply_gate("CX", 6, 0).apply_gate("SWAP", 1, 5)
+        plain = StateVector(7, psi).apply_gate("H", 3).apply_gate("CX", 6, 0).apply_gate("SWAP", 1, 5)
+        np.testing.assert_allclose(blocked.amplitudes, plain.amplitudes)
+
+    def test_multi_target_blocked_updates(self):
+        psi = self.random_state(7)
+        # A permutation (zero entries skipped) and a dense three-qubit unitary
+        cx = np.eye(4)[[0, 1, 3, 2]]
+        matrix, _ = np.linalg.qr(self.rng.normal(size=(8, 8)) + 1j * self.rng.normal(size=(8, 8)))
+        with mock.patch.object(simulator, "BLOCK_SIZE", 4):
+            blocked = StateVector(7, psi).apply_matrix(cx, [5, 2]).apply_matrix(matrix, [4, 0, 6], [1])
+        expected = dense_operator(7, cx, [5, 2]) @ psi
+        expected = dense_operator(7, matrix, [4, 0, 6], [1]) @ expected
+        np.testing.assert_allclose(blocked.amplitudes, expected, atol=1e-12)
+
+    def test_ghz_20_qubits(self):
+        state = StateVector(20).apply_gate("H", 0)
+        for q in range(19):
+            state.apply_gate("CX", q, q + 1)
+        np.testing.assert_allclose(state.amplitudes[[0, -1]], [SQRT1_2, SQRT1_2])
+        self.assertAlmostEqual(state.norm(), 1)
+
+    def test_app2_pauli_y_is_complex(self):
+        response = self.client.post(reverse("emmanuel_app2"), {"action": "PauliY", "s0": "1", "s1": "0", "s2": "0", "s3": "0"})
+        self.assertContains(response, "<td>|10⟩</td><td>1.000i</td>")
+
+
+class CircuitModeTests(SimpleTestCase):
+    """Parsing, fusion and the circuit mode endpoints"""
+
+    def test_parse_text_and_json(self):
+        text = parse_circuit("h 0; CX 0 1\nRZ(0.5) q1\n# comment")
+        as_json = parse_circuit([{"gate": "H", "qubits": [0]}, "CX 0 1", {"gate": "rz", "qubits": [1], "params": [0.5]}])
+        self.assertEqual(text, as_json)
+        for bad in ("FOO 0", "CX 0", "H 0 1", "RX 0", "H(1) 0", "CX 1 1"):
+            with self.assertRaises(ValueError):
+                parse_circuit(bad)
+
+    def test_fusion_matches_gate_by_gate(self):
+        rng = np.random.default_rng(2)
+        names = ["H", "X", "Y", "Z", "S", "T", "RX", "CX", "CZ", "SWAP", "CCX"]
+        for _ in range(30):
+            circuit = []
+            for _ in range(40):
+                name = str(rng.choice(names))
+                arity = {"CX": 2, "CZ": 2, "SWAP": 2, "CCX": 3}.get(name, 1)
+                qubits = tuple(int(q) for q in rng.choice(5, arity, replace=False))
+                circuit.append(Gate(name, qubits, (float(rng.normal()),) if name == "RX" else ()))
+            fused = run_circuit(circuit, 5, "01101")
+            plain = run_circuit(circuit, 5, "01101", fusion=False)
+            self.assertLess(fused["block_count"], plain["block_count"])
+            np.testing.assert_allclose(fused["state"].amplitudes, plain["state"].amplitudes, atol=1e-12)
+
+    def test_json_endpoint(self):
+        response = self.client.post(
+            reverse("emmanuel_app2"), json.dumps({"circuit": "H 0; CX 0 1; H 0; H 0", "n_qubits": 2}),
+            content_type="application/json",
+        )
+        body = response.json()
+        # The optimizer drops H·H, fusion folds H and CX into one operation
+        self.assertEqual((body["optimization"]["before"]["gates"], body["gate_count"], body["block_count"]), (4, 2, 1))
+        np.testing.assert_allclose(body["probabilities"], [0.5, 0, 0, 0.5])
+        self.assertEqual([o["basis"] for o in body["top_outcomes"]], ["00", "11"])
+
+    def test_json_errors(self):
+        response = self.client.post(
+            reverse("emmanuel_app2"), json.dumps({"circuit": "H 5", "n_qubits": 2}), content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        for flags in ({"fusion": "false"}, {"optimize": 0}, {"fusion": None}):
+            response = self.client.post(
+                reverse("emmanuel_app2"), json.dumps({"circuit": "H 0", **flags}), content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("must be true or false", response.json()["error"])
+        response = self.client.post(
+            reverse("emmanuel_app2"), json.dumps({"circuit": "H 0; H 0", "optimize": False}), content_type="application/json",
+        )
+        self.assertIsNone(response.json()["optimization"])
+
+    def test_form(self):
+        response = self.client.post(reverse("emmanuel_app2"), {"action": "circuit", "circuit": "X 0\nX 2", "n_qubits": "3"})
+        self.assertContains(response, "<tr><td>|101⟩</td><td>1.000</td><td>1.0000</td></tr>")
+
+
+class OptimizerTests(SimpleTestCase):
+    """The optimized circuit must prepare exactly the same state"""
+
+    def test_equivalence(self):
+        rng = np.random.default_rng(4)
+        for _ in range(20):
+            circuit = random_circuit(6, 120, rng)
+            circuit += [Gate("CCX", (0, 1, 2)), Gate("T", (0,)), Gate("CCX", (1, 0, 2)), Gate("TDG", (0,))]
+            optimized = optimize(circuit)
+            self.assertLess(circuit_cost(optimized, 6)["flops"], circuit_cost(circuit, 6)["flops"])
+            np.testing.assert_allclose(
+                run_circuit(optimized, 6, "010110", fusion=False)["state"].amplitudes,
+                run_circuit(circuit, 6, "010110", fusion=False)["state"].amplitudes, atol=1e-12,
+            )
+
+    def test_cancellations(self):
+        # Z commutes through the CX control and cancels, then the CX pair meets and cancels
+        circuit = parse_circuit("H 0; H 0; CX 0 1; Z 0; CX 0 1; Z 0; SWAP 1 2; SWAP 2 1")
+        self.assertEqual(optimize(circuit), [])
+        merged = optimize(parse_circuit("H 0; T 0; H 0; X 1"))
+        self.assertEqual([gate.label for gate in merged], ["U 0", "X 1"])
+
+    def test_flops(self):
+        self.assertEqual(gate_flops(Gate("H", (0,)), 4), 8 * 28)
+        self.assertEqual(gate_flops(Gate("Z", (0,)), 4), 8 * 6)
+        self.assertEqual(gate_flops(Gate("CX", (0, 1)), 4), 8 * 6)
+
+
+class MeasurementTests(SimpleTestCase):
+    """Shot sampling and marginal measurement"""
+
+    def test_marginal_order(self):
+        state = StateVector(3).apply_gate("H", 0).apply_gate("CX", 0, 1).apply_gate("X", 2)
+        np.testing.assert_allclose(state.marginal_probabilities([2, 0]), [0, 0, 0.5, 0.5])
+        np.testing.assert_allclose(state.marginal_probabilities([1]), [0.5, 0.5])
+
+    def test_sample_counts(self):
+        state = StateVector(4).apply_gate("RY", 0, params=(1.0,)).apply_gate("H", 3)
+        with mock.patch.object(simulator, "SAMPLE_CHUNK", 1000):
+            counts = state.sample_counts(200_000, [0], np.random.default_rng(0))
+        self.assertEqual(counts.sum(), 200_000)
+        self.assertAlmostEqual(counts[1] / 200_000, np.sin(0.5) ** 2, places=2)
+        # Impossible outcomes are never drawn
+        self.assertEqual(StateVector.from_bitstring("10").sample_counts(10_000).tolist(), [0, 0, 10_000, 0])
+
+    def test_json_shots(self):
+        response = self.client.post(
+            reverse("emmanuel_app2"),
+            json.dumps({"circuit": "H 0; CX 0 1; X 2", "n_qubits": 3, "shots": 100_000, "measure": [1, 2]}),
+            content_type="application/json",
+        )
+        measurement = response.json()["measurement"]
+        self.assertEqual(set(measurement["counts"]), {"01", "11"})
+        self.assertEqual(sum(measurement["counts"].values()), 100_000)
+
+
+class CircuitSessionTests(SimpleTestCase):
+    def test_undo_redo_without_state_copies(self):
+        session = CircuitSession.create(3)
+        for spec in ("H 0", "CX 0 1", "RY(0.3) 2", "T 1"):
+            session.apply(parse_circuit(spec)[0])
+        after = session.state.amplitudes.copy()
+        self.assertEqual(session.labels(), ["H 0", "CX 0 1", "RY(0.3) 2", "T 1"])
+        while session.undo():
+            pass
+        np.testing.assert_allclose(session.state.amplitudes, StateVector(3).amplitudes, atol=1e-12)
+        while session.redo():
+            pass
+        np.testing.assert_allclose(session.state.amplitudes, after, atol=1e-12)
+        # A new gate drops the redo tail
+        session.undo()
+        session.apply(Gate("X", (2,)))
+        self.assertFalse(session.can_redo)
+        self.assertEqual(session.labels()[-1], "X 2")
+
+    def test_history_is_bounded(self):
+        session = CircuitSession.create(1)
+        for _ in range(HISTORY_LIMIT + 5):
+            session.apply(Gate("H", (0,)))
+        self.assertEqual(len(session.history), HISTORY_LIMIT)
+        undone = 0
+        while session.undo():
+            undone += 1
+        self.assertEqual(undone, HISTORY_LIMIT)
+
+    def test_state_round_trips_as_bytes(self):
+        session = CircuitSession.create(2)
+        session.apply(Gate("RX", (1,), (0.7,)))
+        session.save()
+        loaded = CircuitSession.load(session.circuit_id)
+        np.testing.assert_array_equal(loaded.state.amplitudes, session.state.amplitudes)
+        loaded.state.apply_gate("X", 0)  # writable copy
+        self.assertIsNone(CircuitSession.load("missing"))
+
+    def test_json_session(self):
+        created = self.client.post(reverse("emmanuel_app2_session"), json.dumps({"n_qubits": 2}), content_type="application/json")
+        self.assertEqual(created.status_code, 201)
+        url = reverse("emmanuel_app2_session_detail", args=[created.json()["circuit_id"]])
+        for payload in ({"gate": "H 0"}, {"gate": "CX 0 1"}, {"action": "undo"}, {"action": "redo"}):
+            response = self.client.post(url, json.dumps(payload), content_type="application/json")
+        data = response.json()
+        self.assertEqual(data["history"], ["H 0", "CX 0 1"])
+        np.testing.assert_allclose([p["probability"] for p in data["top_outcomes"]], [0.5, 0.5])
+        bad = self.client.post(url, json.dumps({"gate": "H 5"}), content_type="application/json")
+        self.assertEqual(bad.status_code, 400)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_form_sends_only_circuit_id(self):
+        response = self.client.post(reverse("emmanuel_app2"), {"action": "Hadamard"})
+        self.assertNotContains(response, 'name="s0"')
+        circuit_id = response.content.decode().split('name="circuit_id" value="')[1].split('"')[0]
+        response = self.client.post(reverse("emmanuel_app2"), {"action": "CNOT", "circuit_id": circuit_id})
+        self.assertContains(response, "<td>|11⟩</td><td>0.707</td>")
+        response = self.client.post(reverse("emmanuel_app2"), {"action": "undo", "circuit_id": circuit_id})
+        self.assertContains(response, "<td>|10⟩</td><td>0.707</td>")
+        self.assertContains(response, "Applied gates: H 0")
+
+    def test_form_reports_expired_session(self):
+        response = self.client.post(reverse("emmanuel_app2"), {"action": "Hadamard", "circuit_id": "expired"})
+        self.assertContains(response, "has expired or is unknown")
+        self.assertContains(response, 'name="circuit_id" value=""')
+        self.assertContains(response, "Applied gates: none")
+        response = self.client.post(reverse("emmanuel_app2"), {"action": "reset", "circuit_id": "expired", "initial_state": "11"})
+        self.assertNotContains(response, "has expired")
+        self.assertContains(response, "<td>|11⟩</td><td>1.000</td>")
+
+    def test_configurable_cache(self):
+        caches_setting = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+            "circuits": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "circuits"},
+        }
+        with self.settings(CACHES=caches_setting, EMMANUEL_CIRCUIT_CACHE="circuits"):
+            session = CircuitSession.create(1)
+            key = CACHE_KEY.format(session.circuit_id)
+            self.assertIsNotNone(caches["circuits"].get(key))
+            self.assertIsNone(caches["default"].get(key))
+            self.assertIsNotNone(CircuitSession.load(session.circuit_id))
+
+
+class NoiseTests(SimpleTestCase):
+    def test_density_matrix_channels(self):
+        # X then amplitude damping: |1⟩ decays with probability gamma
+        rho = run_density(parse_circuit("X 0"), 1, NoiseModel(amplitude_damping=0.25))
+        np.testing.assert_allclose(rho.probabilities(), [0.25, 0.75])
+        rho = run_density(parse_circuit("I 0"), 1, NoiseModel(bit_flip=0.1))
+        np.testing.assert_allclose(rho.probabilities(), [0.9, 0.1])
+        # Full depolarizing leaves the maximally mixed state
+        rho = run_density(parse_circuit("H 0"), 1, NoiseModel(depolarizing=1))
+        np.testing.assert_allclose(rho.matrix, np.eye(2) / 2, atol=1e-12)
+        self.assertAlmostEqual(rho.purity(), 0.5)
+
+    def test_ideal_density_matches_state_vector(self):
+        circuit = parse_circuit("H 0; CX 0 1; RY(0.4) 2; CCX 0 1 2")
+        rho = run_density(circuit, 3, NoiseModel())
+        psi = run_circuit(circuit, 3, fusion=False)["state"].amplitudes
+        np.testing.assert_allclose(rho.matrix, np.outer(psi, psi.conj()), atol=1e-12)
+
+    def test_trajectories_match_density_matrix(self):
+        circuit = parse_circuit("H 0; CX 0 1; X 2; CCX 0 1 2")
+        noise = NoiseModel(depolarizing=0.1, amplitude_damping=0.2, bit_flip=0.05)
+        exact = run_density(circuit, 3, noise).probabilities()
+        estimate = run_trajectories(circuit, 3, noise, 2000, seed=0, workers=1)
+        np.testing.assert_allclose(estimate, exact, atol=0.03)
+        self.assertAlmostEqual(estimate.sum(), 1)
+        # Batches split over the process pool give an estimate of the same quality
+        parallel = run_trajectories(circuit, 3, noise, 2000, seed=0, workers=2)
+        np.testing.assert_allclose(parallel, exact, atol=0.03)
+
+    def test_backend_choice(self):
+        self.assertEqual(choose_backend(4), "density")
+        self.assertEqual(choose_backend(16), "trajectory")
+        with self.assertRaises(ValueError):
+            choose_backend(16, "density")
+        result = run_noisy(parse_circuit("H 0"), 16, NoiseModel(bit_flip=0.5), trajectories=4, seed=1)
+        self.assertEqual(result["backend"], "trajectory")
+        self.assertAlmostEqual(result["probabilities"].sum(), 1)
+
+    def test_json_noise(self):
+        response = self.client.post(
+            reverse("emmanuel_app2"),
+            json.dumps({"circuit": "H 0; CX 0 1", "n_qubits": 2, "noise": {"bit_flip": 0.1}, "shots": 1000}),
+            content_type="application/json",
+        )
+        noise = response.json()["noise"]
+        self.assertEqual(noise["backend"], "density")
+        probabilities = {row["basis"]: row["probability"] for row in noise["top_outcomes"]}
+        self.assertAlmostEqual(probabilities["01"], 0.09)
+        self.assertAlmostEqual(probabilities["00"], 0.41)
+        # Shots are drawn from the noisy distribution
+        self.assertEqual(set(response.json()["measurement"]["counts"]), {"00", "01", "10", "11"})
+        bad = self.client.post(
+            reverse("emmanuel_app2"), json.dumps({"circuit": "H 0", "noise": {"bit_flip": 2}}), content_type="application/json",
+        )
+        self.assertEqual(bad.status_code, 400)
+
+    def test_trajectory_work_limit(self):
+        payload = {"circuit": "H 0; CX 0 1", "n_qubits": 2, "noise": {"bit_flip": 0.1}, "backend": "trajectory", "trajectories": 100}
+        with mock.patch.object(views, "NOISE_MAX_WORK", 100 * 2 * 4 - 1):
+            response = self.client.post(reverse("emmanuel_app2"), json.dumps(payload), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Noisy run too large", response.json()["error"])
+        with mock.patch.object(views, "NOISE_MAX_WORK", 100 * 2 * 4):
+            response = self.client.post(reverse("emmanuel_app2"), json.dumps(payload), content_type="application/json")
+        self.assertEqual(response.json()["noise"]["backend"], "trajectory")
+
+    def test_broken_pool_is_replaced(self):
+        pool = pools.get_pool()
+        pools.discard_pool()
+        self.assertIsNot(pools.get_pool(), pool)
+
+    def test_noise_ignores_optimizer_cancellations(self):
+        # H·H cancels to nothing, but each H still depolarizes the qubit
+        response = self.client.post(
+            reverse("emmanuel_app2"),
+            json.dumps({"circuit": "H 0; H 0", "n_qubits": 1, "noise": {"depolarizing": 0.3}}),
+            content_type="application/json",
+        )
+        data = response.json()
+        self.assertEqual(data["optimization"]["after"]["gates"], 0)
+        probabilities = {row["basis"]: row["probability"] for row in data["noise"]["top_outcomes"]}
+        expected = run_density(parse_circuit("H 0; H 0"), 1, NoiseModel(depolarizing=0.3)).probabilities()
+        self.assertAlmostEqual(probabilities["1"], expected[1])
+        self.assertGreater(probabilities["1"], 0.1)
@@ -4,6 +4,9 @@ from . import views
 urlpatterns = [
     path("", views.index, name="emmanuel_index"),
     path("app1/", views.app1, name="emmanuel_app1"),
+    path("app1/batch/", views.app1_batch, name="emmanuel_app1_batch"),
     path("app2/", views.app2, name="emmanuel_app2"),
+    path("app2/session/", views.app2_session, name="emmanuel_app2_session"),
+    path("app2/session/<str:circuit_id>/", views.app2_session, name="emmanuel_app2_session_detail"),
     path("app3/", views.app3, name="emmanuel_app3"),
 ]
@@ -3,33 +3,25 @@ NOTE FOR FERNANDO: The inline JavaScript logic has been migrated to Python.
 All computation (longest palindromic substring, quantum gates, Fibonacci)
 now runs server-side. Forms submit via POST and the view returns the result.
 """
+import json
 import math
 import time
-from django.http import HttpResponse
-from django.views.decorators.csrf import csrf_exempt
-
-
-def _expand_around_center(s: str, left: int, right: int) -> int:
-    """Expand from center while characters match. Returns length."""
-    while left >= 0 and right < len(s) and s[left] == s[right]:
-        left -= 1
-        right += 1
-    return right - left - 1
+from concurrent.futures.process import BrokenProcessPool
 
+import numpy as np
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.html import escape
+from django.views.decorators.csrf import csrf_exempt
 
-def _longest_palindromic_substring(s: str) -> tuple[str, int, int]:
-    """Returns (substring, start_idx, length). Expand-around-center algorithm O(n²)."""
-    if not s:
-        return "", 0, 0
-    start, max_len = 0, 1
-    for i in range(len(s)):
-        len1 = _expand_around_center(s, i, i)
-        len2 = _expand_around_center(s, i, i + 1)
-        length = max(len1, len2)
-        if length > max_len:
-            max_len = length
-            start = i - (length - 1) // 2
-    return s[start : start + max_len], start, max_len
+from .circuit_store import HISTORY_LIMIT, SESSION_MAX_QUBITS, CircuitSession
+from .circuits import CIRCUIT_MAX_QUBITS, Gate, parse_circuit, parse_gate, run_circuit, top_outcomes
+from .noise import BACKENDS, DEFAULT_TRAJECTORIES, NoiseModel, choose_backend, run_noisy
+from .optimizer import circuit_cost, optimize
+from .pools import discard_pool, get_pool
+from .simulator import StateVector
+from .palindromes import (
+    ALGORITHMS, EXPAND_MAX_LENGTH, PalindromeIndex, score_strings, timed_longest_palindrome,
+)
 
 
 def index(request):
@@ -60,7 +52,7 @@ def index(request):
 SQRT2 = math.sqrt(2)
 
 
-def _quantum_reset(initial: str) -> list[float]:
+def _quantum_reset(initial: str) -> list[complex]:
     """Return initial quantum state [a00, a01, a10, a11]."""
     states = {
         "00": [1.0, 0.0, 0.0, 0.0],
@@ -72,42 +64,123 @@ def _quantum_reset(initial: str) -> list[float]:
     return states.get(initial, [1.0, 0.0, 0.0, 0.0])[:]
 
 
-def _quantum_apply_gate(state: list[float], gate: str) -> list[float]:
-    """Apply gate to state. Returns new state. Modifies in place for PauliZ."""
-    s = state
-    h = 1 / SQRT2
-    if gate == "CNOT":
-        return [s[0], s[1], s[3], s[2]]
-    if gate == "Hadamard":
-        return [
-            h * (s[0] + s[2]),
-            h * (s[1] + s[3]),
-            h * (s[0] - s[2]),
-            h * (s[1] - s[3]),
-        ]
-    if gate == "PauliX":
-        return [s[2], s[3], s[0], s[1]]
-    if gate == "PauliY":
-        return [-s[3], -s[2], s[1], s[0]]
-    if gate == "PauliZ":
-        return [s[0], s[1], -s[2], -s[3]]
-    return s[:]
+# app2 buttons: gate name -> qubits it acts on (first qubit = most significant bit)
+APP2_GATES = {
+    "PauliX": ("X", (0,)),
+    "PauliY": ("Y", (0,)),
+    "PauliZ": ("Z", (0,)),
+    "Hadamard": ("H", (0,)),
+    "CNOT": ("CX", (0, 1)),
+}
+
+
+ALGORITHM_LABELS = {
+    "auto": f"Auto (Manacher above {EXPAND_MAX_LENGTH} characters)",
+    "expand": "Expand around centers (O(n²))",
+    "manacher": "Manacher (O(n))",
+}
 
 
-def _app1_result_html(input_val: str) -> str:
+def _app1_timings_html(timings: dict) -> str:
+    """Timing table for both engines; skipped engines show N/A like app3."""
+    rows = []
+    for name, ms in timings.items():
+        time_str = f"{ms:.4f}" if ms is not None else f"N/A (n>{EXPAND_MAX_LENGTH}, too slow)"
+        rows.append(f"<tr><td>{ALGORITHM_LABELS[name]}</td><td>{time_str}</td></tr>")
+    return '<table border="1" style="border-collapse: collapse; width: 100%;"><tr><th>Algorithm</th><th>Time (ms)</th></tr>' + "".join(rows) + "</table>"
+
+
+# Rows shown in the analytics tables; the counts always cover the whole input
+ANALYTICS_ROWS = 20
+
+# Characters shown around the palindrome and inside it before eliding the rest
+CONTEXT_CHARS = 80
+PALINDROME_CHARS = 200
+# Inputs at least this long are answered with a StreamingHttpResponse
+STREAM_MIN_LENGTH = 50_000
+# Inputs longer than this are not echoed back into the text field
+INPUT_FIELD_LIMIT = 1000
+# Largest accepted input file
+UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+
+
+def _elide(text: str, limit: int, keep: str = "both") -> str:
+    """
+    Escaped text, cut to about limit characters around an elision marker.
+    keep="head" keeps the start, "tail" the end, "both" half of each.
+    """
+    if len(text) <= limit:
+        return escape(text)
+    marker = f'<span class="elided">…[{len(text) - limit} characters]…</span>'
+    if keep == "head":
+        return escape(text[:limit]) + marker
+    if keep == "tail":
+        return marker + escape(text[-limit:])
+    half = limit // 2
+    return escape(text[:half]) + marker + escape(text[-half:])
+
+
+def _app1_analytics_html(input_val: str, index: PalindromeIndex | None) -> str:
+    """Palindrome analytics (count, maximal palindromes, longest per prefix) from one radius array."""
+    start_time = time.perf_counter()
+    if index is None:
+        index = PalindromeIndex(input_val)
+    total = index.count()
+    starts, lengths = index.maximal()
+    prefix_lengths, prefix_starts = index.longest_per_prefix()
+    elapsed = f"{(time.perf_counter() - start_time) * 1000:.4f}"
+
+    def excerpt(start: int, length: int) -> str:
+        return _elide(input_val[start : start + length], 36)
+
+    maximal_rows = "".join(
+        f"<tr><td>{start}</td><td>{length}</td><td>{excerpt(start, length)}</td></tr>"
+        for start, length in zip(starts[:ANALYTICS_ROWS].tolist(), lengths[:ANALYTICS_ROWS].tolist())
+    )
+    # Evenly spaced prefixes, always including the whole string
+    n = len(input_val)
+    checkpoints = sorted({max(1, n * k // ANALYTICS_ROWS) for k in range(1, ANALYTICS_ROWS + 1)})
+    prefix_rows = "".join(
+        f"<tr><td>{j}</td><td>{prefix_lengths[j - 1]}</td><td>{excerpt(int(prefix_starts[j - 1]), int(prefix_lengths[j - 1]))}</td></tr>"
+        for j in checkpoints
+    )
+    more = f"<p><small>First {ANALYTICS_ROWS} of {len(starts)} shown.</small></p>" if len(starts) > ANALYTICS_ROWS else ""
+    table = '<table border="1" style="border-collapse: collapse; width: 100%;">'
+    return f'''<div class="problem">
+        <h3>Palindrome Analytics</h3>
+        <p><strong>Palindromic substrings:</strong> {total}<br>
+        <strong>Maximal palindromes (length ≥ 2):</strong> {len(starts)}<br>
+        <small>All answers come from one Manacher radius array — {elapsed} ms</small></p>
+        <h4>Maximal palindromes</h4>
+        {table}<tr><th>Start</th><th>Length</th><th>Palindrome</th></tr>{maximal_rows}</table>{more}
+        <h4>Longest palindrome per prefix</h4>
+        {table}<tr><th>Prefix length</th><th>Longest</th><th>Palindrome</th></tr>{prefix_rows}</table>
+    </div>'''
+
+
+def _app1_result_html(input_val: str, algorithm: str = "auto", analytics: bool = False) -> str:
     """Build result HTML for longest palindromic substring."""
     if not input_val:
         return '<div id="result" class="success" style="margin-top: 20px; padding: 15px; border-radius: 5px;"><strong>Error:</strong> Please enter a non-empty string.</div>'
-    longest, start, max_len = _longest_palindromic_substring(input_val)
-    visual_chars = [f'<span class="palindrome">{c}</span>' if start <= i < start + max_len else c for i, c in enumerate(input_val)]
-    visual_string = "".join(visual_chars)
+    result = timed_longest_palindrome(input_val, algorithm)
+    longest, start, max_len = result["substring"], result["start"], result["length"]
+    # Three slices instead of one element per character, long slices elided
+    visual_string = (
+        _elide(input_val[:start], CONTEXT_CHARS, keep="tail")
+        + f'<span class="palindrome">{_elide(longest, PALINDROME_CHARS)}</span>'
+        + _elide(input_val[start + max_len :], CONTEXT_CHARS, keep="head")
+    )
+    switched = ""
+    if algorithm == "expand" and result["algorithm"] != "expand":
+        switched = f" (switched from expand around centers, input longer than {EXPAND_MAX_LENGTH} characters)"
     return f'''<div id="result" class="success" style="margin-top: 20px; padding: 15px; border-radius: 5px; background: #d4edda; border: 1px solid #c3e6cb; color: #155724;">
-        <strong>Result:</strong> "{longest}"<br>
-        <strong>Length:</strong> {max_len}<br>
-        <strong>Input:</strong> "{input_val}"<br>
+        <strong>Result:</strong> "{_elide(longest, PALINDROME_CHARS)}"<br>
+        <strong>Length:</strong> {max_len} (starting at index {start})<br>
+        <strong>Input:</strong> "{_elide(input_val, PALINDROME_CHARS)}" ({len(input_val)} characters)<br>
         <div class="string-display">{visual_string}</div>
-        <strong>Algorithm:</strong> Expand around centers (O(n²) time, O(1) space) — computed in Python
-    </div>'''
+        <strong>Algorithm:</strong> {ALGORITHM_LABELS[result["algorithm"]]}{switched} — computed in Python
+        {_app1_timings_html(result["timings_ms"])}
+    </div>{_app1_analytics_html(input_val, result["index"]) if analytics else ""}'''
 
 
 @csrf_exempt
@@ -115,11 +188,30 @@ def app1(request):
     """Application 1: LeetCode Longest Palindromic Substring Problem (Medium).
     Logic runs in Python (server-side) - no inline JS."""
     input_val = "babad"
+    algorithm = "auto"
+    upload_error = ""
     if request.method == "POST":
         input_val = (request.POST.get("input_string") or "").strip() or "babad"
-    result_html = _app1_result_html(input_val)
+        uploaded = request.FILES.get("input_file")
+        if uploaded is not None:
+            if uploaded.size > UPLOAD_MAX_BYTES:
+                upload_error = f"File too large ({uploaded.size} bytes, limit {UPLOAD_MAX_BYTES})."
+            else:
+                input_val = uploaded.read().decode("utf-8", errors="replace").strip() or input_val
+        algorithm = request.POST.get("algorithm", "auto")
+        if algorithm not in ALGORITHMS:
+            algorithm = "auto"
+        analytics = request.POST.get("analytics") == "on"
+    else:
+        analytics = False
+    algorithm_options = "".join(
+        f'<option value="{name}"{" selected" if name == algorithm else ""}>{ALGORITHM_LABELS[name]}</option>'
+        for name in ALGORITHMS
+    )
 
-    html = f"""
+    field_val = escape(input_val) if len(input_val) <= INPUT_FIELD_LIMIT else ""
+
+    page_head = f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -135,7 +227,8 @@ def app1(request):
                 button {{ padding: 10px 20px; background: #4CAF50; color: white; border: none; border-radius: 4px; cursor: pointer; }}
                 button:hover {{ background: #45a049; }}
                 .palindrome {{ color: #FF6B6B; font-weight: bold; }}
-                .string-display {{ font-family: monospace; font-size: 18px; padding: 15px; background: #f9f9f9; border-radius: 5px; margin: 15px 0; letter-spacing: 2px; }}
+                .string-display {{ font-family: monospace; font-size: 18px; padding: 15px; background: #f9f9f9; border-radius: 5px; margin: 15px 0; letter-spacing: 2px; word-break: break-all; }}
+                .elided {{ color: #999; font-size: 12px; letter-spacing: 0; }}
             </style>
         </head>
         <body>
@@ -213,56 +306,566 @@ def app1(request):
                 <p><strong>Result:</strong> "bab" or "aba" (both length 3)</p>
             </div>
             
+            <div class="problem">
+                <h2>Linear Time: Manacher's Algorithm</h2>
+                <p>Interleave separators (<code>#b#a#b#a#d#</code>) so every palindrome has a single center, then sweep left to right
+                keeping the palindrome that reaches furthest right. Inside it, the radius at <code>i</code> starts from the radius of its
+                mirror position, so characters are never compared twice.</p>
+                <p><strong>Time Complexity:</strong> O(n) &nbsp; <strong>Space Complexity:</strong> O(n)</p>
+                <p>Inputs longer than {EXPAND_MAX_LENGTH} characters always use Manacher; below that both algorithms are timed.</p>
+            </div>
+            
             <h2>Try it yourself:</h2>
-            <form method="post" action="">
+            <form method="post" action="" enctype="multipart/form-data">
                 <label>Input string:</label><br>
-                <input type="text" name="input_string" value="{input_val}" placeholder="Enter a string"><br>
+                <input type="text" name="input_string" value="{field_val}" placeholder="Enter a string"><br>
+                <label>Or upload a UTF-8 text file (up to {UPLOAD_MAX_BYTES // (1024 * 1024)} MB, used instead of the field):</label><br>
+                <input type="file" name="input_file" accept=".txt,text/plain"><br>
+                <label>Algorithm:</label>
+                <select name="algorithm">{algorithm_options}</select><br>
+                <label><input type="checkbox" name="analytics"{" checked" if analytics else ""} style="width: auto;"> Palindrome analytics (count, maximal palindromes, longest per prefix)</label><br>
                 <button type="submit">Solve</button>
             </form>
             
-            {result_html}
+    """
+    page_tail = """
         </body>
         </html>
     """
-    return HttpResponse(html)
 
+    def result_html() -> str:
+        if upload_error:
+            return f'<div id="result" class="success" style="margin-top: 20px; padding: 15px; border-radius: 5px;"><strong>Error:</strong> {upload_error}</div>'
+        return _app1_result_html(input_val, algorithm, analytics)
+
+    if len(input_val) >= STREAM_MIN_LENGTH:
+        # The page (and form) goes out before the computation finishes
+        def chunks():
+            yield page_head
+            yield result_html()
+            yield page_tail
+        return StreamingHttpResponse(chunks(), content_type="text/html; charset=utf-8")
+    return HttpResponse(page_head + result_html() + page_tail)
+
+
+# Batch endpoint limits
+BATCH_MAX_ITEMS = 10_000
+BATCH_MAX_ITEM_CHARS = 100_000
+BATCH_MAX_TOTAL_CHARS = 5_000_000
+# Batches smaller than this are scored inline, the pool only pays off above it
+BATCH_INLINE_MAX_CHARS = 20_000
+# Characters per task sent to a worker process
+BATCH_CHUNK_CHARS = 200_000
+
+class BatchError(ValueError):
+    """Batch request rejected as a whole (bad payload or total size over the limit)."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+def _batch_items(request) -> tuple[list, str]:
+    """
+    Strings of a batch request and the algorithm to use.
+    JSON: {"strings": [...], "algorithm": "auto"} or a bare list.
+    NDJSON (application/x-ndjson): one JSON string or {"s": ...} object per line,
+    read from the request stream line by line.
+    """
+    algorithm = request.GET.get("algorithm", "auto")
+    limit = BATCH_MAX_TOTAL_CHARS * 4 + 1  # UTF-8 bytes upper bound
+    # Read the stream directly, request.body stops at DATA_UPLOAD_MAX_MEMORY_SIZE
+    if request.content_type == "application/x-ndjson":
+        items, size = [], 0
+        for line in request:
+            size += len(line)
+            if size > limit:
+                raise BatchError("Request body too large", status=413)
+            if not line.strip():
+                continue
+            value = json.loads(line)
+            items.append(value.get("s") if isinstance(value, dict) else value)
+    else:
+        body = request.read(limit)
+        if len(body) >= limit:
+            raise BatchError("Request body too large", status=413)
+        payload = json.loads(body or b"null")
+        if isinstance(payload, dict):
+            algorithm = payload.get("algorithm", algorithm)
+            payload = payload.get("strings")
+        if not isinstance(payload, list):
+            raise BatchError('Expected a JSON list or {"strings": [...]}')
+        items = payload
+    if algorithm not in ALGORITHMS:
+        raise BatchError(f"Unknown algorithm '{algorithm}'. Choose from {', '.join(ALGORITHMS)}")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise BatchError(f"Too many strings ({len(items)}, limit {BATCH_MAX_ITEMS})", status=413)
+    total = sum(len(item) for item in items if isinstance(item, str))
+    if total > BATCH_MAX_TOTAL_CHARS:
+        raise BatchError(f"Batch too large ({total} characters, limit {BATCH_MAX_TOTAL_CHARS})", status=413)
+    return items, algorithm
 
-def _app2_state_table(state: list[float]) -> str:
+
+def _batch_chunks(items: list) -> list[tuple[list[int], list[str]]]:
+    """Group the valid items into (indices, strings) tasks of about BATCH_CHUNK_CHARS characters."""
+    chunks, indices, strings, size = [], [], [], 0
+    for i, item in enumerate(items):
+        if not isinstance(item, str) or len(item) > BATCH_MAX_ITEM_CHARS:
+            continue
+        indices.append(i)
+        strings.append(item)
+        size += len(item) + 1
+        if size >= BATCH_CHUNK_CHARS:
+            chunks.append((indices, strings))
+            indices, strings, size = [], [], 0
+    if indices:
+        chunks.append((indices, strings))
+    return chunks
+
+
+def _batch_submit(items: list, algorithm: str) -> list:
+    """(indices, results) per chunk, results being a Future when the pool is used."""
+    chunks = _batch_chunks(items)
+    if sum(len(s) for _, strings in chunks for s in strings) <= BATCH_INLINE_MAX_CHARS:
+        return [(indices, score_strings(strings, algorithm)) for indices, strings in chunks]
+    pool = get_pool()
+    return [(indices, pool.submit(score_strings, strings, algorithm)) for indices, strings in chunks]
+
+
+def _batch_item_error(item) -> str:
+    """Why a batch item was not scored."""
+    if not isinstance(item, str):
+        return "Expected a string"
+    return f"String too long ({len(item)} characters, limit {BATCH_MAX_ITEM_CHARS})"
+
+
+def _batch_lines(items: list, pending: list):
+    """NDJSON lines in input order, each chunk written as soon as it (and every earlier one) is done."""
+    position = 0
+    for indices, results in pending:
+        if not isinstance(results, list):
+            try:
+                results = results.result()
+            except BrokenProcessPool:
+                discard_pool()
+                results = [{"error": "Worker process crashed"}] * len(indices)
+        for i, result in zip(indices, results):
+            # Rejected items between the scored ones keep their place
+            for j in range(position, i):
+                yield json.dumps({"index": j, "error": _batch_item_error(items[j])}) + "\n"
+            yield json.dumps({"index": i, **result}) + "\n"
+            position = i + 1
+    for j in range(position, len(items)):
+        yield json.dumps({"index": j, "error": _batch_item_error(items[j])}) + "\n"
+
+
+@csrf_exempt
+def app1_batch(request):
+    """
+    Batch longest palindromic substring: POST JSON or NDJSON strings, get NDJSON
+    back in input order, one {"index", "substring", "start", "length", "algorithm"}
+    (or {"index", "error"}) line per string.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "POST a JSON list or NDJSON lines of strings"}, status=405)
+    try:
+        items, algorithm = _batch_items(request)
+    except BatchError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+    except ValueError as e:
+        return JsonResponse({"error": f"Invalid JSON: {e}"}, status=400)
+    try:
+        pending = _batch_submit(items, algorithm)
+    except BrokenProcessPool:
+        discard_pool()
+        return JsonResponse({"error": "Worker pool unavailable, please retry"}, status=503)
+    return StreamingHttpResponse(_batch_lines(items, pending), content_type="application/x-ndjson")
+
+
+def _format_amplitude(amp: complex) -> str:
+    """Real amplitudes as before (0.707), complex ones as 0.707-0.707i."""
+    amp = complex(amp)
+    if abs(amp.imag) < 5e-4:
+        return f"{amp.real:.3f}"
+    if abs(amp.real) < 5e-4:
+        return f"{amp.imag:.3f}i"
+    return f"{amp.real:.3f}{amp.imag:+.3f}i"
+
+
+def _app2_state_table(state: list[complex]) -> str:
     """Build HTML table for quantum state display."""
     states = ["|00⟩", "|01⟩", "|10⟩", "|11⟩"]
     rows = []
     for i in range(4):
-        amp = state[i]
-        prob = f"{abs(amp * amp):.3f}"
-        amp_str = f"{amp:.3f}"
+        amp = complex(state[i])
+        prob = f"{abs(amp) ** 2:.3f}"
+        amp_str = _format_amplitude(amp)
         rows.append(f"<tr><td>{states[i]}</td><td>{amp_str}</td><td>{prob}</td></tr>")
     return "<table border=\"1\" style=\"border-collapse: collapse; width: 100%;\"><tr><th>State</th><th>Amplitude</th><th>Probability</th></tr>" + "".join(rows) + "</table>"
 
 
-def _app2_hidden_state_inputs(state: list[float]) -> str:
-    """Build hidden inputs for form state."""
-    return "".join(f'<input type="hidden" name="s{i}" value="{state[i]}">' for i in range(4))
+# Circuit mode: full amplitude lists only up to this many qubits, then the top outcomes
+CIRCUIT_FULL_STATE_QUBITS = 12
+CIRCUIT_TOP_OUTCOMES = 32
+CIRCUIT_EXAMPLE = "H 0\nCX 0 1\nRZ(0.5) 1\nH 0\nH 0"
+CIRCUIT_MAX_SHOTS = 10_000_000
+NOISE_MAX_TRAJECTORIES = 10_000
+# Amplitude updates (trajectories × gates × 2^n) per trajectory run, a few seconds on one core
+NOISE_MAX_WORK = 1 << 30
+
+
+def _run_circuit_input(source, n_qubits, initial: str = "", fusion: bool = True, use_optimizer: bool = True) -> dict:
+    """
+    Validate circuit mode input, optionally optimize it, and run it.
+    Raises ValueError with a user-facing message.
+    """
+    try:
+        n_qubits = int(n_qubits)
+    except (TypeError, ValueError):
+        raise ValueError("Number of qubits must be an integer")
+    if not 1 <= n_qubits <= CIRCUIT_MAX_QUBITS:
+        raise ValueError(f"Number of qubits must be between 1 and {CIRCUIT_MAX_QUBITS}")
+    original = circuit = parse_circuit(source)
+    optimization = None
+    if use_optimizer:
+        start = time.perf_counter()
+        circuit = optimize(circuit)
+        optimization = {
+            "before": circuit_cost(original, n_qubits),
+            "after": circuit_cost(circuit, n_qubits),
+            "ms": (time.perf_counter() - start) * 1000,
+        }
+    result = run_circuit(circuit, n_qubits, initial.strip() or None, fusion)
+    result["optimization"] = optimization
+    # Noise follows every gate as written (an H·H the optimizer cancels still decoheres),
+    # so the noisy backends run the circuit before optimization
+    result["circuit"], result["initial"] = original, initial.strip() or None
+    return result
+
+
+def _run_noise(result: dict, noise: dict | None, backend: str = "auto", trajectories=DEFAULT_TRAJECTORIES) -> dict | None:
+    """
+    Noisy run of the circuit behind result. Returns None when every channel is off.
+    Raises ValueError with a user-facing message.
+    """
+    model = NoiseModel.from_dict(noise or {})
+    if model.is_ideal:
+        return None
+    try:
+        trajectories = int(trajectories or DEFAULT_TRAJECTORIES)
+    except (TypeError, ValueError):
+        raise ValueError("Number of trajectories must be an integer")
+    if not 1 <= trajectories <= NOISE_MAX_TRAJECTORIES:
+        raise ValueError(f"Number of trajectories must be between 1 and {NOISE_MAX_TRAJECTORIES}")
+    n = result["state"].n_qubits
+    if choose_backend(n, backend) == "trajectory":
+        work = trajectories * max(len(result["circuit"]), 1) << n
+        if work > NOISE_MAX_WORK:
+            raise ValueError(
+                f"Noisy run too large: {trajectories} trajectories × {len(result['circuit'])} gates × 2^{n} amplitudes "
+                f"exceeds {NOISE_MAX_WORK:,} amplitude updates, use fewer trajectories or qubits"
+            )
+    noisy = run_noisy(result["circuit"], n, model, backend, trajectories, result["initial"])
+    noisy["model"] = {name: getattr(model, name) for name in ("depolarizing", "amplitude_damping", "bit_flip")}
+    # A state whose probabilities are the noisy ones, so top outcomes and shots work unchanged
+    noisy["distribution"] = StateVector(n, np.sqrt(noisy.pop("probabilities")))
+    return noisy
+
+
+def _measure(state: StateVector, shots, qubits=None) -> dict | None:
+    """
+    Shot histogram of measuring qubits (a list or "0 2" text, all qubits when empty).
+    Returns None when no shots were requested.
+    """
+    try:
+        shots = int(shots or 0)
+        if isinstance(qubits, str):
+            qubits = [int(q) for q in qubits.replace(",", " ").split()]
+    except (TypeError, ValueError):
+        raise ValueError("Shots and measured qubits must be integers")
+    if shots <= 0:
+        return None
+    if shots > CIRCUIT_MAX_SHOTS:
+        raise ValueError(f"At most {CIRCUIT_MAX_SHOTS} shots")
+    qubits = list(qubits) if qubits else list(range(state.n_qubits))
+    start = time.perf_counter()
+    counts = state.sample_counts(shots, qubits)
+    elapsed = (time.perf_counter() - start) * 1000
+    observed = np.flatnonzero(counts)
+    top = observed[np.argsort(-counts[observed], kind="stable")][:CIRCUIT_TOP_OUTCOMES]
+    return {
+        "qubits": qubits,
+        "shots": shots,
+        "distinct_outcomes": int(observed.size),
+        "counts": {f"{i:0{len(qubits)}b}": int(counts[i]) for i in top},
+        "ms": elapsed,
+    }
+
+
+def _circuit_summary(result: dict) -> dict:
+    """JSON-ready circuit mode result."""
+    state = result["state"]
+    n = state.n_qubits
+    summary = {key: result[key] for key in (
+        "gate_count", "block_count", "fusion_ms", "apply_ms", "blocks", "optimization", "measurement",
+    )}
+    summary["n_qubits"] = n
+    summary["top_outcomes"] = [
+        {"basis": f"{i:0{n}b}", "amplitude": [amp.real, amp.imag], "probability": prob}
+        for i, amp, prob in top_outcomes(state, CIRCUIT_TOP_OUTCOMES)
+    ]
+    if n <= CIRCUIT_FULL_STATE_QUBITS:
+        summary["amplitudes"] = [[amp.real, amp.imag] for amp in state.amplitudes.tolist()]
+        summary["probabilities"] = state.probabilities().tolist()
+    noise = result.get("noise")
+    summary["noise"] = None
+    if noise:
+        summary["noise"] = {key: value for key, value in noise.items() if key != "distribution"}
+        summary["noise"]["top_outcomes"] = [
+            {"basis": f"{i:0{n}b}", "probability": prob}
+            for i, _, prob in top_outcomes(noise["distribution"], CIRCUIT_TOP_OUTCOMES)
+        ]
+    return summary
+
+
+def _json_flag(payload: dict, name: str, default: bool) -> bool:
+    """A boolean payload field; strings such as "false" are truthy, so only true/false are accepted."""
+    value = payload.get(name, default)
+    if not isinstance(value, bool):
+        raise ValueError(f'"{name}" must be true or false')
+    return value
+
+
+def _app2_circuit_json(request) -> JsonResponse:
+    """
+    Circuit mode API: {"circuit": [...] or "H 0; CX 0 1", "n_qubits": 2, "initial": "00", "fusion": true},
+    optionally with "noise": {"depolarizing": 0.01, ...}, "backend" and "trajectories".
+    """
+    try:
+        payload = json.loads(request.body or b"{}")
+        if not isinstance(payload, dict):
+            raise ValueError("Expected a JSON object")
+        result = _run_circuit_input(
+            payload.get("circuit", []), payload.get("n_qubits", 2),
+            str(payload.get("initial", "")), _json_flag(payload, "fusion", True), _json_flag(payload, "optimize", True),
+        )
+        result["noise"] = _run_noise(
+            result, payload.get("noise"), str(payload.get("backend", "auto")), payload.get("trajectories", DEFAULT_TRAJECTORIES),
+        )
+        # Shots come from the noisy distribution when there is one
+        measured = result["noise"]["distribution"] if result["noise"] else result["state"]
+        result["measurement"] = _measure(measured, payload.get("shots", 0), payload.get("measure"))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(_circuit_summary(result))
+
+
+def _app2_circuit_html(result: dict) -> str:
+    """Final state, probabilities and per-block timings of a circuit run."""
+    state = result["state"]
+    n = state.n_qubits
+    outcomes = top_outcomes(state, CIRCUIT_TOP_OUTCOMES)
+    rows = "".join(
+        f"<tr><td>|{i:0{n}b}⟩</td><td>{_format_amplitude(amp)}</td><td>{prob:.4f}</td></tr>"
+        for i, amp, prob in outcomes
+    )
+    truncated = len(outcomes) == CIRCUIT_TOP_OUTCOMES and (1 << n) > CIRCUIT_TOP_OUTCOMES
+    shown = f"<p><small>{CIRCUIT_TOP_OUTCOMES} most likely of {1 << n} basis states shown.</small></p>" if truncated else ""
+    timing_rows = "".join(
+        f"<tr><td>{', '.join(escape(label) for label in block['gates'])}</td><td>{', '.join(map(str, block['qubits']))}</td>"
+        f"<td>{'fused' if block['fused'] else 'direct'}</td><td>{block['ms']:.4f}</td></tr>"
+        for block in result["blocks"]
+    )
+    measurement = result.get("measurement")
+    measurement_html = ""
+    if measurement:
+        bars = "".join(
+            f"<tr><td>|{outcome}⟩</td><td>{count}</td><td style='text-align: left;'>"
+            f"<div style='background: #2196F3; height: 12px; width: {100 * count / measurement['shots']:.1f}%;'></div></td></tr>"
+            for outcome, count in measurement["counts"].items()
+        )
+        measurement_html = f"""
+            <h4>Measurement: {measurement['shots']:,} shots of qubits {', '.join(map(str, measurement['qubits']))}
+            ({measurement['distinct_outcomes']} distinct outcomes, {measurement['ms']:.4f} ms)</h4>
+            <table><tr><th>Outcome</th><th>Count</th><th>Frequency</th></tr>{bars}</table>
+        """
+    noise = result.get("noise")
+    noise_html = ""
+    if noise:
+        noisy_rows = "".join(
+            f"<tr><td>|{i:0{n}b}⟩</td><td>{prob:.4f}</td></tr>"
+            for i, _, prob in top_outcomes(noise["distribution"], CIRCUIT_TOP_OUTCOMES)
+        )
+        channels = ", ".join(f"{name.replace('_', ' ')} {p:g}" for name, p in noise["model"].items() if p)
+        if noise["backend"] == "density":
+            method = f"exact density matrix, purity {noise['purity']:.4f}"
+        else:
+            method = f"{noise['trajectories']} trajectories on {noise['workers']} process(es)"
+        noise_html = f"""
+            <h4>Noisy probabilities ({channels} after every gate)</h4>
+            <p>{method}, ~{noise['memory_bytes'] / 2**20:.1f} MiB, {noise['ms']:.4f} ms</p>
+            <table><tr><th>State</th><th>Probability</th></tr>{noisy_rows}</table>
+        """
+    optimization = result["optimization"]
+    optimization_html = ""
+    if optimization:
+        before, after = optimization["before"], optimization["after"]
+        optimization_html = (
+            f"<p>Optimizer ({optimization['ms']:.4f} ms): {before['gates']} → {after['gates']} gates, "
+            f"~{before['flops']:,} → {after['flops']:,} FLOPs</p>"
+        )
+    return f"""
+        <div class="result">
+            <h3>Circuit Result ({n} qubits, {result['gate_count']} gates in {result['block_count']} operations)</h3>
+            {optimization_html}
+            <table><tr><th>State</th><th>Amplitude</th><th>Probability</th></tr>{rows}</table>{shown}
+            {noise_html}
+            {measurement_html}
+            <h4>Timing breakdown</h4>
+            <p>Fusion: {result['fusion_ms']:.4f} ms &nbsp; Gates: {result['apply_ms']:.4f} ms</p>
+            <table><tr><th>Gates</th><th>Qubits</th><th>Applied</th><th>Time (ms)</th></tr>{timing_rows}</table>
+        </div>
+    """
+
+
+def _session_summary(session: CircuitSession) -> dict:
+    """JSON-ready state of a stored circuit session."""
+    state = session.state
+    n = state.n_qubits
+    summary = {
+        "circuit_id": session.circuit_id,
+        "n_qubits": n,
+        "history": session.labels(),
+        "can_undo": session.can_undo,
+        "can_redo": session.can_redo,
+        "top_outcomes": [
+            {"basis": f"{i:0{n}b}", "amplitude": [amp.real, amp.imag], "probability": prob}
+            for i, amp, prob in top_outcomes(state, CIRCUIT_TOP_OUTCOMES)
+        ],
+    }
+    if n <= CIRCUIT_FULL_STATE_QUBITS:
+        summary["amplitudes"] = [[amp.real, amp.imag] for amp in state.amplitudes.tolist()]
+    return summary
+
+
+@csrf_exempt
+def app2_session(request, circuit_id: str | None = None):
+    """
+    Server-side circuit sessions, JSON in and out.
+
+    POST app2/session/ {"n_qubits": 3, "initial": "000"} creates one;
+    GET app2/session/<id>/ returns its state; POST app2/session/<id>/ with
+    {"gate": "H 0"} applies a gate, {"action": "undo"} / {"action": "redo"}
+    steps through the history; DELETE drops it.
+    """
+    if circuit_id is None:
+        if request.method != "POST":
+            return JsonResponse({"error": "POST to create a session"}, status=405)
+        try:
+            payload = json.loads(request.body or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Expected a JSON object")
+            session = CircuitSession.create(int(payload.get("n_qubits", 2)), initial=str(payload.get("initial", "")))
+        except (ValueError, TypeError) as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        return JsonResponse(_session_summary(session), status=201)
+
+    session = CircuitSession.load(circuit_id)
+    if session is None:
+        return JsonResponse({"error": "Circuit session expired or unknown, create a new one"}, status=404)
+    if request.method == "DELETE":
+        session.delete()
+        return HttpResponse(status=204)
+    if request.method == "POST":
+        try:
+            payload = json.loads(request.body or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("Expected a JSON object")
+            action = payload.get("action", "apply")
+            if action == "undo":
+                session.undo()
+            elif action == "redo":
+                session.redo()
+            elif action == "apply":
+                session.apply(parse_gate(payload.get("gate", "")))
+            else:
+                raise ValueError(f"Unknown action '{action}', expected apply, undo or redo")
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        session.save()
+    return JsonResponse(_session_summary(session))
 
 
 @csrf_exempt
 def app2(request):
     """Application 2: Basic Quantum Gates Simulator. Logic runs in Python (server-side)."""
-    state = [1.0, 0.0, 0.0, 0.0]
+    if request.method == "POST" and request.content_type == "application/json":
+        return _app2_circuit_json(request)
+    session = None
     initial_sel = "00"
+    circuit_text, circuit_qubits, circuit_initial, circuit_fusion = CIRCUIT_EXAMPLE, "2", "", True
+    circuit_optimize = True
+    circuit_shots, circuit_measure = "1000", ""
+    circuit_noise = {"depolarizing": "0", "amplitude_damping": "0", "bit_flip": "0"}
+    circuit_backend, circuit_trajectories = "auto", str(DEFAULT_TRAJECTORIES)
+    circuit_html = ""
+    session_error = ""
     if request.method == "POST":
         action = request.POST.get("action", "")
-        if action == "reset":
-            initial_sel = request.POST.get("initial_state", "00")
-            state = _quantum_reset(initial_sel)
-        else:
+        if action == "circuit":
+            circuit_text = request.POST.get("circuit", "")
+            circuit_qubits = request.POST.get("n_qubits", "2")
+            circuit_initial = request.POST.get("initial", "")
+            circuit_fusion = request.POST.get("fusion") == "on"
+            circuit_optimize = request.POST.get("optimize") == "on"
+            circuit_shots = request.POST.get("shots", "")
+            circuit_measure = request.POST.get("measure", "")
+            circuit_noise = {name: request.POST.get(name, "0") for name in circuit_noise}
+            circuit_backend = request.POST.get("backend", "auto")
+            circuit_trajectories = request.POST.get("trajectories", "")
             try:
-                state = [float(request.POST.get(f"s{i}", 0)) for i in range(4)]
-            except (ValueError, TypeError):
-                state = [1.0, 0.0, 0.0, 0.0]
-            if action in ("PauliX", "PauliY", "PauliZ", "Hadamard", "CNOT"):
-                state = _quantum_apply_gate(state, action)
-    hidden = _app2_hidden_state_inputs(state)
-    state_table = _app2_state_table(state)
+                result = _run_circuit_input(circuit_text, circuit_qubits, circuit_initial, circuit_fusion, circuit_optimize)
+                result["noise"] = _run_noise(result, circuit_noise, circuit_backend, circuit_trajectories)
+                measured = result["noise"]["distribution"] if result["noise"] else result["state"]
+                result["measurement"] = _measure(measured, circuit_shots, circuit_measure)
+                circuit_html = _app2_circuit_html(result)
+            except ValueError as e:
+                circuit_html = f'<div class="result" style="background: #fdecea;"><strong>Error:</strong> {escape(str(e))}</div>'
+        else:
+            circuit_id = request.POST.get("circuit_id", "")
+            session = CircuitSession.load(circuit_id)
+            if action == "reset":
+                if session is not None:
+                    session.delete()
+                initial_sel = request.POST.get("initial_state", "00")
+                session = CircuitSession.create(2, _quantum_reset(initial_sel))
+            elif session is None and circuit_id:
+                # Starting over silently would look like the gate was applied to |00⟩
+                session_error = "This circuit session has expired or is unknown. Reset the state to start a new one."
+            elif session is None:
+                session = CircuitSession.create(2, _quantum_reset(initial_sel))
+            if session is not None:
+                if action in APP2_GATES:
+                    name, qubits = APP2_GATES[action]
+                    session.apply(Gate(name, qubits))
+                elif action == "undo":
+                    session.undo()
+                elif action == "redo":
+                    session.redo()
+                session.save()
+    if session is None:
+        session = CircuitSession(None, StateVector(2))
+    # Forms only carry the circuit id, the state stays in the server-side store
+    hidden = f'<input type="hidden" name="circuit_id" value="{session.circuit_id or ""}">'
+    state_table = _app2_state_table(session.state.amplitudes)
+    if session_error:
+        state_table = f'<p style="color: #c62828;"><strong>Error:</strong> {session_error}</p>' + state_table
+    history = ", ".join(escape(label) for label in session.labels()) or "none"
+    backend_options = "".join(
+        f'<option value="{name}"{" selected" if name == circuit_backend else ""}>{name}</option>' for name in BACKENDS
+    )
+    undo_disabled = "" if session.can_undo else " disabled"
+    redo_disabled = "" if session.can_redo else " disabled"
     sel_00 = ' selected' if initial_sel == '00' else ''
     sel_01 = ' selected' if initial_sel == '01' else ''
     sel_10 = ' selected' if initial_sel == '10' else ''
@@ -315,10 +918,19 @@ def app2(request):
                 
                 <h3>Two-Qubit Gates:</h3>
                 <form method="post" style="display:inline;">{hidden}<input type="hidden" name="action" value="CNOT"><button type="submit" class="gate-button">CNOT (Controlled-NOT)</button></form>
+
+                <h3>History:</h3>
+                <p>Applied gates: {history}</p>
+                <form method="post" style="display:inline;">{hidden}<input type="hidden" name="action" value="undo"><button type="submit" class="gate-button"{undo_disabled}>Undo</button></form>
+                <form method="post" style="display:inline;">{hidden}<input type="hidden" name="action" value="redo"><button type="submit" class="gate-button"{redo_disabled}>Redo</button></form>
+                <p><small>The state is kept on the server; each button only sends the circuit id and the gate.
+                The last {HISTORY_LIMIT} gates can be undone. The same sessions take up to {SESSION_MAX_QUBITS} qubits as JSON:
+                POST <code>{{"n_qubits": n}}</code> to <code>session/</code>, then <code>{{"gate": "H 0"}}</code> or
+                <code>{{"action": "undo"}}</code> to <code>session/&lt;circuit_id&gt;/</code>.</small></p>
             </div>
             
             <form method="post">
-                <input type="hidden" name="action" value="reset">
+                {hidden}<input type="hidden" name="action" value="reset">
                 <h3>Initial State:</h3>
                 <select name="initial_state">
                     <option value="00"{sel_00}>|00⟩</option>
@@ -334,6 +946,34 @@ def app2(request):
                 <h3>Current State:</h3>
                 <div id="stateDisplay">{state_table}</div>
             </div>
+            
+            <div class="gate-info">
+                <h2>Circuit Mode</h2>
+                <p>Submit a whole gate sequence (one gate per line or separated by <code>;</code>, controls first, qubit 0 is the leftmost bit),
+                e.g. <code>H 0</code>, <code>CX 0 1</code>, <code>RZ(0.5) 2</code>, <code>SWAP 1 2</code>, <code>CCX 0 1 2</code>.
+                Consecutive gates on at most two qubits are fused into one unitary and applied once.
+                Up to {CIRCUIT_MAX_QUBITS} qubits. The same runs as JSON: POST <code>{{"circuit": [...], "n_qubits": n}}</code>
+                with <code>Content-Type: application/json</code>.</p>
+                <p>Noise channels act on every qubit a gate touched, right after the gate. Small circuits use the exact density matrix,
+                larger ones (or <em>trajectory</em>) average Monte-Carlo state-vector trajectories run on a process pool; shots are then drawn from the noisy probabilities.</p>
+                <form method="post">
+                    <input type="hidden" name="action" value="circuit">
+                    <textarea name="circuit" rows="6" style="width: 100%; font-family: monospace;">{escape(circuit_text)}</textarea><br>
+                    <label>Qubits: <input type="number" name="n_qubits" value="{escape(circuit_qubits)}" min="1" max="{CIRCUIT_MAX_QUBITS}"></label>
+                    <label>Initial basis state: <input type="text" name="initial" value="{escape(circuit_initial)}" placeholder="000…"></label>
+                    <label><input type="checkbox" name="optimize"{" checked" if circuit_optimize else ""}> Optimize (cancel inverses, merge single-qubit gates)</label>
+                    <label><input type="checkbox" name="fusion"{" checked" if circuit_fusion else ""}> Gate fusion</label><br>
+                    <label>Shots: <input type="number" name="shots" value="{escape(circuit_shots)}" min="0" max="{CIRCUIT_MAX_SHOTS}"></label>
+                    <label>Measure qubits: <input type="text" name="measure" value="{escape(circuit_measure)}" placeholder="all, or e.g. 0 2"></label><br>
+                    <label>Depolarizing: <input type="number" name="depolarizing" value="{escape(circuit_noise['depolarizing'])}" min="0" max="1" step="any"></label>
+                    <label>Amplitude damping: <input type="number" name="amplitude_damping" value="{escape(circuit_noise['amplitude_damping'])}" min="0" max="1" step="any"></label>
+                    <label>Bit flip: <input type="number" name="bit_flip" value="{escape(circuit_noise['bit_flip'])}" min="0" max="1" step="any"></label><br>
+                    <label>Noise backend: <select name="backend">{backend_options}</select></label>
+                    <label>Trajectories: <input type="number" name="trajectories" value="{escape(circuit_trajectories)}" min="1" max="{NOISE_MAX_TRAJECTORIES}"></label>
+                    <button type="submit" class="gate-button">Run Circuit</button>
+                </form>
+            </div>
+            {circuit_html}
         </body>
         </html>
     """